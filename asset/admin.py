@@ -5,9 +5,10 @@
 '''
 
 from django.contrib import admin
+from django.db.models import Sum
 
 from asset.models import AlbumImage, Announcement, Album, Comment
-from core.utils.files import get_image_size, simplify_file_size
+from core.utils.files import get_stored_image_size, simplify_file_size
 from core.utils.general import truncate
 
 
@@ -31,11 +32,9 @@ class AnnouncementAdmin(admin.ModelAdmin):
     def image_size(self, obj):
         ''' Get announcement image size and dimensions '''
         try:
-            return get_image_size(obj.image)
+            return get_stored_image_size(obj, 'image')
         except ValueError:
             return str()
-        except FileNotFoundError:
-            return 'FileNotFoundError'
 
 
 class AlbumImageInline(admin.StackedInline):
@@ -51,11 +50,9 @@ class AlbumImageInline(admin.StackedInline):
     def size(self, obj):
         ''' Get image size '''
         try:
-            return get_image_size(obj.image)
+            return get_stored_image_size(obj, 'image')
         except ValueError:
             return str()
-        except FileNotFoundError:
-            return 'FileNotFoundError'
 
 
 class AlbumAdmin(admin.ModelAdmin):
@@ -78,12 +75,8 @@ class AlbumAdmin(admin.ModelAdmin):
 
     def storage(self, obj):
         ''' Get storage space used '''
-        try:
-            return simplify_file_size(sum([i.image.size for i in AlbumImage.objects.filter(album_id=obj.id)]), unit='B')
-        except ValueError:
-            return str()
-        except FileNotFoundError:
-            return 'FileNotFoundError'
+        size = AlbumImage.objects.filter(album_id=obj.id).aggregate(size=Sum('image_size'))['size']
+        return simplify_file_size(0 if size is None else size, unit='B')
 
 
 class CommentAdmin(admin.ModelAdmin):
@@ -13,7 +13,7 @@ from django.utils.translation import gettext as _
 from clubs_and_events.settings import STORAGE_BASE_DIR, MAX_ANNOUNCEMENT_IMAGE_DIMENSION, MAX_ALBUM_IMAGE_DIMENSION
 from community.models import Community, Event, CommunityEvent
 from core.utils.general import truncate, get_file_extension
-from core.utils.files import auto_downscale_image
+from core.utils.files import IMAGE_STATUS, clear_removed_image_metadata, get_changed_images, schedule_image_processing
 from core.utils.objects import save_user_attributes
 from core.utils.users import get_client_ip
 
@@ -26,6 +26,12 @@ class Announcement(models.Model):
 
     text = models.TextField(max_length=2048)
     image = models.ImageField(null=True, blank=True, upload_to=get_image_path)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_mime = models.CharField(max_length=32, null=True, blank=True, editable=False)
+    image_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    image_status = models.CharField(max_length=1, choices=IMAGE_STATUS, default='R', editable=False)
     is_publicly_visible = models.BooleanField(default=True)
     is_active = models.BooleanField(default=True)
     community = models.ForeignKey(Community, on_delete=models.CASCADE)
@@ -44,6 +50,9 @@ class Announcement(models.Model):
         ''' Save instance '''
         save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name='updated_by')
 
+        images = get_changed_images(self, {'image': MAX_ANNOUNCEMENT_IMAGE_DIMENSION})
+        clear_removed_image_metadata(self, ('image',))
+
         if self.pk is None:
             saved_image = self.image
             self.image = None
@@ -55,7 +64,7 @@ class Announcement(models.Model):
 
         super(Announcement, self).save(*args, **kwargs)
 
-        auto_downscale_image(self.image, threshold=MAX_ANNOUNCEMENT_IMAGE_DIMENSION)
+        schedule_image_processing(self, images)
 
 
 class Album(models.Model):
@@ -123,6 +132,12 @@ class AlbumImage(models.Model):
 
     album = models.ForeignKey(Album, on_delete=models.CASCADE)
     image = models.ImageField(upload_to=get_image_path)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_mime = models.CharField(max_length=32, null=True, blank=True, editable=False)
+    image_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    image_status = models.CharField(max_length=1, choices=IMAGE_STATUS, default='R', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
                                    related_name='album_image_created_by')
@@ -135,6 +150,9 @@ class AlbumImage(models.Model):
         ''' Save instance '''
         save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name=None)
 
+        images = get_changed_images(self, {'image': MAX_ALBUM_IMAGE_DIMENSION})
+        clear_removed_image_metadata(self, ('image',))
+
         if self.pk is None:
             saved_image = self.image
             self.image = None
@@ -146,7 +164,7 @@ class AlbumImage(models.Model):
 
         super(AlbumImage, self).save(*args, **kwargs)
 
-        auto_downscale_image(self.image, threshold=MAX_ALBUM_IMAGE_DIMENSION)
+        schedule_image_processing(self, images)
 
 
 class Comment(models.Model):
@@ -159,6 +177,13 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True)
 
+    class Meta:
+        ''' Meta '''
+        indexes = (
+            models.Index(fields=('event', 'created_by', 'created_at')),
+            models.Index(fields=('event', 'ip_address', 'created_at'))
+        )
+
     def __str__(self):
         ''' String representation '''
         return '"{}", {}, {}'.format(truncate(self.text, max_length=32), self.written_by, self.event.__str__())
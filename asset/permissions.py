@@ -10,6 +10,8 @@ from rest_framework import permissions
 from asset.models import Announcement, Comment, Album, AlbumImage
 from clubs_and_events.settings import COMMENT_DELETE_TIME
 from core.permissions import IsInPubliclyVisibleCommunity, IsMemberOfCommunity, IsDeputyLeaderOfCommunity
+from core.permissions import filter_queryset_owner
+from membership.models import Membership
 
 
 class IsAbleToRetrieveAnnouncement(permissions.BasePermission):
@@ -23,6 +25,13 @@ class IsAbleToRetrieveAnnouncement(permissions.BasePermission):
                 return True
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Announcement):
+            return IsMemberOfCommunity().filter_queryset(request, queryset) \
+                   | IsInPubliclyVisibleCommunity().filter_queryset(request, queryset).filter(is_publicly_visible=True)
+        return queryset.none()
+
 
 class IsAbleToRetrieveAlbum(permissions.BasePermission):
     ''' Main permission of GET request of Album '''
@@ -38,6 +47,16 @@ class IsAbleToRetrieveAlbum(permissions.BasePermission):
                 return True
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Album):
+            return IsMemberOfCommunity().filter_queryset(request, queryset) \
+                   | queryset.filter(community_event_id__in=Membership.objects.filter(
+                       user_id=request.user.id, status__in=('A', 'R')
+                   ).values('community_id')) \
+                   | IsInPubliclyVisibleCommunity().filter_queryset(request, queryset).filter(is_publicly_visible=True)
+        return queryset.none()
+
 
 class IsAbleToRetrieveAlbumImage(permissions.BasePermission):
     ''' Main permission of GET request of AlbumImage '''
@@ -47,6 +66,12 @@ class IsAbleToRetrieveAlbumImage(permissions.BasePermission):
             return IsAbleToRetrieveAlbum().has_object_permission(request, view, obj.album)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, AlbumImage):
+            return queryset.filter(album__in=IsAbleToRetrieveAlbum().filter_queryset(request, Album.objects.all()))
+        return queryset.none()
+
 
 class IsAbleToDeleteComment(permissions.BasePermission):
     ''' Main permission of DELETE request of Comment '''
@@ -59,3 +84,11 @@ class IsAbleToDeleteComment(permissions.BasePermission):
             elif IsDeputyLeaderOfCommunity().has_object_permission(request, view, obj):
                 return True
         return False
+
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Comment):
+            return filter_queryset_owner(queryset, request, 'created_by').filter(
+                created_at__gt=timezone.now() - COMMENT_DELETE_TIME
+            ) | IsDeputyLeaderOfCommunity().filter_queryset(request, queryset)
+        return queryset.none()
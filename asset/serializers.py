@@ -16,6 +16,7 @@ from clubs_and_events.settings import COMMENT_LIMIT_PER_INTERVAL, COMMENT_INTERV
 from community.models import Event, CommunityEvent
 from community.permissions import IsPubliclyVisibleCommunity
 from core.permissions import IsStaffOfCommunity, IsMemberOfCommunity, IsInActiveCommunity
+from core.utils.files import get_image_variants
 from core.utils.general import has_instance
 from core.utils.serializer import add_error_message, validate_profanity_serializer, raise_validation_errors
 from core.utils.serializer import field_exists
@@ -189,12 +190,18 @@ class NotExistingAlbumSerializer(AlbumSerializerTemplate):
 
 class AlbumImageSerializer(serializers.ModelSerializer):
     ''' Album image serializer'''
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         ''' Meta '''
         model = AlbumImage
         fields = '__all__'
         read_only_fields = ('created_by',)
 
+    def get_variants(self, obj):
+        ''' Retrieve image variant URLs '''
+        return get_image_variants(obj, ('image',))
+
     def validate(self, data):
         ''' Validate data '''
         errors = dict()
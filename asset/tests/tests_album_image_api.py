@@ -6,11 +6,17 @@
 
 from django.contrib.auth import get_user_model
 from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from asset.models import Album, AlbumImage
 from community.models import Club
+from core.models import ImageJob
+from clubs_and_events.settings import IMAGE_VARIANT_SIZES, IMAGE_VARIANT_FORMATS, MAX_ALBUM_IMAGE_DIMENSION
+from clubs_and_events.settings import IMAGE_WORKER_LEASE, IMAGE_MAX_ATTEMPTS
+from core.utils.files import process_image_jobs, get_image_variant_name
 from membership.models import Membership
 
 
@@ -189,6 +195,110 @@ class AlbumImageAPITest(APITestCase):
         if username.strip() != str():
             self.client.logout()
 
+    def test_album_image_processing(self):
+        ''' Test processing uploaded album images in the image worker '''
+        image = AlbumImage.objects.create(album_id=self.album_public.id, image=ImageFile(open_image('01')))
+        self.assertEqual(image.image_status, 'P')
+        self.assertEqual(ImageJob.objects.filter(object_id=image.id, status='W').count(), 1)
+
+        image.save()
+        self.assertEqual(ImageJob.objects.filter(object_id=image.id).count(), 1)
+
+        self.assertIsNone(AlbumImage.objects.get(pk=image.id).image_hash)
+
+        self.assertEqual(process_image_jobs(), 1)
+        self.assertEqual(AlbumImage.objects.get(pk=image.id).image_status, 'R')
+        self.assertEqual(ImageJob.objects.get(object_id=image.id).status, 'D')
+        self.assertEqual(process_image_jobs(), 0)
+
+    def test_album_image_processing_failure(self):
+        ''' Test retrying failed image jobs until they run out of attempts '''
+        image = AlbumImage.objects.create(album_id=self.album_public.id, image=ImageFile(open_image('01')))
+        default_storage.delete(image.image.name)
+
+        self.assertEqual(process_image_jobs(), 1)
+        job = ImageJob.objects.get(object_id=image.id)
+        self.assertEqual(job.status, 'W')
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.next_attempt_at, timezone.now())
+        self.assertEqual(AlbumImage.objects.get(pk=image.id).image_status, 'P')
+        self.assertEqual(process_image_jobs(), 0)
+
+        ImageJob.objects.filter(pk=job.id).update(attempts=IMAGE_MAX_ATTEMPTS - 1, next_attempt_at=timezone.now())
+        self.assertEqual(process_image_jobs(), 1)
+        self.assertEqual(ImageJob.objects.get(pk=job.id).status, 'F')
+        self.assertEqual(AlbumImage.objects.get(pk=image.id).image_status, 'F')
+
+    def test_album_image_processing_expired_lease(self):
+        ''' Test reclaiming image jobs of a worker which stopped while processing them '''
+        image = AlbumImage.objects.create(album_id=self.album_public.id, image=ImageFile(open_image('01')))
+        ImageJob.objects.filter(object_id=image.id).update(status='P', claimed_at=timezone.now())
+        self.assertEqual(process_image_jobs(), 0)
+
+        ImageJob.objects.filter(object_id=image.id).update(claimed_at=timezone.now() - IMAGE_WORKER_LEASE * 2)
+        self.assertEqual(process_image_jobs(), 1)
+        self.assertEqual(ImageJob.objects.get(object_id=image.id).status, 'D')
+        self.assertEqual(AlbumImage.objects.get(pk=image.id).image_status, 'R')
+
+    def test_album_image_metadata(self):
+        ''' Test recording album image metadata once processed '''
+        image = AlbumImage.objects.create(album_id=self.album_public.id, image=ImageFile(open_image('01')))
+        process_image_jobs()
+        image = AlbumImage.objects.get(pk=image.id)
+
+        with default_storage.open(image.image.name, 'rb') as stored_image:
+            content = stored_image.read()
+        self.assertEqual(image.image_size, len(content))
+        self.assertEqual(image.image_mime, 'image/jpeg')
+        self.assertEqual(len(image.image_hash), 64)
+        self.assertLessEqual(image.image_width, MAX_ALBUM_IMAGE_DIMENSION[0])
+        self.assertLessEqual(image.image_height, MAX_ALBUM_IMAGE_DIMENSION[1])
+
+        response = self.client.get('/api/asset/album/image/{}/'.format(image.id))
+        self.assertEqual(response.data['image_size'], len(content))
+
+    def test_album_image_variants(self):
+        ''' Test generating and retrieving album image variants '''
+        self.client.login(username='user_01', password='12345678')
+
+        image = AlbumImage.objects.create(album_id=self.album_public.id, image=ImageFile(open_image('01')))
+        response = self.client.get('/api/asset/album/image/{}/'.format(image.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['variants']['image'])
+
+        process_image_jobs()
+        image = AlbumImage.objects.get(pk=image.id)
+
+        for i in IMAGE_VARIANT_SIZES:
+            for j in IMAGE_VARIANT_FORMATS:
+                self.assertTrue(default_storage.exists(get_image_variant_name(image.image.name, i, j)))
+
+        response = self.client.get('/api/asset/album/image/{}/'.format(image.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(response.data['variants']['image'].keys()), set(str(i) for i in IMAGE_VARIANT_SIZES)
+        )
+        self.assertEqual(
+            set(response.data['variants']['image'][str(IMAGE_VARIANT_SIZES[0])].keys()), set(IMAGE_VARIANT_FORMATS)
+        )
+
+        self.client.logout()
+
+    def test_album_image_variants_failed(self):
+        ''' Test retrieving album image variants after processing failed '''
+        self.client.login(username='user_01', password='12345678')
+
+        image = AlbumImage.objects.create(album_id=self.album_public.id, image=ImageFile(open_image('01')))
+        default_storage.delete(image.image.name)
+        ImageJob.objects.filter(object_id=image.id).update(attempts=IMAGE_MAX_ATTEMPTS - 1)
+        process_image_jobs()
+
+        response = self.client.get('/api/asset/album/image/{}/'.format(image.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['variants']['image'])
+
+        self.client.logout()
+
 
 def open_image(name, extension='jpg'):
     ''' Open test image '''
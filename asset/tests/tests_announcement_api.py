@@ -5,11 +5,13 @@
 '''
 
 from django.contrib.auth import get_user_model
+from django.core.files.images import ImageFile
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from asset.models import Announcement
 from community.models import Club
+from core.utils.files import process_image_jobs
 from membership.models import Membership
 
 
@@ -274,3 +276,18 @@ class AnnouncementAPITest(APITestCase):
 
         if username.strip() != str():
             self.client.logout()
+
+    def test_announcement_image_metadata_cleared(self):
+        ''' Test clearing image metadata once the announcement image is removed '''
+        announcement = Announcement.objects.create(
+            community_id=self.club_public.id, text='Greetings', image=ImageFile(open('asset/tests/img/01.jpg', 'rb'))
+        )
+        process_image_jobs()
+        announcement = Announcement.objects.get(pk=announcement.id)
+        self.assertIsNotNone(announcement.image_hash)
+
+        announcement.image = None
+        announcement.save()
+        announcement = Announcement.objects.get(pk=announcement.id)
+        for i in ('width', 'height', 'size', 'mime', 'hash'):
+            self.assertIsNone(getattr(announcement, 'image_{}'.format(i)))
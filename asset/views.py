@@ -15,7 +15,7 @@ from asset.serializers import ExistingAnnouncementSerializer, NotExistingAnnounc
 from asset.serializers import ExistingAlbumSerializer, NotExistingAlbumSerializer
 from asset.serializers import AlbumImageSerializer, CommentSerializer
 from core.permissions import IsStaffOfCommunity, IsInPubliclyVisibleCommunity, IsInActiveCommunity
-from core.utils.filters import filter_queryset, filter_queryset_permission, limit_queryset
+from core.utils.filters import filter_queryset, filter_queryset_permission, paginate_queryset
 from membership.models import Membership
 from notification.notifier import notify
 
@@ -50,11 +50,11 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
         queryset = filter_queryset(queryset, request, target_param='community', is_foreign_key=True)
         queryset = filter_queryset(queryset, request, target_param='is_publicly_visible', is_foreign_key=False)
-        queryset = limit_queryset(queryset, request)
+        queryset, headers = paginate_queryset(queryset, request)
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def create(self, request, *args, **kwargs):
         ''' Create announcement '''
@@ -112,10 +112,11 @@ class AlbumViewSet(viewsets.ModelViewSet):
         queryset = filter_queryset(queryset, request, target_param='is_publicly_visible', is_foreign_key=False)
         queryset = filter_queryset(queryset, request, target_param='community', is_foreign_key=True)
         queryset = filter_queryset(queryset, request, target_param='community_event', is_foreign_key=True)
+        queryset, headers = paginate_queryset(queryset, request)
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
 
 class AlbumImageViewSet(viewsets.ModelViewSet):
@@ -140,11 +141,11 @@ class AlbumImageViewSet(viewsets.ModelViewSet):
 
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
         queryset = filter_queryset(queryset, request, target_param='album', is_foreign_key=True)
-        queryset = limit_queryset(queryset, request)
+        queryset, headers = paginate_queryset(queryset, request)
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def create(self, request, *args, **kwargs):
         ''' Create album image '''
@@ -197,10 +198,11 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
         queryset = filter_queryset(queryset, request, target_param='event', is_foreign_key=True)
+        queryset, headers = paginate_queryset(queryset, request)
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def destroy(self, request, *args, **kwargs):
         ''' Disable instance '''
@@ -56,8 +56,8 @@ INSTALLED_APPS = [
     'asset',
     'category',
     'community',
-    'core',
-    'generator',
+    'core.apps.CoreConfig',
+    'generator.apps.GeneratorConfig',
     'membership',
     'misc',
     'notification',
@@ -166,6 +166,7 @@ AUTH_USER_MODEL = 'user.User'
 AUTHENTICATION_BACKENDS = [
    'user.authentication.AuthenticationBackend',
 ]
+LOGIN_THROTTLE_RATE = '10/min'
 
 
 # Django REST Framework Configuration
@@ -195,6 +196,11 @@ LDAP_USER_GROUPS = (
 LDAP_USERNAME_FIELD = 'sAMAccountName'
 LDAP_DISPLAY_NAME_FIELD = 'displayName'
 SHOW_LDAP_ERROR_MESSAGE = False
+LDAP_POOL_SIZE = 4
+LDAP_CONNECT_TIMEOUT = 5
+LDAP_RECEIVE_TIMEOUT = 10
+LDAP_UNKNOWN_USER_CACHE_TIMEOUT = 300
+LDAP_VERIFIED_CACHE_TIMEOUT = 900
 
 
 # Email Settings
@@ -212,6 +218,12 @@ EMAIL_NOTIFICATIONS = True
 EMAIL_DOMAIN_NAME = 'it.kmitl.ac.th'
 SEND_IMAGES_AS_ATTACHMENTS = False
 FRONT_END_URL = 'https://napontunglukmongkol.github.io/clubs-and-events-frontend/#/'
+NOTIFICATION_BATCH_SIZE = 1000
+MAIL_WORKER_BATCH_SIZE = 50
+MAIL_WORKER_IDLE_INTERVAL = 5
+MAIL_MAX_ATTEMPTS = 5
+MAIL_RETRY_DELAY = timedelta(minutes=1)
+MAIL_WORKER_LEASE = timedelta(minutes=10)
 
 
 # Media Path Settings
@@ -229,6 +241,14 @@ MAX_ALBUM_IMAGE_DIMENSION = 3840, 2160
 MAX_COMMUNITY_LOGO_DIMENSION = 1024, 1024
 MAX_COMMUNITY_BANNER_DIMENSION = 2560, 1440
 MAX_PROFILE_PICTURE_DIMENSION = 512, 512
+ASYNC_IMAGE_PROCESSING = True
+IMAGE_WORKER_BATCH_SIZE = 20
+IMAGE_WORKER_IDLE_INTERVAL = 5
+IMAGE_WORKER_LEASE = timedelta(minutes=10)
+IMAGE_MAX_ATTEMPTS = 5
+IMAGE_RETRY_DELAY = timedelta(minutes=1)
+IMAGE_VARIANT_SIZES = 64, 256, 1024
+IMAGE_VARIANT_FORMATS = 'webp', 'jpeg'
 
 
 # Club Approval and Renewal Settings
@@ -240,6 +260,11 @@ STUDENT_COMMITTEE_ADVISOR_NAME = 'ดร.อนันตพัฒน์ อน
 STUDENT_COMMITTEE_PRESIDENT_NAME = 'นายธนพนธ์ วงศ์ประเสริฐ'
 
 
+# Membership Settings
+
+PAST_MEMBERSHIPS_CACHE_TIMEOUT = 300
+
+
 # Comment Settings
 
 COMMENT_LIMIT_PER_INTERVAL = 2
@@ -252,9 +277,28 @@ COMMENT_DELETE_TIME = timedelta(minutes=15)
 VOTE_LIMIT_PER_EVENT = 3
 
 
+# QR Code Settings
+
+QR_CODE_SIZES = 128, 256, 512, 1024
+QR_CODE_DEFAULT_SIZE = 512
+QR_CODE_CACHE_MAX_AGE = 31536000
+
+
+# Document Generation Settings
+
+DOCX_WORKER_BATCH_SIZE = 20
+DOCX_WORKER_IDLE_INTERVAL = 5
+DOCX_WORKER_LEASE = timedelta(minutes=10)
+DOCX_ARCHIVE_CHUNK_SIZE = 64 * 1024
+
+
 # Natural Language Processing (NLP) Settings
 
 NLP_EN_MODEL = 'en_core_web_sm'
+NLP_WARM_UP = False
+PROFANITY_CACHE_SIZE = 10000
+PROFANITY_CACHE_ALIAS = None
+PROFANITY_CACHE_TIMEOUT = 86400
 
 
 # Google Cloud Storage
@@ -8,17 +8,60 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from category.models import ClubType, EventType, EventSeries
 from clubs_and_events.settings import STORAGE_BASE_DIR, MAX_COMMUNITY_LOGO_DIMENSION, MAX_COMMUNITY_BANNER_DIMENSION
-from core.utils.general import get_file_extension
-from core.utils.files import auto_downscale_image
+from core.utils.general import get_file_extension, get_subclass_lookup, get_subclass_query, join_lookups
+from core.utils.files import IMAGE_STATUS, clear_removed_image_metadata, get_changed_images, schedule_image_processing
 from core.utils.objects import save_user_attributes
+from core.utils.querysets import SubclassQuerySet
+
+
+class CommunityQuerySet(SubclassQuerySet):
+    ''' Community queryset '''
+    def annotate_validity(self):
+        ''' Annotate club validity as is_valid, which is false on communities other than clubs '''
+        lookup = get_subclass_lookup(self.model, Club)
+        if lookup is None:
+            return self.annotate(is_valid=models.Value(False, output_field=models.BooleanField()))
+
+        return self.annotate(is_valid=models.Case(
+            models.When(
+                Q(**{join_lookups(lookup, 'is_official'): True})
+                & Q(**{join_lookups(lookup, 'valid_through__gte'): timezone.now().date()}),
+                then=models.Value(True)
+            ),
+            default=models.Value(False),
+            output_field=models.BooleanField()
+        ))
+
+    def publicly_visible_for(self, user):
+        ''' Filter communities visible to a user, including invalid clubs and hidden communities if authenticated '''
+        if user is not None and user.is_authenticated:
+            return self
+
+        return self.filter(
+            Q(is_publicly_visible=True)
+            & get_subclass_query(str(), self.model, Club, is_official=True, valid_through__gte=timezone.now().date())
+            & get_subclass_query(str(), self.model, CommunityEvent, created_under__is_publicly_visible=True)
+        )
 
 
 class Community(models.Model):
     ''' Community model '''
+    TYPE_FIELD = 'community_type'
+    TYPE = 'community'
+    COMMUNITY_TYPES = (
+        ('community', 'Community'),
+        ('club', 'Club'),
+        ('event', 'Event'),
+        ('community_event', 'Community Event'),
+        ('lab', 'Lab'),
+    )
+
     def get_logo_path(self, file_name):
         ''' Get logo path '''
         return '{}/community/{}/logo.{}'.format(STORAGE_BASE_DIR, self.id, get_file_extension(file_name))
@@ -36,7 +79,18 @@ class Community(models.Model):
     description = models.TextField(max_length=1024, null=True, blank=True)
     external_links = models.TextField(max_length=512, null=True, blank=True)
     logo = models.ImageField(null=True, blank=True, upload_to=get_logo_path)
+    logo_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    logo_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    logo_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    logo_mime = models.CharField(max_length=32, null=True, blank=True, editable=False)
+    logo_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
     banner = models.ImageField(null=True, blank=True, upload_to=get_banner_path)
+    banner_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    banner_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    banner_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    banner_mime = models.CharField(max_length=32, null=True, blank=True, editable=False)
+    banner_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    image_status = models.CharField(max_length=1, choices=IMAGE_STATUS, default='R', editable=False)
 
     # Settings
     is_publicly_visible = models.BooleanField(default=False)
@@ -45,6 +99,11 @@ class Community(models.Model):
     # Status
     is_active = models.BooleanField(default=True)
 
+    # Type, the concrete model of the community, set on creation
+    community_type = models.CharField(
+        max_length=16, choices=COMMUNITY_TYPES, null=True, blank=True, default=None, editable=False
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -53,6 +112,8 @@ class Community(models.Model):
     updated_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
                                    related_name='community_updated_by')
 
+    objects = CommunityQuerySet.as_manager()
+
     def __str__(self):
         ''' String representation '''
         return '{}'.format(self.name_en)
@@ -84,7 +145,14 @@ class Community(models.Model):
         ''' Save instance '''
         save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name='updated_by')
 
+        images = get_changed_images(
+            self, {'logo': MAX_COMMUNITY_LOGO_DIMENSION, 'banner': MAX_COMMUNITY_BANNER_DIMENSION}
+        )
+        clear_removed_image_metadata(self, ('logo', 'banner'))
+
         if self.pk is None:
+            self.community_type = self.TYPE
+
             saved_logo, saved_banner = self.logo, self.banner
             self.logo, self.banner = None, None
             super(Community, self).save(*args, **kwargs)
@@ -95,12 +163,12 @@ class Community(models.Model):
 
         super(Community, self).save(*args, **kwargs)
 
-        auto_downscale_image(self.logo, threshold=MAX_COMMUNITY_LOGO_DIMENSION)
-        auto_downscale_image(self.banner, threshold=MAX_COMMUNITY_BANNER_DIMENSION)
+        schedule_image_processing(self, images)
 
 
 class Club(Community):
     ''' Club model '''
+    TYPE = 'club'
     STATUS = (
         ('R', 'Recruiting'),
         ('C', 'Closed'),
@@ -155,6 +223,8 @@ class Club(Community):
 
 class Event(Community):
     ''' Event model '''
+    TYPE = 'event'
+
     event_type = models.ForeignKey(EventType, on_delete=models.SET_NULL, null=True, blank=True)
     event_series = models.ForeignKey(EventSeries, on_delete=models.SET_NULL, null=True, blank=True)
     location = models.CharField(max_length=255)
@@ -181,6 +251,8 @@ class Event(Community):
 
 class CommunityEvent(Event):
     ''' Community event model '''
+    TYPE = 'community_event'
+
     created_under = models.ForeignKey(Community, on_delete=models.PROTECT)
     allows_outside_participators = models.BooleanField(default=False)
 
@@ -218,6 +290,7 @@ class CommunityEvent(Event):
 
 class Lab(Community):
     ''' Lab model '''
+    TYPE = 'lab'
     STATUS = (
         ('R', 'Recruiting'),
         ('C', 'Closed'),
@@ -6,13 +6,15 @@
 
 from datetime import datetime
 
+from django.db.models import Q
 from rest_framework import permissions
 
 from clubs_and_events.settings import CLUB_ADVANCED_RENEWAL
 from community.models import Community, Club, Event, CommunityEvent, Lab
 from core.permissions import IsDeputyLeaderOfCommunity, IsLeaderOfCommunity
-from core.utils.general import has_instance
+from core.utils.general import get_instance
 from core.utils.serializer import is_valid_club
+from core.utils.users import get_own_membership
 from membership.models import Membership
 from user.permissions import IsStudent, IsLecturer
 
@@ -26,6 +28,12 @@ class IsAbleToUpdateClub(permissions.BasePermission):
                    and IsDeputyLeaderOfCommunity().has_object_permission(request, view, obj)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Club) and IsStudent().has_permission(request, None):
+            return IsDeputyLeaderOfCommunity().filter_queryset(request, queryset)
+        return queryset.none()
+
 
 class IsAbleToDeleteClub(permissions.BasePermission):
     ''' Main permission of DELETE request of Club '''
@@ -37,6 +45,13 @@ class IsAbleToDeleteClub(permissions.BasePermission):
                    and IsDeletableClub().has_object_permission(request, view, obj)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Club) and IsStudent().has_permission(request, None):
+            return IsLeaderOfCommunity().filter_queryset(request, queryset) \
+                   & IsDeletableClub().filter_queryset(request, queryset)
+        return queryset.none()
+
 
 class IsAbleToDeleteEvent(permissions.BasePermission):
     ''' Main permission of DELETE request of Event '''
@@ -47,6 +62,13 @@ class IsAbleToDeleteEvent(permissions.BasePermission):
                    and IsDeletableEvent().has_object_permission(request, view, obj)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Event):
+            return IsLeaderOfCommunity().filter_queryset(request, queryset) \
+                   & IsDeletableEvent().filter_queryset(request, queryset)
+        return queryset.none()
+
 
 class IsAbleToUpdateCommunityEvent(permissions.BasePermission):
     ''' Main permission of PUT, PATCH request of CommunityEvent '''
@@ -57,6 +79,13 @@ class IsAbleToUpdateCommunityEvent(permissions.BasePermission):
                    or IsDeputyLeaderOfBaseCommunity().has_object_permission(request, view, obj)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, CommunityEvent):
+            return IsDeputyLeaderOfCommunity().filter_queryset(request, queryset) \
+                   | IsDeputyLeaderOfBaseCommunity().filter_queryset(request, queryset)
+        return queryset.none()
+
 
 class IsAbleToDeleteCommunityEvent(permissions.BasePermission):
     ''' Main permission of DELETE request of CommunityEvent '''
@@ -68,6 +97,14 @@ class IsAbleToDeleteCommunityEvent(permissions.BasePermission):
                    and IsDeletableCommunityEvent().has_object_permission(request, view, obj)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, CommunityEvent):
+            return (IsLeaderOfCommunity().filter_queryset(request, queryset)
+                    | IsLeaderOfBaseCommunity().filter_queryset(request, queryset)) \
+                   & IsDeletableCommunityEvent().filter_queryset(request, queryset)
+        return queryset.none()
+
 
 class IsAbleToUpdateLab(permissions.BasePermission):
     ''' Main permission of PUT, PATCH request of Lab '''
@@ -78,6 +115,12 @@ class IsAbleToUpdateLab(permissions.BasePermission):
                    and IsDeputyLeaderOfCommunity().has_object_permission(request, view, obj)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Lab) and IsLecturer().has_permission(request, None):
+            return IsDeputyLeaderOfCommunity().filter_queryset(request, queryset)
+        return queryset.none()
+
 
 class IsAbleToDeleteLab(permissions.BasePermission):
     ''' Main permission of DELETE request of Lab '''
@@ -89,6 +132,13 @@ class IsAbleToDeleteLab(permissions.BasePermission):
                    and IsDeletableLab().has_object_permission(request, view, obj)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Lab) and IsLecturer().has_permission(request, None):
+            return IsLeaderOfCommunity().filter_queryset(request, queryset) \
+                   & IsDeletableLab().filter_queryset(request, queryset)
+        return queryset.none()
+
 
 class IsPubliclyVisibleCommunity(permissions.BasePermission):
     ''' Community viewing availability permission '''
@@ -97,72 +147,94 @@ class IsPubliclyVisibleCommunity(permissions.BasePermission):
         if isinstance(obj, Community):
             if request.user.is_authenticated:
                 return True
-            elif has_instance(obj, Club):
-                club = Club.objects.get(pk=obj.id)
-                if not is_valid_club(club):
+
+            club = get_instance(obj, Club)
+            if club is not None:
+                is_valid = getattr(obj, 'is_valid', None)
+                if not (is_valid if is_valid is not None else is_valid_club(club)):
                     return False
-            elif has_instance(obj, CommunityEvent):
-                community_event = CommunityEvent.objects.get(pk=obj.id)
+                return obj.is_publicly_visible
+
+            community_event = get_instance(obj, CommunityEvent)
+            if community_event is not None:
                 return community_event.is_publicly_visible and community_event.created_under.is_publicly_visible
             return obj.is_publicly_visible
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if not issubclass(queryset.model, Community):
+            return queryset.none()
+        return queryset.publicly_visible_for(request.user)
+
 
 class IsLeaderOfBaseCommunity(permissions.BasePermission):
     ''' Leader of base community permission '''
     def has_object_permission(self, request, view, obj):
         ''' Check permission on object '''
         if isinstance(obj, CommunityEvent):
-            base_community = Community.objects.get(pk=obj.created_under.id)
-            base_membership = Membership.objects.filter(
-                user_id=request.user.id, position=3, community_id=base_community.id, status__in=('A', 'R')
-            )
-
-            return len(base_membership) == 1
+            return get_own_membership(request, obj.created_under_id, position=(3,)) is not None
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, CommunityEvent):
+            return queryset.filter(created_under_id__in=Membership.objects.filter(
+                user_id=request.user.id, position=3, status__in=('A', 'R')
+            ).values('community_id'))
+        return queryset.none()
+
 
 class IsDeputyLeaderOfBaseCommunity(permissions.BasePermission):
     ''' Deputy leader of base community permission '''
     def has_object_permission(self, request, view, obj):
         ''' Check permission on object '''
         if isinstance(obj, CommunityEvent):
-            base_community = Community.objects.get(pk=obj.created_under.id)
-            base_membership = Membership.objects.filter(
-                user_id=request.user.id, position__in=(2, 3), community_id=base_community.id, status__in=('A', 'R')
-            )
-
-            return len(base_membership) == 1
+            return get_own_membership(request, obj.created_under_id, position=(2, 3)) is not None
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, CommunityEvent):
+            return queryset.filter(created_under_id__in=Membership.objects.filter(
+                user_id=request.user.id, position__in=(2, 3), status__in=('A', 'R')
+            ).values('community_id'))
+        return queryset.none()
+
 
 class IsStaffOfBaseCommunity(permissions.BasePermission):
     ''' Staff of base community permission '''
     def has_object_permission(self, request, view, obj):
         ''' Check permission on object '''
         if isinstance(obj, CommunityEvent):
-            base_community = Community.objects.get(pk=obj.created_under.id)
-            base_membership = Membership.objects.filter(
-                user_id=request.user.id, position__in=(1, 2, 3), community_id=base_community.id, status__in=('A', 'R')
-            )
-
-            return len(base_membership) == 1
+            return get_own_membership(request, obj.created_under_id, position=(1, 2, 3)) is not None
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, CommunityEvent):
+            return queryset.filter(created_under_id__in=Membership.objects.filter(
+                user_id=request.user.id, position__in=(1, 2, 3), status__in=('A', 'R')
+            ).values('community_id'))
+        return queryset.none()
+
 
 class IsMemberOfBaseCommunity(permissions.BasePermission):
     ''' Member of base community permission '''
     def has_object_permission(self, request, view, obj):
         ''' Check permission on object '''
         if isinstance(obj, CommunityEvent):
-            base_community = Community.objects.get(pk=obj.created_under.id)
-            base_membership = Membership.objects.filter(
-                user_id=request.user.id, community_id=base_community.id, status__in=('A', 'R')
-            )
-
-            return len(base_membership) == 1
+            return get_own_membership(request, obj.created_under_id) is not None
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, CommunityEvent):
+            return queryset.filter(created_under_id__in=Membership.objects.filter(
+                user_id=request.user.id, status__in=('A', 'R')
+            ).values('community_id'))
+        return queryset.none()
+
 
 class IsRenewableClub(permissions.BasePermission):
     ''' Renewable club permission '''
@@ -173,6 +245,15 @@ class IsRenewableClub(permissions.BasePermission):
                    or datetime.now().date() >= (obj.valid_through - CLUB_ADVANCED_RENEWAL)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Club):
+            return queryset.filter(
+                Q(is_official=False) | Q(valid_through__isnull=True)
+                | Q(valid_through__lte=datetime.now().date() + CLUB_ADVANCED_RENEWAL)
+            )
+        return queryset.none()
+
 
 # TODO: Consider a better deletable condition
 class IsDeletableClub(permissions.BasePermission):
@@ -183,6 +264,12 @@ class IsDeletableClub(permissions.BasePermission):
             return True
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Club):
+            return queryset
+        return queryset.none()
+
 
 # TODO: Consider a better deletable condition
 class IsDeletableEvent(permissions.BasePermission):
@@ -193,6 +280,12 @@ class IsDeletableEvent(permissions.BasePermission):
             return True
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Event):
+            return queryset
+        return queryset.none()
+
 
 # TODO: Consider a better deletable condition
 class IsDeletableCommunityEvent(permissions.BasePermission):
@@ -203,6 +296,12 @@ class IsDeletableCommunityEvent(permissions.BasePermission):
             return True
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, CommunityEvent):
+            return queryset
+        return queryset.none()
+
 
 # TODO: Consider a better deletable condition
 class IsDeletableLab(permissions.BasePermission):
@@ -212,3 +311,9 @@ class IsDeletableLab(permissions.BasePermission):
         if isinstance(obj, Lab):
             return True
         return False
+
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Lab):
+            return queryset
+        return queryset.none()
@@ -15,10 +15,11 @@ from community.models import Community, Club, Event, CommunityEvent, Lab
 from community.permissions import IsRenewableClub, IsAbleToDeleteClub, IsAbleToDeleteEvent, IsPubliclyVisibleCommunity
 from community.permissions import IsMemberOfBaseCommunity, IsAbleToDeleteCommunityEvent, IsAbleToDeleteLab
 from core.permissions import IsMemberOfCommunity, IsStaffOfCommunity, IsInActiveCommunity
-from core.utils.general import has_instance
+from core.utils.files import get_image_variants
+from core.utils.general import has_instance, get_instance, get_type_model
 from core.utils.serializer import add_error_message, validate_profanity_serializer, raise_validation_errors
 from core.utils.serializer import field_exists, clean_field, is_valid_club, is_ended_event
-from core.utils.users import get_client_ip
+from core.utils.users import get_client_ip, get_own_membership
 from core.utils.nlp import is_th, is_en
 from membership.models import Membership, ApprovalRequest, Invitation, Request
 from misc.models import Vote
@@ -28,11 +29,12 @@ from user.permissions import IsStudent, IsLecturer
 class CommunitySerializerTemplate(serializers.ModelSerializer):
     ''' Community serializer template'''
     meta = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         ''' Meta '''
         model = Community
-        exclude = ('is_active',)
+        exclude = ('is_active', 'community_type')
         abstract = True
 
     def validate(self, data, get_errors=False):
@@ -121,38 +123,33 @@ class CommunitySerializerTemplate(serializers.ModelSerializer):
             'request_ability': self.get_request_ability(obj)
         }
 
+    def get_variants(self, obj):
+        ''' Retrieve logo and banner variant URLs '''
+        return get_image_variants(obj, ('logo', 'banner'))
+
     def get_community_type(self, obj):
         ''' Retrieve community type '''
-        if has_instance(obj, Club):
-            return 'club'
-        elif has_instance(obj, Event) and not has_instance(obj, CommunityEvent):
-            return 'event'
-        elif has_instance(obj, CommunityEvent):
-            return 'community_event'
-        elif has_instance(obj, Lab):
-            return 'lab'
+        type_model = get_type_model(obj)
 
+        if type_model is not None and type_model is not Community:
+            return type_model.TYPE
         return None
 
     def get_own_membership_id(self, obj):
         ''' Retrieve own membership ID '''
-        try:
-            membership = Membership.objects.get(
-                user_id=self.context['request'].user.id, community_id=obj.id, status__in=('A', 'R')
-            )
+        membership = get_own_membership(self.context['request'], obj.id, status=('A', 'R'))
+
+        if membership is not None:
             return membership.id
-        except Membership.DoesNotExist:
-            return None
+        return None
 
     def get_own_membership_position(self, obj):
         ''' Retrieve own membership position '''
-        try:
-            membership = Membership.objects.get(
-                user_id=self.context['request'].user.id, community_id=obj.id, status='A'
-            )
+        membership = get_own_membership(self.context['request'], obj.id, status=('A',))
+
+        if membership is not None:
             return membership.position
-        except Membership.DoesNotExist:
-            return None
+        return None
 
     def get_available_actions(self, obj):
         ''' Retrieve available actions '''
@@ -161,20 +158,13 @@ class CommunitySerializerTemplate(serializers.ModelSerializer):
         actions = list()
 
         # Standard actions
-        try:
-            # Fetch membership
-            membership = Membership.objects.get(user_id=user.id, community_id=obj.id, status__in=('A', 'R'))
+        membership = get_own_membership(request, obj.id, status=('A', 'R'))
 
+        if membership is not None:
             # Try retrieving base membership
-            if has_instance(obj, CommunityEvent):
-                try:
-                    base_membership = Membership.objects.get(
-                        user_id=user.id,
-                        community_id=CommunityEvent.objects.get(pk=obj.id).created_under.id,
-                        status__in=('A', 'R')
-                    )
-                except Membership.DoesNotExist:
-                    base_membership = None
+            community_event = get_instance(obj, CommunityEvent)
+            if community_event is not None:
+                base_membership = get_own_membership(request, community_event.created_under_id, status=('A', 'R'))
             else:
                 base_membership = None
 
@@ -221,8 +211,6 @@ class CommunitySerializerTemplate(serializers.ModelSerializer):
                         actions.append('cancel-approval-request')
                     except ApprovalRequest.DoesNotExist:
                         actions.append('send-approval-request')
-        except Membership.DoesNotExist:
-            pass
 
         # Commenting actions
         if isinstance(obj, Event):
@@ -230,8 +218,8 @@ class CommunitySerializerTemplate(serializers.ModelSerializer):
 
             if not IsPubliclyVisibleCommunity().has_object_permission(request, None, obj):
                 is_able_to_comment = False
-            if has_instance(obj, CommunityEvent):
-                community_event = CommunityEvent.objects.get(pk=obj.id)
+            community_event = get_instance(obj, CommunityEvent)
+            if community_event is not None:
                 if not community_event.allows_outside_participators:
                     if not IsMemberOfCommunity().has_object_permission(request, None, community_event):
                         is_able_to_comment = False
@@ -258,7 +246,7 @@ class CommunitySerializerTemplate(serializers.ModelSerializer):
         is_able_to_send_request, code, message, message_th = True, None, None, None
 
         # Joining Allowance
-        if not Community.objects.get(pk=obj.id).is_accepting_requests:
+        if not obj.is_accepting_requests:
             is_able_to_send_request = False
             code = 'restricted'
             message = 'This community does not accept requests.'
@@ -277,7 +265,7 @@ class CommunitySerializerTemplate(serializers.ModelSerializer):
                 message = 'Only students and lecturers are able to join the lab.'
                 message_th = 'เฉพาะนักศึกษาและอาจารย์เท่านั้นที่สามารถเข้าร่วมห้องปฏิบัติการได้'
         elif has_instance(obj, CommunityEvent):
-            community_event = CommunityEvent.objects.get(pk=obj.id)
+            community_event = get_instance(obj, CommunityEvent)
             if not community_event.allows_outside_participators:
                 if not IsMemberOfBaseCommunity().has_object_permission(request, None, community_event):
                     is_able_to_send_request = False
@@ -291,12 +279,14 @@ class CommunitySerializerTemplate(serializers.ModelSerializer):
             code = 'already_member'
             message = 'You are already a member of the community.'
             message_th = 'คุณเป็นสมาชิกอยู่แล้ว'
-        elif user.id in [i.invitee.id for i in Invitation.objects.filter(community_id=obj.id, status='W')]:
+        elif user.is_authenticated \
+                and Invitation.objects.filter(community_id=obj.id, invitee_id=user.id, status='W').exists():
             is_able_to_send_request = False
             code = 'pending_invitation'
             message = 'You already have a pending invitation from this community.'
             message_th = 'คุณมีคำเชิญที่ยังไม่ได้ตอบรับอยู่'
-        elif user.id in [i.user.id for i in Request.objects.filter(community_id=obj.id, status='W')]:
+        elif user.is_authenticated \
+                and Request.objects.filter(community_id=obj.id, user_id=user.id, status='W').exists():
             is_able_to_send_request = False
             code = 'pending_request'
             message = 'You have already sent a pending request to this community.'
@@ -322,7 +312,7 @@ class CommunitySerializer(CommunitySerializerTemplate):
     class Meta:
         ''' Meta '''
         model = Community
-        exclude = ('is_active', 'created_at', 'updated_at', 'created_by', 'updated_by')
+        exclude = ('is_active', 'community_type', 'created_at', 'updated_at', 'created_by', 'updated_by')
 
     def get_meta(self, obj):
         ''' Retrieve meta data '''
@@ -336,7 +326,7 @@ class OfficialClubSerializer(CommunitySerializerTemplate):
     class Meta:
         ''' Meta '''
         model = Club
-        exclude = ('is_active', 'created_at', 'updated_at', 'created_by', 'updated_by')
+        exclude = ('is_active', 'community_type', 'created_at', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('is_official', 'valid_through')
 
     def validate(self, data, get_errors=False):
@@ -352,7 +342,9 @@ class OfficialClubSerializer(CommunitySerializerTemplate):
     def get_meta(self, obj):
         ''' Retrieve meta data '''
         meta = super(OfficialClubSerializer, self).get_meta(obj)
-        meta['is_valid'] = is_valid_club(obj)
+        meta['is_valid'] = getattr(obj, 'is_valid', None)
+        if meta['is_valid'] is None:
+            meta['is_valid'] = is_valid_club(obj)
 
         return meta
 
@@ -362,8 +354,8 @@ class UnofficialClubSerializer(CommunitySerializerTemplate):
     class Meta:
         ''' Meta '''
         model = Club
-        exclude = ('url_id', 'is_publicly_visible', 'room', 'is_active', 'created_at', 'updated_at', 'created_by',
-                   'updated_by')
+        exclude = ('url_id', 'is_publicly_visible', 'room', 'is_active', 'community_type', 'created_at', 'updated_at',
+                   'created_by', 'updated_by')
         read_only_fields = ('is_official', 'valid_through')
 
     def get_meta(self, obj):
@@ -380,7 +372,7 @@ class EventSerializerTemplate(CommunitySerializerTemplate):
     class Meta:
         ''' Meta '''
         model = Event
-        exclude = ('is_active',)
+        exclude = ('is_active', 'community_type')
 
     def get_meta(self, obj):
         ''' Retrieve meta data '''
@@ -436,7 +428,7 @@ class ApprovedEventSerializer(EventSerializerTemplate):
     class Meta:
         ''' Meta '''
         model = Event
-        exclude = ('is_active', 'created_at', 'updated_at', 'created_by', 'updated_by')
+        exclude = ('is_active', 'community_type', 'created_at', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('is_approved',)
 
     def get_meta(self, obj):
@@ -473,7 +465,8 @@ class UnapprovedEventSerializer(EventSerializerTemplate):
     class Meta:
         ''' Meta '''
         model = Event
-        exclude = ('is_active', 'url_id', 'is_publicly_visible', 'created_at', 'updated_at', 'created_by', 'updated_by')
+        exclude = ('is_active', 'community_type', 'url_id', 'is_publicly_visible', 'created_at', 'updated_at',
+                   'created_by', 'updated_by')
         read_only_fields = ('is_approved',)
 
 
@@ -484,7 +477,7 @@ class ExistingCommunityEventSerializer(EventSerializerTemplate):
     class Meta:
         ''' Meta '''
         model = CommunityEvent
-        exclude = ('is_active', 'created_at', 'updated_at', 'created_by', 'updated_by')
+        exclude = ('is_active', 'community_type', 'created_at', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('is_approved', 'created_under')
 
     def get_meta(self, obj):
@@ -526,7 +519,7 @@ class NotExistingCommunityEventSerializer(EventSerializerTemplate):
     class Meta:
         ''' Meta '''
         model = CommunityEvent
-        exclude = ('is_active', 'created_at', 'updated_at', 'created_by', 'updated_by')
+        exclude = ('is_active', 'community_type', 'created_at', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('is_approved',)
 
     def validate(self, data, get_errors=False):
@@ -571,7 +564,7 @@ class LabSerializer(CommunitySerializerTemplate):
     class Meta:
         ''' Meta '''
         model = Lab
-        exclude = ('is_active', 'created_at', 'updated_at', 'created_by', 'updated_by')
+        exclude = ('is_active', 'community_type', 'created_at', 'updated_at', 'created_by', 'updated_by')
 
     def validate(self, data, get_errors=False):
         ''' Validate data '''
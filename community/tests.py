@@ -5,11 +5,15 @@
 '''
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from community.models import Community, Club, Event, CommunityEvent, Lab
-from core.utils.general import get_random_string
+from core.utils.general import get_random_string, has_instance
+from core.utils.serializer import is_valid_club
 from membership.models import Membership
 
 import datetime
@@ -656,3 +660,142 @@ class CommunityAPITest(APITestCase):
 
         if username.strip() != str():
             self.client.logout()
+
+
+class CommunityQuerySetTest(APITestCase):
+    ''' Community queryset test '''
+    def setUp(self):
+        ''' Set up '''
+        self.user_01 = get_user_model().objects.create_user(username='user_01', password='12345678', name='User One')
+
+        self.club_valid = Club.objects.create(
+            name_th='ชุมนุมทดสอบคิวรี 1', name_en='Queryset Testing Club 1', is_publicly_visible=True,
+            is_official=True, valid_through=datetime.date(2099, 7, 31)
+        )
+        self.club_expired = Club.objects.create(
+            name_th='ชุมนุมทดสอบคิวรี 2', name_en='Queryset Testing Club 2', is_publicly_visible=True,
+            is_official=True, valid_through=datetime.date(2000, 7, 31)
+        )
+        self.club_private = Club.objects.create(
+            name_th='ชุมนุมทดสอบคิวรี 3', name_en='Queryset Testing Club 3', is_publicly_visible=False
+        )
+        self.event = Event.objects.create(
+            name_th='กิจกรรมทดสอบคิวรี', name_en='Queryset Testing Event', is_approved=True,
+            location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1), end_date=datetime.date(2020, 12, 2),
+            start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0), is_publicly_visible=True
+        )
+        self.community_event_public = CommunityEvent.objects.create(
+            name_th='กิจกรรมชุมนุมทดสอบคิวรี 1', name_en='Queryset Testing Community Event 1', is_approved=True,
+            location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1), end_date=datetime.date(2020, 12, 2),
+            start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0), is_publicly_visible=True,
+            created_under_id=self.club_valid.id
+        )
+        self.community_event_hidden = CommunityEvent.objects.create(
+            name_th='กิจกรรมชุมนุมทดสอบคิวรี 2', name_en='Queryset Testing Community Event 2', is_approved=True,
+            location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1), end_date=datetime.date(2020, 12, 2),
+            start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0), is_publicly_visible=True,
+            created_under_id=self.club_private.id
+        )
+        self.lab = Lab.objects.create(
+            name_th='ห้องปฏิบัติการทดสอบคิวรี', name_en='Queryset Testing Lab', is_publicly_visible=True
+        )
+
+    def test_annotate_validity(self):
+        ''' Test club validity annotation '''
+        expected = {i.id: is_valid_club(i) for i in Club.objects.all()}
+
+        for i in Community.objects.annotate_validity():
+            self.assertEqual(i.is_valid, expected.get(i.id, False))
+        for i in Club.objects.annotate_validity():
+            self.assertEqual(i.is_valid, expected[i.id])
+        for i in Lab.objects.annotate_validity():
+            self.assertFalse(i.is_valid)
+
+    def test_publicly_visible_for(self):
+        ''' Test publicly visible communities '''
+        user = get_user_model().objects.get(pk=self.user_01.id)
+
+        for model in (Community, Club, Event, CommunityEvent, Lab):
+            self.assertEqual(
+                sorted(i.id for i in model.objects.publicly_visible_for(AnonymousUser())),
+                sorted(i.id for i in model.objects.all() if self._is_publicly_visible(i))
+            )
+            self.assertEqual(model.objects.publicly_visible_for(user).count(), model.objects.count())
+
+    def _is_publicly_visible(self, obj):
+        ''' Check public visibility of a community without the queryset '''
+        if has_instance(obj, Club):
+            return obj.is_publicly_visible and is_valid_club(Club.objects.get(pk=obj.id))
+        elif has_instance(obj, CommunityEvent):
+            return obj.is_publicly_visible and CommunityEvent.objects.get(pk=obj.id).created_under.is_publicly_visible
+        return obj.is_publicly_visible
+
+    def test_list_community_queries(self):
+        ''' Test listing communities unauthenticated in a constant amount of queries '''
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/community/community/')
+        self.assertEqual(len(response.data), 4)
+        query_count = len(context.captured_queries)
+
+        for i in range(5):
+            Lab.objects.create(
+                name_th='ห้องปฏิบัติการทดสอบคิวรี {}'.format(i), name_en='Queryset Testing Lab {}'.format(i),
+                is_publicly_visible=True
+            )
+
+        with self.assertNumQueries(query_count):
+            response = self.client.get('/api/community/community/')
+        self.assertEqual(len(response.data), 9)
+
+
+class CommunityTypeTest(APITestCase):
+    ''' Community type test '''
+    def setUp(self):
+        ''' Set up '''
+        self.club = Club.objects.create(name_th='ชุมนุมทดสอบประเภท', name_en='Type Testing Club')
+        self.event = Event.objects.create(
+            name_th='กิจกรรมทดสอบประเภท', name_en='Type Testing Event', is_approved=True,
+            location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1), end_date=datetime.date(2020, 12, 2),
+            start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0)
+        )
+        self.community_event = CommunityEvent.objects.create(
+            name_th='กิจกรรมชุมนุมทดสอบประเภท', name_en='Type Testing Community Event', is_approved=True,
+            location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1), end_date=datetime.date(2020, 12, 2),
+            start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0), created_under_id=self.club.id
+        )
+        self.lab = Lab.objects.create(name_th='ห้องปฏิบัติการทดสอบประเภท', name_en='Type Testing Lab')
+
+    def test_community_type(self):
+        ''' Test community type set on creation '''
+        self.assertEqual(
+            dict(Community.objects.values_list('id', 'community_type')), {
+                self.club.id: 'club', self.event.id: 'event', self.community_event.id: 'community_event',
+                self.lab.id: 'lab'
+            }
+        )
+
+        self.club.name_en = 'Type Testing Club (Renamed)'
+        self.club.save()
+        self.assertEqual(Community.objects.get(pk=self.club.id).community_type, 'club')
+
+    def test_has_instance(self):
+        ''' Test checking community instances by the community type '''
+        communities = {i.id: i for i in Community.objects.all()}
+
+        with self.assertNumQueries(0):
+            self.assertTrue(has_instance(communities[self.club.id], Club))
+            self.assertFalse(has_instance(communities[self.club.id], Event))
+            self.assertTrue(has_instance(communities[self.community_event.id], Event))
+            self.assertTrue(has_instance(communities[self.community_event.id], CommunityEvent))
+            self.assertFalse(has_instance(communities[self.event.id], CommunityEvent))
+            self.assertTrue(has_instance(communities[self.lab.id], Lab))
+
+    def test_select_subclasses(self):
+        ''' Test selecting communities as instances of their concrete models '''
+        with self.assertNumQueries(5):
+            communities = Community.objects.order_by('id').select_subclasses()
+        self.assertEqual([type(i) for i in communities], [Club, Event, CommunityEvent, Lab])
+
+        with self.assertNumQueries(2):
+            events = Event.objects.order_by('id').select_subclasses()
+        self.assertEqual([type(i) for i in events], [Event, CommunityEvent])
@@ -6,8 +6,8 @@
 
 from datetime import datetime
 
+from django.db.models import Q
 from rest_framework import filters, permissions, status, viewsets, generics
-from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from community.models import Community, Club, Event, CommunityEvent, Lab
@@ -19,9 +19,8 @@ from community.serializers import ApprovedEventSerializer, UnapprovedEventSerial
 from community.serializers import ExistingCommunityEventSerializer, NotExistingCommunityEventSerializer
 from community.serializers import LabSerializer
 from core.permissions import IsDeputyLeaderOfCommunity, IsMemberOfCommunity, IsInActiveCommunity
-from core.utils.filters import filter_queryset, filter_queryset_permission, filter_queryset_exclude_own, limit_queryset
-from core.utils.filters import exclude_queryset
-from core.utils.serializer import is_valid_club
+from core.utils.filters import QueryFilter, filter_queryset_specification, filter_queryset_permission
+from core.utils.filters import get_own_community_query, get_valid_club_query, paginate_queryset
 from membership.models import Membership
 from notification.notifier import notify
 from user.permissions import IsStudent, IsLecturer
@@ -29,23 +28,32 @@ from user.permissions import IsStudent, IsLecturer
 
 class CommunityViewSet(viewsets.ModelViewSet):
     ''' Community view set'''
-    queryset = Community.objects.filter(is_active=True)
+    queryset = Community.objects.filter(is_active=True).select_related(
+        'club', 'event', 'event__communityevent', 'event__communityevent__created_under', 'lab'
+    )
     permission_classes = (IsPubliclyVisibleCommunity,)
     serializer_class = CommunitySerializer
     http_method_names = ('get', 'head', 'options')
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name_th', 'name_en', 'description')
+    query_filters = (
+        QueryFilter('status'),
+        QueryFilter('url_id'),
+        QueryFilter('exclude_own', exclude=True, query=get_own_community_query, is_negatable=False),
+        QueryFilter('status_exclude', field='status', exclude=True),
+    )
+
+    def get_queryset(self):
+        ''' Get queryset '''
+        return super(CommunityViewSet, self).get_queryset().annotate_validity()
 
     def list(self, request, *args, **kwargs):
         ''' List communities '''
         queryset = self.filter_queryset(self.get_queryset())
 
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
-        queryset = filter_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='url_id', is_foreign_key=False)
-        queryset = filter_queryset_exclude_own(queryset, request)
-        queryset = exclude_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = limit_queryset(queryset, request)
+        queryset = filter_queryset_specification(queryset, request, self.query_filters)
+        queryset, headers = paginate_queryset(queryset, request)
 
         if request.query_params.get('url_id') is not None and len(queryset) == 0:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -54,7 +62,7 @@ class CommunityViewSet(viewsets.ModelViewSet):
         else:
             serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def destroy(self, request, *args, **kwargs):
         ''' Disable instance '''
@@ -71,6 +79,15 @@ class ClubViewSet(viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'put', 'patch', 'delete', 'head', 'options')
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name_th', 'name_en', 'description')
+    query_filters = (
+        QueryFilter('club_type', field='club_type_id'),
+        QueryFilter('is_official'),
+        QueryFilter('status'),
+        QueryFilter('url_id'),
+        QueryFilter('exclude_own', exclude=True, query=get_own_community_query, is_negatable=False),
+        QueryFilter('status_exclude', field='status', exclude=True),
+        QueryFilter('is_valid', query=get_valid_club_query),
+    )
 
     def get_permissions(self):
         ''' Get permissions '''
@@ -84,6 +101,10 @@ class ClubViewSet(viewsets.ModelViewSet):
             return (permissions.IsAuthenticated(), IsAbleToDeleteClub())
         return tuple()
 
+    def get_queryset(self):
+        ''' Get queryset '''
+        return super(ClubViewSet, self).get_queryset().annotate_validity()
+
     def get_serializer_class(self):
         ''' Get serializer class '''
         try:
@@ -98,24 +119,8 @@ class ClubViewSet(viewsets.ModelViewSet):
         queryset = self.filter_queryset(self.get_queryset())
 
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
-        queryset = filter_queryset(queryset, request, target_param='club_type', is_foreign_key=True)
-        queryset = filter_queryset(queryset, request, target_param='is_official', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='url_id', is_foreign_key=False)
-        queryset = filter_queryset_exclude_own(queryset, request)
-        queryset = exclude_queryset(queryset, request, target_param='status', is_foreign_key=False)
-
-        try:
-            query = request.query_params.get('is_valid')
-            if query is not None:
-                if eval(query) == True:
-                    queryset = [i for i in queryset if is_valid_club(i)]
-                else:
-                    queryset = [i for i in queryset if not is_valid_club(i)]
-        except (ValueError, ValidationError):
-            queryset = None
-
-        queryset = limit_queryset(queryset, request)
+        queryset = filter_queryset_specification(queryset, request, self.query_filters)
+        queryset, headers = paginate_queryset(queryset, request)
 
         if request.query_params.get('url_id') is not None and len(queryset) == 0:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -124,7 +129,7 @@ class ClubViewSet(viewsets.ModelViewSet):
         else:
             serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def create(self, request, *args, **kwargs):
         ''' Create club '''
@@ -152,6 +157,18 @@ class EventViewSet(viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'put', 'patch', 'delete', 'head', 'options')
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name_th', 'name_en', 'description', 'location')
+    query_filters = (
+        QueryFilter('event_type', field='event_type_id'),
+        QueryFilter('event_series', field='event_series_id'),
+        QueryFilter('is_approved'),
+        QueryFilter('is_cancelled'),
+        QueryFilter('url_id'),
+        QueryFilter('exclude_own', exclude=True, query=get_own_community_query, is_negatable=False),
+        QueryFilter('status_exclude', field='status', exclude=True),
+        QueryFilter(
+            'exclude_community_events', exclude=True, query=Q(communityevent__isnull=False), is_negatable=False
+        ),
+    )
 
     def get_permissions(self):
         ''' Get permissions '''
@@ -179,23 +196,8 @@ class EventViewSet(viewsets.ModelViewSet):
         queryset = self.filter_queryset(self.get_queryset())
 
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
-        queryset = filter_queryset(queryset, request, target_param='event_type', is_foreign_key=True)
-        queryset = filter_queryset(queryset, request, target_param='event_series', is_foreign_key=True)
-        queryset = filter_queryset(queryset, request, target_param='is_approved', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='is_cancelled', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='url_id', is_foreign_key=False)
-        queryset = filter_queryset_exclude_own(queryset, request)
-        queryset = exclude_queryset(queryset, request, target_param='status', is_foreign_key=False)
-
-        try:
-            query = request.query_params.get('exclude_community_events')
-            if query is not None and eval(query):
-                community_event_list = [i.id for i in CommunityEvent.objects.all()]
-                queryset = queryset.exclude(pk__in=community_event_list)
-        except ValueError:
-            queryset = None
-
-        queryset = limit_queryset(queryset, request)
+        queryset = filter_queryset_specification(queryset, request, self.query_filters)
+        queryset, headers = paginate_queryset(queryset, request)
 
         if request.query_params.get('url_id') is not None and len(queryset) == 0:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -204,7 +206,7 @@ class EventViewSet(viewsets.ModelViewSet):
         else:
             serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def create(self, request, *args, **kwargs):
         ''' Create event '''
@@ -232,6 +234,17 @@ class CommunityEventViewSet(viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'put', 'patch', 'delete', 'head', 'options')
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name_th', 'name_en', 'description', 'location')
+    query_filters = (
+        QueryFilter('event_type', field='event_type_id'),
+        QueryFilter('event_series', field='event_series_id'),
+        QueryFilter('is_approved'),
+        QueryFilter('is_cancelled'),
+        QueryFilter('created_under', field='created_under_id'),
+        QueryFilter('allows_outside_participators'),
+        QueryFilter('url_id'),
+        QueryFilter('exclude_own', exclude=True, query=get_own_community_query, is_negatable=False),
+        QueryFilter('status_exclude', field='status', exclude=True),
+    )
 
     def get_permissions(self):
         ''' Get permissions '''
@@ -259,16 +272,8 @@ class CommunityEventViewSet(viewsets.ModelViewSet):
         queryset = self.filter_queryset(self.get_queryset())
 
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
-        queryset = filter_queryset(queryset, request, target_param='event_type', is_foreign_key=True)
-        queryset = filter_queryset(queryset, request, target_param='event_series', is_foreign_key=True)
-        queryset = filter_queryset(queryset, request, target_param='is_approved', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='is_cancelled', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='created_under', is_foreign_key=True)
-        queryset = filter_queryset(queryset, request, target_param='allows_outside_participators', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='url_id', is_foreign_key=False)
-        queryset = filter_queryset_exclude_own(queryset, request)
-        queryset = exclude_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = limit_queryset(queryset, request)
+        queryset = filter_queryset_specification(queryset, request, self.query_filters)
+        queryset, headers = paginate_queryset(queryset, request)
 
         if request.query_params.get('url_id') is not None and len(queryset) == 0:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -277,7 +282,7 @@ class CommunityEventViewSet(viewsets.ModelViewSet):
         else:
             serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def create(self, request, *args, **kwargs):
         ''' Create community event '''
@@ -315,6 +320,12 @@ class LabViewSet(viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'put', 'patch', 'delete', 'head', 'options')
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name_th', 'name_en', 'description', 'tags')
+    query_filters = (
+        QueryFilter('status'),
+        QueryFilter('url_id'),
+        QueryFilter('exclude_own', exclude=True, query=get_own_community_query, is_negatable=False),
+        QueryFilter('status_exclude', field='status', exclude=True),
+    )
 
     def get_permissions(self):
         ''' Get permissions '''
@@ -333,11 +344,8 @@ class LabViewSet(viewsets.ModelViewSet):
         queryset = self.filter_queryset(self.get_queryset())
 
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
-        queryset = filter_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='url_id', is_foreign_key=False)
-        queryset = filter_queryset_exclude_own(queryset, request)
-        queryset = exclude_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = limit_queryset(queryset, request)
+        queryset = filter_queryset_specification(queryset, request, self.query_filters)
+        queryset, headers = paginate_queryset(queryset, request)
 
         if request.query_params.get('url_id') is not None and len(queryset) == 0:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -346,7 +354,7 @@ class LabViewSet(viewsets.ModelViewSet):
         else:
             serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def create(self, request, *args, **kwargs):
         ''' Create lab '''
@@ -376,9 +384,7 @@ class MyCommunityView(generics.ListAPIView):
 
     def list(self, request, *args, **kwargs):
         ''' Retrieve own communities '''
-        queryset = self.get_queryset().filter(
-            id__in=[i.id for i in self.get_queryset() if IsMemberOfCommunity().has_object_permission(request, None, i)]
-        )
+        queryset = IsMemberOfCommunity().filter_queryset(request, self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
 
         return Response(serializer.data)
@@ -394,20 +400,16 @@ class MyEventView(generics.ListAPIView):
     ''' My event view '''
     queryset = Event.objects.filter(is_active=True)
     serializer_class = ApprovedEventSerializer
+    query_filters = (
+        QueryFilter(
+            'exclude_community_events', exclude=True, query=Q(communityevent__isnull=False), is_negatable=False
+        ),
+    )
 
     def list(self, request, *args, **kwargs):
         ''' Retrieve own events '''
-        queryset = self.get_queryset().filter(
-            id__in=[i.id for i in self.get_queryset() if IsMemberOfCommunity().has_object_permission(request, None, i)]
-        )
-
-        try:
-            query = request.query_params.get('exclude_community_events')
-            if query is not None and eval(query):
-                community_event_list = [i.id for i in CommunityEvent.objects.all()]
-                queryset = queryset.exclude(pk__in=community_event_list)
-        except ValueError:
-            queryset = None
+        queryset = IsMemberOfCommunity().filter_queryset(request, self.get_queryset())
+        queryset = filter_queryset_specification(queryset, request, self.query_filters)
 
         serializer = self.get_serializer(queryset, many=True)
 
@@ -7,5 +7,20 @@
 from django.contrib import admin
 from django.contrib.auth.models import Permission
 
+from core.models import ImageJob
+
+
+class ImageJobAdmin(admin.ModelAdmin):
+    ''' Image job admin '''
+    list_display = ('content_type', 'object_id', 'field_name', 'status', 'attempts', 'next_attempt_at', 'updated_at')
+    readonly_fields = ('attempts', 'next_attempt_at', 'claimed_at', 'last_error', 'created_at', 'updated_at')
+    list_filter = ('status',)
+    list_per_page = 20
+
+    def has_add_permission(self, request):
+        ''' Restricts add permission '''
+        return False
+
 
 admin.site.register(Permission)
+admin.site.register(ImageJob, ImageJobAdmin)
@@ -6,7 +6,27 @@
 
 from django.apps import AppConfig
 
+from clubs_and_events.settings import NLP_WARM_UP
+
 
 class CoreConfig(AppConfig):
     ''' Core application configuration '''
     name = 'core'
+
+    def ready(self):
+        ''' Warm up the natural language processing pipelines if enabled, and connect image variant cleanup '''
+        from django_cleanup.signals import cleanup_post_delete
+
+        cleanup_post_delete.connect(delete_file_variants, dispatch_uid='core_delete_file_variants')
+
+        if NLP_WARM_UP:
+            from core.utils.nlp import get_nlp_en
+            get_nlp_en()
+
+
+def delete_file_variants(sender, file=None, **kwargs):
+    ''' Delete the image variants stored alongside a file removed by the cleanup '''
+    from core.utils.files import delete_image_variants
+
+    if file is not None and file.name:
+        delete_image_variants(file.name)
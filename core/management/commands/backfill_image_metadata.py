@@ -0,0 +1,49 @@
+'''
+    Core Application Backfill Image Metadata Command
+    core/management/commands/backfill_image_metadata.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from asset.models import Announcement, AlbumImage
+from community.models import Community
+from core.utils.files import get_stored_image_metadata, get_image_metadata_fields
+from core.utils.logs import log, warning
+from generator.models import QRCode
+from misc.models import FAQ
+
+
+class Command(BaseCommand):
+    ''' Records image metadata columns of images uploaded before the metadata was recorded on upload '''
+    help = 'Backfills width, height, size, MIME type and hash of existing images.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--force', action='store_true', help='Also refresh images with metadata already recorded')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        images = ((Announcement, 'image'), (AlbumImage, 'image'), (Community, 'logo'), (Community, 'banner'),
+                  (get_user_model(), 'profile_picture'), (FAQ, 'image'), (QRCode, 'image'))
+
+        for model, field_name in images:
+            rows = model.objects.exclude(**{field_name: str()}).exclude(**{'{}__isnull'.format(field_name): True})
+            if not options['force']:
+                rows = rows.filter(**{'{}_hash__isnull'.format(field_name): True})
+            rows = rows.values_list('pk', field_name).iterator()
+            recorded, failed = 0, 0
+
+            for pk, name in rows:
+                try:
+                    metadata = get_stored_image_metadata(name)
+                except (OSError, ValueError) as exception:
+                    warning('{}.{}: unable to read \'{}\' ({})'.format(model.__name__, field_name, name, exception))
+                    failed += 1
+                    continue
+
+                model.objects.filter(pk=pk).update(**get_image_metadata_fields(field_name, metadata))
+                recorded += 1
+
+            log('{}.{}: {} recorded, {} failed'.format(model.__name__, field_name, recorded, failed))
@@ -0,0 +1,61 @@
+'''
+    Core Application Backfill Image Variants Command
+    core/management/commands/backfill_image_variants.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from asset.models import AlbumImage
+from clubs_and_events.settings import IMAGE_VARIANT_SIZES, IMAGE_VARIANT_FORMATS
+from community.models import Community
+from core.utils.files import generate_image_variants, get_image_variant_name
+from core.utils.logs import log, warning
+
+
+class Command(BaseCommand):
+    ''' Generates thumbnail variants of images uploaded before variants were generated on upload '''
+    help = 'Backfills thumbnail variants of existing album images, logos, banners and profile pictures.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument(
+            '--skip-existing', action='store_true', help='Skip images of which every variant already exists'
+        )
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        images = ((AlbumImage, 'image'), (Community, 'logo'), (Community, 'banner'),
+                  (get_user_model(), 'profile_picture'))
+
+        for model, field_name in images:
+            names = model.objects.exclude(**{field_name: str()}).exclude(**{'{}__isnull'.format(field_name): True})
+            names = names.values_list(field_name, flat=True).iterator()
+            generated, skipped, failed = 0, 0, 0
+
+            for name in names:
+                if options['skip_existing'] and self.has_variants(name):
+                    skipped += 1
+                    continue
+
+                try:
+                    generate_image_variants(name)
+                    generated += 1
+                except (OSError, ValueError) as exception:
+                    warning('{}.{}: unable to generate variants of \'{}\' ({})'.format(
+                        model.__name__, field_name, name, exception
+                    ))
+                    failed += 1
+
+            log('{}.{}: {} generated, {} skipped, {} failed'.format(
+                model.__name__, field_name, generated, skipped, failed
+            ))
+
+    def has_variants(self, name):
+        ''' Check if every variant of an image already exists in the storage '''
+        return all(
+            default_storage.exists(get_image_variant_name(name, i, j))
+            for i in IMAGE_VARIANT_SIZES for j in IMAGE_VARIANT_FORMATS
+        )
@@ -0,0 +1,36 @@
+'''
+    Core Application Backfill Types Command
+    core/management/commands/backfill_types.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from community.models import Community
+from core.utils.general import get_subclasses
+from core.utils.logs import log
+from notification.models import Notification
+
+
+class Command(BaseCommand):
+    ''' Fills in type fields of communities and notifications created before the type fields existed '''
+    help = 'Backfills community and notification types of existing rows.'
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        for i in (Community, Notification):
+            with transaction.atomic():
+                self.backfill(i)
+
+    def backfill(self, model):
+        ''' Backfill a type field of a model, most derived models first so that each row gets its concrete type '''
+        subclasses = sorted(get_subclasses(model), key=lambda i: len(i._meta.get_parent_list()), reverse=True)
+
+        for i in subclasses:
+            queryset = model.objects.filter(**{'{}__isnull'.format(model.TYPE_FIELD): True})
+            if i is not model:
+                queryset = queryset.filter(pk__in=i.objects.values('pk'))
+
+            count = queryset.update(**{model.TYPE_FIELD: i.TYPE})
+            log('{}: {} rows set to \'{}\''.format(model.__name__, count, i.TYPE))
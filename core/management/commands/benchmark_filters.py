@@ -0,0 +1,103 @@
+'''
+    Core Application Benchmark Filters Command
+    core/management/commands/benchmark_filters.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from community.models import Club
+from community.views import ClubViewSet
+from core.permissions import IsMemberOfCommunity
+from core.utils.benchmarks import rollback_fixture, measure, log_measurement
+from core.utils.filters import filter_queryset_specification
+from core.utils.logs import log
+from core.utils.serializer import is_valid_club
+from membership.models import Membership
+
+import datetime
+
+
+class Command(BaseCommand):
+    ''' Compares the legacy evaluated filters with the query filter specifications on club listing '''
+    help = 'Benchmarks club list filters on a generated fixture, which is rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--communities', type=int, default=50000, help='Amount of generated clubs')
+        parser.add_argument('--repeat', type=int, default=5, help='Amount of repetitions per measurement')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        with rollback_fixture():
+            user = self.create_fixture(options['communities'])
+            params = (
+                {'is_official': 'True', 'is_valid': 'True'},
+                {'is_valid': 'False', 'exclude_own': 'True'},
+                {'status': 'R', 'status_exclude': 'D'},
+            )
+
+            for i in params:
+                request = Request(APIRequestFactory().get('/api/community/club/', i))
+                request.user = user
+                queryset = Club.objects.filter(is_active=True)
+
+                legacy, legacy_elapsed, legacy_queries = measure(
+                    lambda: [j.id for j in filter_queryset_legacy(queryset, request)], repeat=options['repeat']
+                )
+                result, elapsed, queries = measure(
+                    lambda: [j.id for j in filter_queryset_specification(queryset, request, ClubViewSet.query_filters)],
+                    repeat=options['repeat']
+                )
+
+                log('Parameters: {}'.format(i))
+                log_measurement('  Legacy', legacy_elapsed, legacy_queries)
+                log_measurement('  Specification', elapsed, queries)
+                if sorted(legacy) != sorted(result):
+                    self.stderr.write('  Results differ: {} legacy, {} specification'.format(len(legacy), len(result)))
+
+    def create_fixture(self, amount):
+        ''' Create clubs of mixed validity, with the benchmark user as a member of every hundredth club '''
+        user = get_user_model().objects.create_user(username='benchmark_filters', password='benchmark')
+        today = timezone.now().date()
+
+        for i in range(amount):
+            club = Club.objects.create(
+                name_th='ชุมนุมทดสอบ {}'.format(i), name_en='Benchmark Club {}'.format(i),
+                is_official=i % 2 == 0, status=('R', 'C', 'D')[i % 3],
+                valid_through=today + datetime.timedelta(days=i % 60 - 30) if i % 2 == 0 else None
+            )
+            if i % 100 == 0:
+                Membership.objects.create(community_id=club.id, user_id=user.id, position=0)
+
+        return user
+
+
+def filter_queryset_legacy(queryset, request):
+    ''' Club list filters as previously evaluated, kept for comparison only '''
+    for i in ('is_official', 'status'):
+        query = request.query_params.get(i)
+        if query is not None:
+            queryset = eval('queryset.filter({}=query)'.format(i))
+
+    query = request.query_params.get('exclude_own')
+    if query is not None and eval(query):
+        member_ids = [i.id for i in queryset if IsMemberOfCommunity().has_object_permission(request, None, i)]
+        queryset = queryset.exclude(pk__in=member_ids)
+
+    query = request.query_params.get('status_exclude')
+    if query is not None:
+        queryset = eval('queryset.exclude(status=query)')
+
+    query = request.query_params.get('is_valid')
+    if query is not None:
+        if eval(query):
+            queryset = [i for i in queryset if is_valid_club(i)]
+        else:
+            queryset = [i for i in queryset if not is_valid_club(i)]
+
+    return queryset
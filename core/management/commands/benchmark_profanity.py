@@ -0,0 +1,97 @@
+'''
+    Core Application Benchmark Profanity Command
+    core/management/commands/benchmark_profanity.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from profanity_filter import ProfanityFilter
+from pythainlp.corpus.common import thai_words
+from pythainlp.tokenize import word_tokenize
+from pythainlp.util import dict_trie
+
+from clubs_and_events.settings import NLP_EN_MODEL
+from core.utils.benchmarks import measure, log_measurement
+from core.utils.logs import log
+from core.utils.nlp import validate_profanity, get_nlp_en, is_profane_th, get_profane_dictionary_th
+
+import spacy
+
+
+COMMENT_TH = 'กิจกรรมวันนี้สนุกมากเลยครับ ขอบคุณพี่ ๆ ทุกคนที่ช่วยกันจัดงาน ปีหน้าจะมาเข้าร่วมอีกแน่นอน '
+COMMENT_LENGTHS = (20, 100, 500, 2000)
+
+
+def is_profane_en_legacy(text):
+    ''' Check if the English text contains profanity, loading the model on every call as done before '''
+    try:
+        nlp = spacy.load(NLP_EN_MODEL)
+    except OSError:
+        return False
+
+    profanity_filter = ProfanityFilter(nlps={'en': nlp})
+    nlp.add_pipe(profanity_filter.spacy_component, last=True)
+    return nlp(text)._.is_profane
+
+
+def is_profane_th_legacy(text):
+    ''' Check if the Thai text contains profanity, building the dictionary on every call as done before '''
+    custom_dictionary = set(thai_words())
+    profane_dictionary = open('core/dictionary/profanity_th.txt', encoding='utf-8')
+    profane_dictionary = [i.replace('\n', str()).replace('\r', str()).strip() for i in profane_dictionary]
+
+    for i in profane_dictionary:
+        custom_dictionary.add(i)
+
+    text = text.replace(' ', str()).replace('เเ', 'แ').replace('ํา', 'ำ')
+    words = word_tokenize(
+        text, engine='newmm', keep_whitespace=False, custom_dict=dict_trie(dict_source=custom_dictionary)
+    )
+
+    for i in words:
+        if i in profane_dictionary:
+            return True
+
+    return False
+
+
+def validate(text, lang=('en',)):
+    ''' Validate profanity, returns False instead of raising on profanity '''
+    try:
+        return validate_profanity(text, lang=lang)
+    except ValidationError:
+        return False
+
+
+class Command(BaseCommand):
+    ''' Measures the latency of English and Thai profanity validation '''
+    help = 'Benchmarks profanity validation latency with the process-level dictionaries and the legacy loading.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--repeat', type=int, default=20, help='Amount of repetitions of each measurement')
+        parser.add_argument('--text', type=str, default='Welcome to the sleeping club, we meet every Friday.')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        log('Model: {}'.format(NLP_EN_MODEL if get_nlp_en() is not None else 'not installed, using the word list'))
+
+        _, elapsed, query_count = measure(lambda: validate(options['text']), repeat=options['repeat'])
+        log_measurement('  Process-level pipeline', elapsed, query_count)
+
+        _, elapsed, query_count = measure(lambda: is_profane_en_legacy(options['text']), repeat=options['repeat'])
+        log_measurement('  Loading per call', elapsed, query_count)
+
+        dictionary = get_profane_dictionary_th()
+        log('Thai matcher: {}'.format('Aho-Corasick' if dictionary.automaton is not None else 'regular expression'))
+
+        for length in COMMENT_LENGTHS:
+            text = (COMMENT_TH * (length // len(COMMENT_TH) + 1))[:length]
+            log('Comment length: {}'.format(length))
+
+            _, elapsed, query_count = measure(lambda: is_profane_th(text), repeat=options['repeat'])
+            log_measurement('  Cached dictionary', elapsed, query_count)
+
+            _, elapsed, query_count = measure(lambda: is_profane_th_legacy(text), repeat=options['repeat'])
+            log_measurement('  Building per call', elapsed, query_count)
@@ -0,0 +1,84 @@
+'''
+    Core Application Explain Hot Queries Command
+    core/management/commands/explain_hot_queries.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from asset.models import Comment
+from core.utils.logs import log, warning
+from membership.models import Membership
+from notification.models import Notification
+
+import json
+
+
+def get_hot_queries(user_id, community_id, event_id, ip_address):
+    ''' Get the canonical hot queries by name '''
+    return (
+        # core/permissions.py, the membership index and membership based queryset filters
+        ('Membership index', Membership.objects.filter(user_id=user_id).only(
+            'id', 'community_id', 'position', 'status'
+        )),
+        ('Membership filter', Membership.objects.filter(
+            user_id=user_id, position__in=(2, 3), status='A'
+        ).values('community_id')),
+        ('Membership duplicate check', Membership.objects.filter(
+            user_id=user_id, community_id=community_id, status__in=('A', 'R')
+        )),
+        ('Community staff', Membership.objects.filter(community_id=community_id, position__in=(1, 2, 3), status='A')),
+
+        # asset/serializers.py, CommentSerializer.validate
+        ('Comments by user', Comment.objects.filter(event_id=event_id, created_by_id=user_id).order_by('created_at')),
+        ('Comments by IP address', Comment.objects.filter(
+            event_id=event_id, ip_address=ip_address
+        ).order_by('created_at')),
+
+        # notification/views.py, NotificationViewSet.list
+        ('Notification list', Notification.objects.filter(user_id=user_id).order_by('-created_at', '-id')[:20])
+    )
+
+
+def uses_index(plan, vendor=None):
+    ''' Verify if the query plan uses an index to access the table '''
+    vendor = connection.vendor if vendor is None else vendor
+
+    if vendor == 'mysql':
+        plan = json.loads(plan)['query_block']
+        table = plan.get('table') or plan.get('ordering_operation', dict()).get('table', dict())
+        return table.get('key') is not None and table.get('access_type') != 'ALL'
+    elif vendor == 'postgresql':
+        return 'Index Scan' in plan or 'Index Only Scan' in plan or 'Bitmap Index Scan' in plan
+    elif vendor == 'sqlite':
+        return 'USING INDEX' in plan or 'USING COVERING INDEX' in plan or 'USING INTEGER PRIMARY KEY' in plan
+    return False
+
+
+class Command(BaseCommand):
+    ''' Runs the canonical hot queries through EXPLAIN and reports whether each one uses an index '''
+    help = 'Explains the hot membership, comment, and notification queries.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--user', type=int, default=1, help='User ID used in the queries')
+        parser.add_argument('--community', type=int, default=1, help='Community ID used in the queries')
+        parser.add_argument('--event', type=int, default=1, help='Event ID used in the queries')
+        parser.add_argument('--ip-address', type=str, default='127.0.0.1', help='IP address used in the queries')
+        parser.add_argument('--verbose-plan', action='store_true', help='Display the full query plans')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        queries = get_hot_queries(options['user'], options['community'], options['event'], options['ip_address'])
+
+        for name, queryset in queries:
+            plan = queryset.explain(format='json') if connection.vendor == 'mysql' else queryset.explain()
+
+            if uses_index(plan):
+                log('{}: uses an index'.format(name))
+            else:
+                warning('{}: does not use an index'.format(name))
+
+            if options['verbose_plan']:
+                log(plan)
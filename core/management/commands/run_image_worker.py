@@ -0,0 +1,62 @@
+'''
+    Core Application Run Image Worker Command
+    core/management/commands/run_image_worker.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from clubs_and_events.settings import IMAGE_WORKER_BATCH_SIZE, IMAGE_WORKER_IDLE_INTERVAL
+from core.utils.files import process_image_jobs
+from core.utils.logs import log, warning
+
+import time
+
+
+class Command(BaseCommand):
+    ''' Downscales uploaded images and generates their variants in the background, optionally in a pool of processes '''
+    help = 'Runs the image worker, which processes waiting image jobs.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument(
+            '--batch-size', type=int, default=IMAGE_WORKER_BATCH_SIZE, help='Amount of image jobs processed per batch'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=0, help='Amount of worker processes, images are processed in-process if 0'
+        )
+        parser.add_argument('--once', action='store_true', help='Process every waiting image job once, then exit')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        executor = self.create_executor(options['processes'])
+
+        try:
+            while True:
+                try:
+                    amount = process_image_jobs(batch_size=options['batch_size'], executor=executor)
+                except BrokenProcessPool:
+                    warning('Image worker process pool broke, restarting it.')
+                    executor.shutdown(wait=False)
+                    executor = self.create_executor(options['processes'])
+                    continue
+
+                if amount > 0:
+                    log('Image worker processed {} job(s).'.format(amount))
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(IMAGE_WORKER_IDLE_INTERVAL)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def create_executor(self, processes):
+        ''' Create the pool of worker processes, None to process images in-process '''
+        if processes > 0:
+            # Worker processes only access the storage, never the database connection they inherit
+            return ProcessPoolExecutor(max_workers=processes)
+        return None
@@ -0,0 +1,47 @@
+'''
+    Core Application Models
+    core/models.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils import timezone
+
+
+class ImageJob(models.Model):
+    ''' Image processing job of an image field, run by the image worker '''
+    STATUS = (
+        ('W', 'Waiting'),
+        ('P', 'Processing'),
+        ('D', 'Done'),
+        ('F', 'Failed')
+    )
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    field_name = models.CharField(max_length=32)
+    max_width = models.PositiveIntegerField()
+    max_height = models.PositiveIntegerField()
+    status = models.CharField(max_length=1, choices=STATUS, default='W')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ''' Meta '''
+        indexes = (
+            models.Index(fields=('status', 'next_attempt_at')),
+            models.Index(fields=('content_type', 'object_id', 'status'))
+        )
+
+    def __str__(self):
+        ''' String representation '''
+        return '{}.{} ({}), {}'.format(self.content_type.model, self.field_name, self.object_id, self.status)
+
+    def get_object(self):
+        ''' Get the object of the image field '''
+        return self.content_type.get_object_for_this_type(pk=self.object_id)
@@ -4,11 +4,13 @@
     @author Teerapat Kraisrisirikul (810Teams)
 '''
 
+from django.db.models import Q
 from rest_framework import permissions
 
 from asset.models import Announcement, Album, AlbumImage, Comment
-from community.models import Community, CommunityEvent
-from core.utils.general import has_instance
+from community.models import Community, Club, Event, CommunityEvent
+from core.utils.general import get_instance, get_subclass_lookup, get_subclass_query, join_lookups
+from core.utils.users import get_own_membership
 from generator.models import QRCode, JoinKey, GeneratedDocx
 from membership.models import Request, Invitation, Advisory, Membership, CustomMembershipLabel, MembershipLog
 from membership.models import ApprovalRequest
@@ -24,15 +26,25 @@ class IsInPubliclyVisibleCommunity(permissions.BasePermission):
         ref = get_community_reference(obj)
 
         if ref is not None:
-            community = Community.objects.get(pk=ref.id)
             if request.user.is_authenticated:
                 return True
-            elif has_instance(community, CommunityEvent):
-                community_event = CommunityEvent.objects.get(pk=community.id)
+
+            community_event = get_instance(ref, CommunityEvent)
+            if community_event is not None:
                 return community_event.is_publicly_visible and community_event.created_under.is_publicly_visible
-            return community.is_publicly_visible
+            return ref.is_publicly_visible
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        def get_query(lookup, model):
+            if request.user.is_authenticated:
+                return Q(**{join_lookups(lookup, 'pk__isnull'): False})
+            return Q(**{join_lookups(lookup, 'is_publicly_visible'): True}) \
+                & get_subclass_query(lookup, model, CommunityEvent, created_under__is_publicly_visible=True)
+
+        return filter_queryset_community_reference(queryset, get_query)
+
 
 class IsInActiveCommunity(permissions.BasePermission):
     ''' Permission for checking if the object is in or related to an active community '''
@@ -45,6 +57,16 @@ class IsInActiveCommunity(permissions.BasePermission):
             return community.is_active
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        def get_query(lookup, model):
+            query = Q(**{join_lookups(lookup, 'is_active'): True})
+            if issubclass(model, CommunityEvent):
+                query &= Q(**{join_lookups(lookup, 'created_under__is_active'): True})
+            return query
+
+        return filter_queryset_community_reference(queryset, get_query)
+
 
 class IsLeaderOfCommunity(permissions.BasePermission):
     ''' Leader of community permission '''
@@ -53,10 +75,13 @@ class IsLeaderOfCommunity(permissions.BasePermission):
         ref = get_community_reference(obj)
 
         if ref is not None:
-            membership = Membership.objects.filter(user_id=request.user.id, position=3, community_id=ref.id, status='A')
-            return len(membership) == 1
+            return get_own_membership(request, ref.id, status=('A',), position=(3,)) is not None
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        return filter_queryset_membership(queryset, request, position=3, status='A')
+
 
 class IsDeputyLeaderOfCommunity(permissions.BasePermission):
     ''' Deputy leader of community permission '''
@@ -65,12 +90,13 @@ class IsDeputyLeaderOfCommunity(permissions.BasePermission):
         ref = get_community_reference(obj)
 
         if ref is not None:
-            membership = Membership.objects.filter(
-                user_id=request.user.id, position__in=(2, 3), community_id=ref.id, status='A'
-            )
-            return len(membership) == 1
+            return get_own_membership(request, ref.id, status=('A',), position=(2, 3)) is not None
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        return filter_queryset_membership(queryset, request, position__in=(2, 3), status='A')
+
 
 class IsStaffOfCommunity(permissions.BasePermission):
     ''' Staff of community permission '''
@@ -79,12 +105,13 @@ class IsStaffOfCommunity(permissions.BasePermission):
         ref = get_community_reference(obj)
 
         if ref is not None:
-            membership = Membership.objects.filter(
-                user_id=request.user.id, position__in=(1, 2, 3), community_id=ref.id, status='A'
-            )
-            return len(membership) == 1
+            return get_own_membership(request, ref.id, status=('A',), position=(1, 2, 3)) is not None
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        return filter_queryset_membership(queryset, request, position__in=(1, 2, 3), status='A')
+
 
 class IsMemberOfCommunity(permissions.BasePermission):
     ''' Member of community permission '''
@@ -93,10 +120,22 @@ class IsMemberOfCommunity(permissions.BasePermission):
         ref = get_community_reference(obj)
 
         if ref is not None:
-            membership = Membership.objects.filter(user_id=request.user.id, community_id=ref.id, status__in=('A', 'R'))
-            return len(membership) == 1
+            return get_own_membership(request, ref.id, status=('A', 'R')) is not None
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        return filter_queryset_membership(queryset, request, status__in=('A', 'R'))
+
+
+NOTIFICATION_REFERENCES = (
+    (RequestNotification, 'request'),
+    (MembershipLogNotification, 'membership_log'),
+    (AnnouncementNotification, 'announcement'),
+    (CommunityEventNotification, 'community_event'),
+    (EventNotification, 'event')
+)
+
 
 def get_community_reference(obj):
     ''' Retrieve a reference to community from an object '''
@@ -115,16 +154,65 @@ def get_community_reference(obj):
     elif isinstance(obj, Vote):
         return obj.voted_for.community
     elif isinstance(obj, Notification):
-        if has_instance(obj, RequestNotification):
-            return get_community_reference(RequestNotification.objects.get(pk=obj.id).request)
-        elif has_instance(obj, MembershipLogNotification):
-            return get_community_reference(MembershipLogNotification.objects.get(pk=obj.id).membership_log)
-        elif has_instance(obj, AnnouncementNotification):
-            return get_community_reference(AnnouncementNotification.objects.get(pk=obj.id).announcement)
-        elif has_instance(obj, CommunityEventNotification):
-            return get_community_reference(CommunityEventNotification.objects.get(pk=obj.id).community_event)
-        elif has_instance(obj, EventNotification):
-            return get_community_reference(EventNotification.objects.get(pk=obj.id).event)
-        else:
-            return None
+        for subclass, field_name in NOTIFICATION_REFERENCES:
+            notification = get_instance(obj, subclass)
+            if notification is not None:
+                return get_community_reference(getattr(notification, field_name))
+        return None
     return None
+
+
+def get_community_reference_lookups(model):
+    ''' Retrieve lookups from a model to its community references, paired with the referenced model '''
+    if issubclass(model, Community):
+        return ((str(), model),)
+    elif issubclass(model, (Announcement, Album, Request, Invitation, Advisory, Membership, ApprovalRequest)):
+        return (('community', Community),)
+    elif issubclass(model, AlbumImage):
+        return (('album__community', Community),)
+    elif issubclass(model, (Comment, QRCode, JoinKey)):
+        return (('event', Event),)
+    elif issubclass(model, (CustomMembershipLabel, MembershipLog)):
+        return (('membership__community', Community),)
+    elif issubclass(model, GeneratedDocx):
+        return (('club', Club),)
+    elif issubclass(model, Vote):
+        return (('voted_for__community', Community),)
+    elif issubclass(model, Notification):
+        lookups = list()
+        for subclass, field_name in NOTIFICATION_REFERENCES:
+            subclass_lookup = get_subclass_lookup(model, subclass)
+            if subclass_lookup is not None:
+                lookups += [
+                    (join_lookups(subclass_lookup, field_name, i), j)
+                    for i, j in get_community_reference_lookups(subclass._meta.get_field(field_name).related_model)
+                ]
+        return tuple(lookups)
+    return tuple()
+
+
+def filter_queryset_community_reference(queryset, get_query):
+    ''' Filters queryset by a query built on the community reference of each object '''
+    query = None
+    for lookup, model in get_community_reference_lookups(queryset.model):
+        query = get_query(lookup, model) if query is None else query | get_query(lookup, model)
+
+    if query is None:
+        return queryset.none()
+    return queryset.filter(query)
+
+
+def filter_queryset_membership(queryset, request, **kwargs):
+    ''' Filters queryset by the requesting user's memberships in the community reference of each object '''
+    community_ids = Membership.objects.filter(user_id=request.user.id, **kwargs).values('community_id')
+
+    return filter_queryset_community_reference(
+        queryset, lambda lookup, model: Q(**{join_lookups(lookup, 'pk__in'): community_ids})
+    )
+
+
+def filter_queryset_owner(queryset, request, field_name):
+    ''' Filters queryset by objects whose user field refers to the requesting user '''
+    if request.user.is_authenticated:
+        return queryset.filter(**{'{}_id'.format(field_name): request.user.id})
+    return queryset.none()
@@ -4,9 +4,41 @@
     @author Teerapat Kraisrisirikul (810Teams)
 '''
 
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.images import ImageFile
+from django.db import connection
 from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
 
+from asset.models import Announcement, Album, AlbumImage, Comment
+from asset.permissions import IsAbleToRetrieveAnnouncement, IsAbleToRetrieveAlbum, IsAbleToRetrieveAlbumImage
+from asset.permissions import IsAbleToDeleteComment
+from community.models import Community, Club, Event, CommunityEvent, Lab
+from community.permissions import IsPubliclyVisibleCommunity, IsAbleToUpdateClub, IsAbleToDeleteClub
+from community.permissions import IsAbleToDeleteEvent, IsAbleToUpdateCommunityEvent, IsAbleToDeleteCommunityEvent
+from community.permissions import IsAbleToUpdateLab, IsAbleToDeleteLab, IsRenewableClub, IsMemberOfBaseCommunity
+from core.management.commands.explain_hot_queries import get_hot_queries, uses_index
+from core.permissions import IsInPubliclyVisibleCommunity, IsInActiveCommunity, IsLeaderOfCommunity
+from core.permissions import IsDeputyLeaderOfCommunity, IsStaffOfCommunity, IsMemberOfCommunity
 from core.utils.files import simplify_file_size
+from core.utils.general import parse_boolean
+from core.utils.nlp import get_nlp_en, is_profane_en, is_profane_en_word_list, is_profane_th, get_profane_dictionary_th
+from core.utils.nlp import get_lang, is_th, is_en, is_profane, get_profanity_cache_statistics, clear_profanity_cache
+from core.utils.serializer import is_valid_club
+from core.utils.filters import filter_queryset_permission, filter_queryset_object_permission, paginate_queryset
+from core.utils.users import get_membership_index, clear_membership_index
+from membership.models import Request, Invitation, Membership, CustomMembershipLabel, MembershipLog, ApprovalRequest
+from membership.permissions import IsAbleToRetrieveRequest, IsAbleToUpdateRequest, IsAbleToDeleteRequest
+from membership.permissions import IsAbleToRetrieveInvitation, IsAbleToUpdateInvitation, IsAbleToDeleteInvitation
+from membership.permissions import IsAbleToUpdateMembership, IsAbleToUpdateCustomMembershipLabel
+from membership.permissions import IsAbleToRetrieveApprovalRequest, IsAbleToDeleteApprovalRequest
+from notification.models import Notification, RequestNotification, MembershipLogNotification
+from notification.models import AnnouncementNotification, CommunityEventNotification, EventNotification
+from notification.permissions import IsNotificationOwner
+
+import datetime
 
 
 class FilesUtilityTest(TestCase):
@@ -42,3 +74,526 @@ class FilesUtilityTest(TestCase):
         self.assertEqual(simplify_file_size(1073741823, unit='kB'), '1023.99 GB')
         self.assertEqual(simplify_file_size(1073741824, unit='kB'), '1.00 TB')
         self.assertEqual(simplify_file_size(1073741825, unit='kB'), '1.00 TB')
+
+
+class PermissionQuerysetFilterTest(TestCase):
+    ''' Queryset-level permission filtering test '''
+    def setUp(self):
+        ''' Set up '''
+        self.user_01 = get_user_model().objects.create_user(username='user_01', password='12345678', name='User One')
+        self.user_02 = get_user_model().objects.create_user(username='user_02', password='12345678', name='User Two')
+        self.user_03 = get_user_model().objects.create_user(username='user_03', password='12345678', name='User Three')
+        self.user_04 = get_user_model().objects.create_user(username='user_04', password='12345678', name='User Four')
+        self.user_05 = get_user_model().objects.create_user(username='user_05', password='12345678', name='User Five')
+        self.lecturer = get_user_model().objects.create_user(
+            username='lecturer', password='12345678', name='Prof.Lazy Bones', user_group='lecturer'
+        )
+        self.users = (
+            None, self.user_01, self.user_02, self.user_03, self.user_04, self.user_05, self.lecturer
+        )
+
+        club_valid = Club.objects.create(
+            name_th='ชุมนุมทดสอบสิทธิ์ 1', name_en='Permission Testing Club 1', is_publicly_visible=True,
+            is_official=True, valid_through=datetime.date(2099, 7, 31)
+        )
+        club_expired = Club.objects.create(
+            name_th='ชุมนุมทดสอบสิทธิ์ 2', name_en='Permission Testing Club 2', is_publicly_visible=True,
+            is_official=True, valid_through=datetime.date(1970, 7, 31)
+        )
+        club_private = Club.objects.create(
+            name_th='ชุมนุมทดสอบสิทธิ์ 3', name_en='Permission Testing Club 3', is_publicly_visible=False,
+            is_official=False
+        )
+        event = Event.objects.create(
+            name_th='กิจกรรมทดสอบสิทธิ์', name_en='Permission Testing Event', is_approved=True,
+            location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1), end_date=datetime.date(2020, 12, 2),
+            start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0), is_publicly_visible=True
+        )
+        community_event_public = CommunityEvent.objects.create(
+            name_th='กิจกรรมชุมนุมทดสอบสิทธิ์ 1', name_en='Permission Testing Community Event 1',
+            is_approved=True, location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1),
+            end_date=datetime.date(2020, 12, 2), start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0),
+            is_publicly_visible=True, created_under_id=club_valid.id
+        )
+        community_event_hidden = CommunityEvent.objects.create(
+            name_th='กิจกรรมชุมนุมทดสอบสิทธิ์ 2', name_en='Permission Testing Community Event 2',
+            is_approved=True, location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1),
+            end_date=datetime.date(2020, 12, 2), start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0),
+            is_publicly_visible=True, created_under_id=club_private.id
+        )
+        lab = Lab.objects.create(
+            name_th='ห้องปฏิบัติการทดสอบสิทธิ์', name_en='Permission Testing Lab', is_publicly_visible=True,
+            is_active=False
+        )
+
+        communities = (club_valid, club_expired, club_private, event, community_event_public, community_event_hidden)
+        positions = ((3, 'A'), (2, 'A'), (1, 'R'), (0, 'L'))
+        for i, community in enumerate(communities):
+            for j, user in enumerate((self.user_01, self.user_02, self.user_03, self.user_04)):
+                position, status = positions[(i + j) % len(positions)]
+                Membership.objects.create(community_id=community.id, user_id=user.id, position=position, status=status)
+        Membership.objects.create(community_id=lab.id, user_id=self.lecturer.id, position=3)
+
+        for community in communities + (lab,):
+            request = Request.objects.create(community_id=community.id, user_id=self.user_05.id)
+            RequestNotification.objects.create(request_id=request.id, user_id=self.user_01.id)
+            Request.objects.create(community_id=community.id, user_id=self.user_04.id, status='D')
+            Invitation.objects.create(community_id=community.id, invitor_id=self.user_01.id, invitee_id=self.user_05.id)
+            Invitation.objects.create(community_id=community.id, invitee_id=self.user_04.id)
+            ApprovalRequest.objects.create(community_id=community.id)
+
+            announcement = Announcement.objects.create(community_id=community.id, text='Public announcement')
+            Announcement.objects.create(
+                community_id=community.id, text='Hidden announcement', is_publicly_visible=False
+            )
+            AnnouncementNotification.objects.create(announcement_id=announcement.id, user_id=self.user_02.id)
+
+            Album.objects.create(community_id=community.id, name='Public album')
+            Album.objects.create(community_id=community.id, name='Hidden album', is_publicly_visible=False)
+
+        album = Album.objects.create(
+            community_id=club_private.id, community_event_id=community_event_hidden.id, name='Event album',
+            is_publicly_visible=False
+        )
+        with open('asset/tests/img/01.jpg', 'rb') as image:
+            AlbumImage.objects.create(album_id=album.id, image=ImageFile(image))
+
+        for i in (event, community_event_public, community_event_hidden):
+            Comment.objects.create(event_id=i.id, text='Comment', written_by='Guest')
+            Comment.objects.create(event_id=i.id, text='Comment', written_by='User Five', created_by_id=self.user_05.id)
+        CommunityEventNotification.objects.create(community_event_id=community_event_hidden.id, user_id=self.user_03.id)
+        EventNotification.objects.create(event_id=event.id, user_id=self.user_04.id)
+
+        for membership in Membership.objects.filter(position__in=(1, 2)):
+            CustomMembershipLabel.objects.create(membership_id=membership.id, label='Label')
+        for log in MembershipLog.objects.all()[:8]:
+            MembershipLogNotification.objects.create(membership_log_id=log.id, user_id=log.membership.user.id)
+
+    def test_community_reference_permissions(self):
+        ''' Test permissions based on community reference '''
+        self._test_permissions(
+            (IsInPubliclyVisibleCommunity, IsInActiveCommunity, IsLeaderOfCommunity, IsDeputyLeaderOfCommunity,
+             IsStaffOfCommunity, IsMemberOfCommunity),
+            (Community, Club, Event, CommunityEvent, Lab, Request, Invitation, Membership, ApprovalRequest,
+             Announcement, Album, AlbumImage, Comment, CustomMembershipLabel, MembershipLog, Notification,
+             RequestNotification, MembershipLogNotification, AnnouncementNotification, CommunityEventNotification,
+             EventNotification)
+        )
+
+    def test_community_permissions(self):
+        ''' Test community permissions '''
+        self._test_permissions(
+            (IsPubliclyVisibleCommunity, IsAbleToUpdateClub, IsAbleToDeleteClub, IsAbleToDeleteEvent,
+             IsAbleToUpdateCommunityEvent, IsAbleToDeleteCommunityEvent, IsAbleToUpdateLab, IsAbleToDeleteLab,
+             IsRenewableClub, IsMemberOfBaseCommunity),
+            (Community, Club, Event, CommunityEvent, Lab)
+        )
+
+    def test_membership_permissions(self):
+        ''' Test membership permissions '''
+        self._test_permissions(
+            (IsAbleToRetrieveRequest, IsAbleToUpdateRequest, IsAbleToDeleteRequest, IsAbleToRetrieveInvitation,
+             IsAbleToUpdateInvitation, IsAbleToDeleteInvitation, IsAbleToUpdateMembership,
+             IsAbleToUpdateCustomMembershipLabel, IsAbleToRetrieveApprovalRequest, IsAbleToDeleteApprovalRequest),
+            (Request, Invitation, Membership, CustomMembershipLabel, ApprovalRequest)
+        )
+
+    def test_asset_permissions(self):
+        ''' Test asset permissions '''
+        self._test_permissions(
+            (IsAbleToRetrieveAnnouncement, IsAbleToRetrieveAlbum, IsAbleToRetrieveAlbumImage, IsAbleToDeleteComment),
+            (Announcement, Album, AlbumImage, Comment)
+        )
+
+    def test_notification_permissions(self):
+        ''' Test notification permissions '''
+        self._test_permissions((IsNotificationOwner,), (Notification, RequestNotification, EventNotification))
+
+    def test_filter_queryset_permission(self):
+        ''' Test filtering queryset with multiple permissions '''
+        permissions = (IsPubliclyVisibleCommunity(), IsInActiveCommunity(), IsMemberOfCommunity())
+
+        for user in self.users:
+            request = self._get_request(user)
+            expected = Community.objects.all()
+            for permission in permissions:
+                expected = filter_queryset_object_permission(expected, request, permission)
+
+            self.assertEqual(
+                set(filter_queryset_permission(Community.objects.all(), request, permissions)), set(expected)
+            )
+
+    def _test_permissions(self, permissions, models):
+        ''' Test if queryset-level and object-level permission filtering return identical sets '''
+        for permission in permissions:
+            for model in models:
+                for user in self.users:
+                    request = self._get_request(user)
+                    queryset = model.objects.all()
+
+                    self.assertEqual(
+                        set(permission().filter_queryset(request, queryset).values_list('pk', flat=True)),
+                        set(filter_queryset_object_permission(queryset, request, permission()).values_list(
+                            'pk', flat=True
+                        )),
+                        msg='{} on {} as {}'.format(permission.__name__, model.__name__, user)
+                    )
+
+    def _get_request(self, user):
+        ''' Create a request as a user '''
+        request = APIRequestFactory().get('/')
+        request.user = user if user is not None else AnonymousUser()
+        return request
+
+
+class MembershipIndexTest(APITestCase):
+    ''' Request-scoped membership index test '''
+    def setUp(self):
+        ''' Set up '''
+        self.user_01 = get_user_model().objects.create_user(username='user_01', password='12345678', name='User One')
+        self.user_02 = get_user_model().objects.create_user(username='user_02', password='12345678', name='User Two')
+        self.clubs = [
+            Club.objects.create(name_th='ชุมนุมทดสอบดัชนี {}'.format(i), name_en='Index Testing Club {}'.format(i))
+            for i in range(5)
+        ]
+
+        for i, club in enumerate(self.clubs):
+            Membership.objects.create(community_id=club.id, user_id=self.user_01.id, position=i % 4)
+
+    def test_load_once(self):
+        ''' Test loading membership index once per request '''
+        request = APIRequestFactory().get('/')
+        request.user = self.user_01
+
+        with self.assertNumQueries(1):
+            for club in self.clubs:
+                self.assertTrue(IsMemberOfCommunity().has_object_permission(request, None, club))
+                self.assertEqual(
+                    IsLeaderOfCommunity().has_object_permission(request, None, club), club.id == self.clubs[3].id
+                )
+
+    def test_reload_on_different_user(self):
+        ''' Test reloading membership index when the user differs '''
+        request = APIRequestFactory().get('/')
+        request.user = self.user_01
+        self.assertEqual(len(get_membership_index(request)), len(self.clubs))
+
+        request.user = self.user_02
+        self.assertEqual(len(get_membership_index(request)), 0)
+
+    def test_clear(self):
+        ''' Test clearing membership index '''
+        request = APIRequestFactory().get('/')
+        request.user = self.user_02
+        self.assertFalse(IsMemberOfCommunity().has_object_permission(request, None, self.clubs[0]))
+
+        Membership.objects.create(community_id=self.clubs[0].id, user_id=self.user_02.id)
+        self.assertFalse(IsMemberOfCommunity().has_object_permission(request, None, self.clubs[0]))
+
+        clear_membership_index(request)
+        self.assertTrue(IsMemberOfCommunity().has_object_permission(request, None, self.clubs[0]))
+
+    def test_membership_created_within_request(self):
+        ''' Test membership meta of a community whose membership is created within the same request '''
+        self.client.login(username='user_02', password='12345678')
+
+        response = self.client.post('/api/community/club/', {
+            'name_th': 'ชุมนุมทดสอบดัชนีใหม่',
+            'name_en': 'New Index Testing Club'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['meta']['own_membership_position'], 3)
+
+        self.client.logout()
+
+
+class PaginationTest(APITestCase):
+    ''' Queryset pagination test '''
+    def setUp(self):
+        ''' Set up '''
+        self.user_01 = get_user_model().objects.create_user(username='user_01', password='12345678', name='User One')
+        self.user_02 = get_user_model().objects.create_user(username='user_02', password='12345678', name='User Two')
+        self.club = Club.objects.create(name_th='ชุมนุมทดสอบการแบ่งหน้า', name_en='Pagination Testing Club')
+
+        Membership.objects.create(community_id=self.club.id, user_id=self.user_01.id, position=3)
+        request = Request.objects.create(community_id=self.club.id, user_id=self.user_02.id)
+        self.notification_ids = [
+            RequestNotification.objects.create(request_id=request.id, user_id=self.user_01.id).id for _ in range(7)
+        ]
+
+    def test_limit_block(self):
+        ''' Test limit and block pagination '''
+        self.client.login(username='user_01', password='12345678')
+
+        response = self.client.get('/api/notification/notification/?limit=3&block=1')
+        self.assertEqual(len(response.data), 3)
+
+        response = self.client.get('/api/notification/notification/?limit=3&block=2&reversed=1')
+        self.assertEqual([i['id'] for i in response.data], list(reversed(self.notification_ids))[6:])
+
+        response = self.client.get('/api/notification/notification/?limit=3&block=3')
+        self.assertEqual(len(response.data), 0)
+
+        self.client.logout()
+
+    def test_cursor(self):
+        ''' Test cursor pagination '''
+        self.client.login(username='user_01', password='12345678')
+
+        expected_ids = list(reversed(self.notification_ids))
+        retrieved_ids = list()
+        url = '/api/notification/notification/?limit=3&cursor='
+
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data), 3)
+            retrieved_ids += [i['id'] for i in response.data]
+            url = get_link(response, 'next')
+        self.assertEqual(retrieved_ids, expected_ids)
+
+        url = get_link(response, 'prev')
+        response = self.client.get(url)
+        self.assertEqual([i['id'] for i in response.data], expected_ids[3:6])
+        self.assertIsNotNone(get_link(response, 'next'))
+
+        response = self.client.get(get_link(response, 'prev'))
+        self.assertEqual([i['id'] for i in response.data], expected_ids[0:3])
+        self.assertIsNone(get_link(response, 'prev'))
+
+        self.client.logout()
+
+    def test_limit_block_list(self):
+        ''' Test limit and block pagination of an already evaluated list '''
+        request = APIRequestFactory().get('/', {'limit': 3, 'block': 2, 'reversed': 1, 'cursor': str()})
+        request.query_params = request.GET
+        queryset, headers = paginate_queryset(list(range(7)), request)
+
+        self.assertEqual(queryset, [0])
+        self.assertEqual(headers, dict())
+
+    def test_invalid_cursor(self):
+        ''' Test invalid cursor '''
+        self.client.login(username='user_01', password='12345678')
+
+        response = self.client.get('/api/notification/notification/?cursor=invalid')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.logout()
+
+
+class QueryFilterTest(APITestCase):
+    ''' Query filter specification test '''
+    def setUp(self):
+        ''' Set up '''
+        self.user_01 = get_user_model().objects.create_user(username='user_01', password='12345678', name='User One')
+
+        self.club_valid = Club.objects.create(
+            name_th='ชุมนุมทดสอบตัวกรอง 1', name_en='Filter Testing Club 1', is_official=True,
+            valid_through=datetime.date.today() + datetime.timedelta(days=30)
+        )
+        self.club_expired = Club.objects.create(
+            name_th='ชุมนุมทดสอบตัวกรอง 2', name_en='Filter Testing Club 2', is_official=True,
+            valid_through=datetime.date.today() - datetime.timedelta(days=30)
+        )
+        self.club_unofficial = Club.objects.create(name_th='ชุมนุมทดสอบตัวกรอง 3', name_en='Filter Testing Club 3')
+
+        self.event = Event.objects.create(
+            name_th='กิจกรรมทดสอบตัวกรอง', name_en='Filter Testing Event', is_approved=True,
+            location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1), end_date=datetime.date(2020, 12, 2),
+            start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0), is_publicly_visible=True
+        )
+        self.community_event = CommunityEvent.objects.create(
+            name_th='กิจกรรมชุมนุมทดสอบตัวกรอง', name_en='Filter Testing Community Event',
+            is_approved=True, location='L207 IT KMITL', start_date=datetime.date(2020, 12, 1),
+            end_date=datetime.date(2020, 12, 2), start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0),
+            is_publicly_visible=True, created_under_id=self.club_valid.id
+        )
+
+        Membership.objects.create(community_id=self.club_valid.id, user_id=self.user_01.id, position=3)
+
+    def test_parse_boolean(self):
+        ''' Test boolean parsing of query parameter values '''
+        for i in ('True', 'true', '1', 'yes'):
+            self.assertTrue(parse_boolean(i))
+        for i in ('False', 'false', '0', 'no'):
+            self.assertFalse(parse_boolean(i))
+        for i in ('', '2', '__import__(\'os\')'):
+            with self.assertRaises(ValueError):
+                parse_boolean(i)
+
+    def test_is_valid(self):
+        ''' Test club validity filter against the Python validity check '''
+        self.client.login(username='user_01', password='12345678')
+
+        clubs = Club.objects.filter(pk__in=(self.club_valid.id, self.club_expired.id, self.club_unofficial.id))
+        for query, expected in (('True', True), ('False', False)):
+            response = self.client.get('/api/community/club/?is_valid={}'.format(query))
+            self.assertEqual(
+                sorted(i['id'] for i in response.data),
+                sorted(i.id for i in clubs if is_valid_club(i) == expected)
+            )
+
+        response = self.client.get('/api/community/club/?is_valid=invalid')
+        self.assertEqual(len(response.data), 0)
+
+        self.client.logout()
+
+    def test_exclude_own(self):
+        ''' Test excluding own communities '''
+        self.client.login(username='user_01', password='12345678')
+
+        response = self.client.get('/api/community/club/?exclude_own=1')
+        self.assertNotIn(self.club_valid.id, [i['id'] for i in response.data])
+
+        response = self.client.get('/api/community/club/?exclude_own=0')
+        self.assertIn(self.club_valid.id, [i['id'] for i in response.data])
+
+        self.client.logout()
+
+    def test_exclude_community_events(self):
+        ''' Test excluding community events '''
+        self.client.login(username='user_01', password='12345678')
+
+        response = self.client.get('/api/community/event/?exclude_community_events=true')
+        self.assertEqual([i['id'] for i in response.data], [self.event.id])
+
+        response = self.client.get('/api/community/event/?exclude_community_events=false')
+        self.assertEqual(sorted(i['id'] for i in response.data), sorted((self.event.id, self.community_event.id)))
+
+        self.client.logout()
+
+    def test_field_parsing(self):
+        ''' Test parsing of query parameter values by model fields '''
+        self.client.login(username='user_01', password='12345678')
+
+        response = self.client.get('/api/community/event/community/?created_under={}'.format(self.club_valid.id))
+        self.assertEqual([i['id'] for i in response.data], [self.community_event.id])
+
+        response = self.client.get('/api/community/event/community/?created_under=invalid')
+        self.assertEqual(len(response.data), 0)
+
+        self.client.logout()
+
+
+def get_link(response, rel):
+    ''' Retrieve a link of a relation from the Link header of a response '''
+    if not response.has_header('Link'):
+        return None
+
+    for i in response['Link'].split(', '):
+        url, relation = i.split('; ')
+        if relation == 'rel="{}"'.format(rel):
+            return url[1:-1]
+    return None
+
+
+class ProfanityTest(TestCase):
+    ''' Profanity validation test '''
+    def test_nlp_en_singleton(self):
+        ''' Test loading the English pipeline once per process '''
+        self.assertIs(get_nlp_en(), get_nlp_en())
+
+    def test_is_profane_en(self):
+        ''' Test English profanity detection '''
+        self.assertTrue(is_profane_en('What the fuck'))
+        self.assertFalse(is_profane_en('Welcome to the sleeping club'))
+        self.assertFalse(is_profane_en(None))
+
+    def test_is_profane_en_word_list(self):
+        ''' Test English profanity detection with the word list fallback '''
+        self.assertTrue(is_profane_en_word_list('What the FUCK!'))
+        self.assertTrue(is_profane_en_word_list('shit, again'))
+        self.assertFalse(is_profane_en_word_list('Welcome to the sleeping club'))
+        self.assertFalse(is_profane_en_word_list('Scunthorpe'))
+
+    def test_is_profane_th(self):
+        ''' Test Thai profanity detection with the cached dictionary '''
+        dictionary = get_profane_dictionary_th()
+        self.assertIs(get_profane_dictionary_th(), dictionary)
+
+        word = sorted(dictionary.words)[0]
+        self.assertTrue(dictionary.has_candidate('สวัสดี{}ครับ'.format(word)))
+        self.assertTrue(is_profane_th(word))
+        self.assertFalse(dictionary.has_candidate('สวัสดีครับ'))
+        self.assertFalse(is_profane_th('สวัสดีครับ'))
+        self.assertFalse(is_profane_th(None))
+
+
+class ProfanityCacheTest(APITestCase):
+    ''' Profanity cache test '''
+    def setUp(self):
+        ''' Set up '''
+        clear_profanity_cache()
+
+    def test_is_profane_memoized(self):
+        ''' Test memoizing profanity validation results '''
+        self.assertFalse(is_profane('Sleeping Club', 'en'))
+        self.assertFalse(is_profane('Sleeping Club', 'en'))
+        self.assertTrue(is_profane('What the fuck', 'en'))
+        self.assertFalse(is_profane('Sleeping Club', 'th'))
+
+        statistics = get_profanity_cache_statistics()
+        self.assertEqual(statistics['hits'], 1)
+        self.assertEqual(statistics['misses'], 3)
+        self.assertEqual(statistics['size'], 3)
+
+    def test_profanity_cache_endpoint(self):
+        ''' Test retrieving profanity cache statistics '''
+        get_user_model().objects.create_user(username='user_01', password='12345678', name='User One')
+        get_user_model().objects.create_superuser(username='user_02', password='12345678')
+
+        self.client.login(username='user_01', password='12345678')
+        response = self.client.get('/api/core/profanity-cache/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.logout()
+
+        self.client.login(username='user_02', password='12345678')
+        response = self.client.get('/api/core/profanity-cache/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'hits', 'shared_hits', 'misses', 'size'})
+        self.client.logout()
+
+
+class LanguageDetectionTest(TestCase):
+    ''' Language detection test '''
+    def test_get_lang(self):
+        ''' Test detecting the language of Thai, English and mixed samples '''
+        samples = (
+            ('ชุมนุมนอน', 'th'),
+            ('ชุมนุมคนชอบนอนหลับพักผ่อน', 'th'),
+            ('กิจกรรมรับน้องประจำปี 2564', 'th'),
+            ('ชุมนุม Python', 'th'),
+            ('ชมรมดนตรีสากลของสถาบัน (Music Club)', 'th'),
+            ('ห้อง M03 ตึกคณะ', 'th'),
+            ('เเข่งขันเขียนโปรแกรม ACM-ICPC', 'th'),
+            ('Sleeping Club', 'en'),
+            ('Python Programming Club', 'en'),
+            ('Freshmen Welcoming Day 2021', 'en'),
+            ('Music Club (ชมรมดนตรี)', 'en'),
+            ('Room M03, IT Building', 'en'),
+            ('Café Lovers', 'en'),
+            ('AI Lab วิจัย', 'en'),
+            ('12345', None),
+            ('', None),
+            (None, None)
+        )
+        self.assertEqual([get_lang(i[0]) for i in samples], [i[1] for i in samples])
+
+    def test_is_th_is_en(self):
+        ''' Test verifying Thai and English text '''
+        self.assertTrue(is_th('ชุมนุมนอน'))
+        self.assertFalse(is_th('Sleeping Club'))
+        self.assertTrue(is_en('Sleeping Club'))
+        self.assertFalse(is_en('ชุมนุมนอน'))
+
+
+class HotQueryIndexTest(TestCase):
+    ''' Hot query index test '''
+    def test_hot_queries_use_indexes(self):
+        ''' Test the hot membership, comment, and notification queries using indexes '''
+        for name, queryset in get_hot_queries(1, 1, 1, '127.0.0.1'):
+            if connection.vendor == 'mysql':
+                self.assertTrue(uses_index(queryset.explain(format='json')), name)
+            else:
+                self.assertTrue(uses_index(queryset.explain()), name)
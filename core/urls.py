@@ -7,7 +7,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from core.views import get_datetime, get_settings
+from core.views import get_datetime, get_settings, get_profanity_cache
 
 
 router = DefaultRouter()
@@ -15,5 +15,6 @@ router = DefaultRouter()
 urlpatterns = [
     path('datetime/', get_datetime),
     path('settings/', get_settings),
+    path('profanity-cache/', get_profanity_cache),
     path('', include(router.urls))
 ]
@@ -0,0 +1,44 @@
+'''
+    Core Application Benchmarking Functions
+    core/utils/benchmarks.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.utils.logs import log
+
+import time
+
+
+@contextmanager
+def rollback_fixture():
+    ''' Runs a block in a transaction which is always rolled back, leaving no fixture behind '''
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def measure(function, repeat=5):
+    ''' Measures a function, returns its result, the best elapsed time in seconds, and its amount of queries '''
+    best_elapsed, query_count, result = None, 0, None
+
+    for _ in range(max(repeat, 1)):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            result = function()
+            elapsed = time.perf_counter() - start
+
+        if best_elapsed is None or elapsed < best_elapsed:
+            best_elapsed = elapsed
+        query_count = len(context.captured_queries)
+
+    return result, best_elapsed, query_count
+
+
+def log_measurement(name, elapsed, query_count):
+    ''' Displays a measurement '''
+    log('{}: {:.2f} ms, {} queries'.format(name, elapsed * 1000, query_count))
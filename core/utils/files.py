@@ -4,13 +4,33 @@
     @author Teerapat Kraisrisirikul (810Teams)
 '''
 
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
 from django.core.files import File
 from django.core.files.images import ImageFile
 from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
 
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
 from PIL import Image
 
-from clubs_and_events.settings import DO_IMAGE_DOWNSCALING
+from clubs_and_events.settings import DO_IMAGE_DOWNSCALING, ASYNC_IMAGE_PROCESSING, IMAGE_WORKER_BATCH_SIZE
+from clubs_and_events.settings import IMAGE_WORKER_LEASE, IMAGE_MAX_ATTEMPTS, IMAGE_RETRY_DELAY
+from clubs_and_events.settings import IMAGE_VARIANT_SIZES, IMAGE_VARIANT_FORMATS
+from core.models import ImageJob
+
+import hashlib
+import posixpath
+
+
+IMAGE_STATUS = (
+    ('P', 'Processing'),
+    ('R', 'Ready'),
+    ('F', 'Failed')
+)
 
 
 def get_file_size(file):
@@ -27,6 +47,55 @@ def get_image_size(image):
     raise ValueError
 
 
+def get_stored_image_size(obj, field_name):
+    ''' Get image size and dimensions from the metadata recorded on an object, without opening the file '''
+    size = getattr(obj, '{}_size'.format(field_name))
+    if getattr(obj, field_name) and size is not None:
+        return '{} ({}x{})'.format(
+            simplify_file_size(size),
+            getattr(obj, '{}_width'.format(field_name)),
+            getattr(obj, '{}_height'.format(field_name))
+        )
+    raise ValueError
+
+
+def get_image_metadata(file):
+    ''' Get width, height, size in bytes, MIME type and SHA-256 hash of an image file '''
+    file.seek(0)
+    content = file.read()
+    file.seek(0)
+
+    image = Image.open(BytesIO(content))
+
+    return {
+        'width': image.width,
+        'height': image.height,
+        'size': len(content),
+        'mime': Image.MIME.get(image.format),
+        'hash': hashlib.sha256(content).hexdigest()
+    }
+
+
+def get_stored_image_metadata(name):
+    ''' Get metadata of an image in the storage by its name, able to run in a worker process '''
+    with default_storage.open(name, 'rb') as image_in:
+        return get_image_metadata(image_in)
+
+
+def get_image_metadata_fields(field_name, metadata):
+    ''' Get the metadata column values of an image field, all None if there is no metadata '''
+    return {
+        '{}_{}'.format(field_name, i): None if metadata is None else metadata[i]
+        for i in ('width', 'height', 'size', 'mime', 'hash')
+    }
+
+
+def set_image_metadata(instance, field_name, metadata):
+    ''' Set the metadata columns of an image field on an instance, without saving '''
+    for i, j in get_image_metadata_fields(field_name, metadata).items():
+        setattr(instance, i, j)
+
+
 def simplify_file_size(size, unit='B'):
     ''' Simplify file size '''
     if unit == 'b' and size >= 8:
@@ -63,9 +132,10 @@ def auto_downscale_image(image, threshold=(1024, 1024), round_function=round):
             pass
 
 
-def downscale_image(image_in, threshold=(1024, 1024), round_function=round):
+def downscale_image(image_in, threshold=(1024, 1024), round_function=round, name=None):
     ''' Downscale image size for storage space saving '''
     image = Image.open(image_in)
+    name = image_in.name if name is None else name
 
     width_ratio = image.width / threshold[0]
     height_ratio = image.height / threshold[1]
@@ -81,9 +151,227 @@ def downscale_image(image_in, threshold=(1024, 1024), round_function=round):
             Image.ANTIALIAS
         )
 
-        storage_access = default_storage.open(image_in.name, 'wb')
-        image_format = image_in.name.split('.')[-1]
+        storage_access = default_storage.open(name, 'wb')
+        image_format = name.split('.')[-1]
         if image_format.lower() == 'jpg':
             image_format = 'jpeg'
         image.save(storage_access, image_format)
         storage_access.close()
+
+
+def downscale_stored_image(name, threshold=(1024, 1024)):
+    ''' Downscale an image in the storage by its name, able to run in a worker process '''
+    with default_storage.open(name, 'rb') as image_in:
+        downscale_image(image_in, threshold=threshold, name=name)
+
+
+def process_stored_image(name, threshold=(1024, 1024)):
+    ''' Downscale an image in the storage if enabled and generate its variants, returns its final metadata '''
+    if DO_IMAGE_DOWNSCALING:
+        downscale_stored_image(name, threshold=threshold)
+    generate_image_variants(name)
+
+    return get_stored_image_metadata(name)
+
+
+def get_image_variant_name(name, size, image_format):
+    ''' Get the storage name of an image variant, stored alongside the original image '''
+    extension = 'jpg' if image_format == 'jpeg' else image_format
+    return '{}_{}.{}'.format(posixpath.splitext(name)[0], size, extension)
+
+
+def generate_image_variants(name):
+    ''' Generate the thumbnail variants of an image in the storage, in every variant size and format '''
+    with default_storage.open(name, 'rb') as image_in:
+        image = Image.open(image_in)
+        image.load()
+
+    for size in IMAGE_VARIANT_SIZES:
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.ANTIALIAS)
+
+        for image_format in IMAGE_VARIANT_FORMATS:
+            if image_format == 'jpeg' and variant.mode != 'RGB':
+                output = variant.convert('RGB')
+            elif image_format != 'jpeg' and variant.mode not in ('RGB', 'RGBA'):
+                output = variant.convert('RGBA')
+            else:
+                output = variant
+
+            storage_access = default_storage.open(get_image_variant_name(name, size, image_format), 'wb')
+            output.save(storage_access, image_format)
+            storage_access.close()
+
+
+def delete_image_variants(name):
+    ''' Delete the thumbnail variants of an image from the storage '''
+    for size in IMAGE_VARIANT_SIZES:
+        for image_format in IMAGE_VARIANT_FORMATS:
+            default_storage.delete(get_image_variant_name(name, size, image_format))
+
+
+def get_image_variants(obj, field_names):
+    ''' Get variant URLs of image fields by size and format, None unless their variants are written '''
+    variants = dict()
+
+    for i in field_names:
+        image = getattr(obj, i)
+
+        # Only ready objects have every variant written, processing objects and failed processing have not
+        if not image or obj.image_status != 'R' or len(IMAGE_VARIANT_SIZES) == 0:
+            variants[i] = None
+        else:
+            variants[i] = {
+                str(j): {
+                    k: default_storage.url(get_image_variant_name(image.name, j, k)) for k in IMAGE_VARIANT_FORMATS
+                } for j in IMAGE_VARIANT_SIZES
+            }
+
+    return variants
+
+
+def clear_removed_image_metadata(instance, field_names):
+    ''' Clear the metadata columns of image fields which no longer have a file, without saving '''
+    for i in field_names:
+        if not getattr(instance, i):
+            set_image_metadata(instance, i, None)
+
+
+def get_changed_images(instance, thresholds):
+    ''' Get image fields with newly assigned files, not yet saved to the storage, along with their thresholds '''
+    return [
+        (i, thresholds[i]) for i in thresholds
+        if getattr(instance, i) and not getattr(getattr(instance, i), '_committed', True)
+    ]
+
+
+def schedule_image_processing(instance, images):
+    ''' Schedule processing and metadata recording of saved image fields, right away if synchronous '''
+    if len(images) == 0:
+        return
+
+    if not ASYNC_IMAGE_PROCESSING:
+        fields = {'image_status': 'R'}
+        for field_name, threshold in images:
+            try:
+                metadata = process_stored_image(getattr(instance, field_name).name, threshold=threshold)
+            except (OSError, ValueError):
+                metadata = None
+                fields['image_status'] = 'F'
+            fields.update(get_image_metadata_fields(field_name, metadata))
+            set_image_metadata(instance, field_name, metadata)
+
+        type(instance).objects.filter(pk=instance.pk).update(**fields)
+        instance.image_status = fields['image_status']
+        return
+
+    # Jobs of previously uploaded files of the same fields are superseded
+    content_type = ContentType.objects.get_for_model(instance)
+    ImageJob.objects.filter(
+        content_type=content_type, object_id=instance.pk, field_name__in=[i[0] for i in images]
+    ).delete()
+    ImageJob.objects.bulk_create([ImageJob(
+        content_type=content_type, object_id=instance.pk, field_name=field_name,
+        max_width=threshold[0], max_height=threshold[1]
+    ) for field_name, threshold in images])
+
+    type(instance).objects.filter(pk=instance.pk).update(image_status='P')
+    instance.image_status = 'P'
+
+
+def claim_image_jobs(batch_size=IMAGE_WORKER_BATCH_SIZE):
+    ''' Claim a batch of due image jobs, along with running jobs whose worker let the lease expire '''
+    now = timezone.now()
+
+    with transaction.atomic():
+        jobs = list(ImageJob.objects.select_for_update(
+            skip_locked=connection.features.has_select_for_update_skip_locked
+        ).filter(
+            Q(status='W', next_attempt_at__lte=now) | Q(status='P', claimed_at__lt=now - IMAGE_WORKER_LEASE)
+        ).select_related('content_type').order_by('next_attempt_at', 'id')[:batch_size])
+
+        # An expired lease counts as an attempt, so an image crashing its worker is eventually given up on
+        expired = [i for i in jobs if i.status == 'P']
+        for i in expired:
+            i.attempts += 1
+            i.last_error = 'Lease expired'
+            if i.attempts >= IMAGE_MAX_ATTEMPTS:
+                i.status = 'F'
+
+        claimed = [i for i in jobs if i.status != 'F']
+        for i in claimed:
+            i.status, i.claimed_at = 'P', now
+
+        ImageJob.objects.bulk_update(jobs, ('status', 'attempts', 'claimed_at', 'last_error'))
+
+    for content_type, object_id in set((i.content_type, i.object_id) for i in expired if i.status == 'F'):
+        update_image_status(content_type, object_id)
+
+    return claimed, len(jobs)
+
+
+def update_image_status(content_type, object_id):
+    ''' Set the image status of an object once none of its jobs is waiting or running, ready only if all are done '''
+    statuses = set(ImageJob.objects.filter(content_type=content_type, object_id=object_id).values_list(
+        'status', flat=True
+    ))
+
+    if len(statuses & {'W', 'P'}) == 0:
+        content_type.model_class().objects.filter(pk=object_id).update(
+            image_status='R' if statuses <= {'D'} else 'F'
+        )
+
+
+def process_image_jobs(batch_size=IMAGE_WORKER_BATCH_SIZE, executor=None):
+    ''' Run a batch of due image jobs, in the executor if given, returns the number of jobs processed '''
+    jobs, amount = claim_image_jobs(batch_size=batch_size)
+
+    # Resolve the stored file of each job, jobs of deleted objects or removed images are done right away
+    pending = list()
+    for i in jobs:
+        try:
+            image = getattr(i.get_object(), i.field_name)
+        except ObjectDoesNotExist:
+            image = None
+
+        if image:
+            pending.append((i, image.name))
+        else:
+            i.status = 'D'
+
+    if executor is not None:
+        futures = [executor.submit(process_stored_image, name, (i.max_width, i.max_height)) for i, name in pending]
+
+    try:
+        for index, (i, name) in enumerate(pending):
+            try:
+                if executor is not None:
+                    metadata = futures[index].result()
+                else:
+                    metadata = process_stored_image(name, threshold=(i.max_width, i.max_height))
+                i.content_type.model_class().objects.filter(pk=i.object_id).update(
+                    **get_image_metadata_fields(i.field_name, metadata)
+                )
+                i.status, i.last_error = 'D', None
+            except BrokenProcessPool:
+                raise
+            except Exception as exception:
+                i.attempts += 1
+                i.last_error = repr(exception)
+
+                if i.attempts >= IMAGE_MAX_ATTEMPTS:
+                    i.status = 'F'
+                else:
+                    i.status, i.next_attempt_at = 'W', timezone.now() + IMAGE_RETRY_DELAY * 2 ** (i.attempts - 1)
+    finally:
+        # Jobs left unfinished by a broken executor are released to be claimed again, without counting an attempt
+        for i in jobs:
+            if i.status == 'P':
+                i.status = 'W'
+
+        ImageJob.objects.bulk_update(jobs, ('status', 'attempts', 'next_attempt_at', 'last_error'))
+
+        for content_type, object_id in set((i.content_type, i.object_id) for i in jobs):
+            update_image_status(content_type, object_id)
+
+    return amount
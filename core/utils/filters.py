@@ -4,106 +4,291 @@
     @author Teerapat Kraisrisirikul (810Teams)
 '''
 
+from datetime import datetime
+
 from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import BasePermission
+from rest_framework.utils.urls import replace_query_param
 
 from community.models import Community
 from core.permissions import IsMemberOfCommunity
+from core.utils.general import join_lookups, parse_boolean
 from membership.models import Membership, MembershipLog
 
+from functools import lru_cache
+
+import base64
+import json
+
+
+class QueryFilter:
+    ''' Declarative query parameter filter, compiled once when a view set is declared '''
+    def __init__(self, param, field=None, lookup=None, parser=None, exclude=False, query=None, is_negatable=True):
+        '''
+            Constructor
+            param:          Query parameter name
+            field:          Model field to filter, defaults to the query parameter name
+            lookup:         Field lookup, such as 'in' or 'gte', defaults to an exact match
+            parser:         Function parsing the query parameter value, defaults to the model field's to_python
+            exclude:        Excludes matching rows instead of filtering them
+            query:          Q object, or a function of (request, queryset) returning one, which makes the filter
+                            a boolean switch applying the query if true, and its negation if false
+            is_negatable:   Applies the negated query if the boolean switch is false, otherwise does nothing
+        '''
+        self.param = param
+        self.field = field if field is not None else param
+        self.lookup = join_lookups(self.field, lookup)
+        self.parser = parser
+        self.exclude = exclude
+        self.query = query
+        self.is_negatable = is_negatable
+
+    def parse(self, model, value):
+        ''' Parse the query parameter value into a Python value '''
+        if self.query is not None:
+            return parse_boolean(value)
+        elif self.parser is not None:
+            return self.parser(value)
+        return model._meta.get_field(self.field).to_python(value)
+
+    def get_query(self, request, queryset):
+        ''' Retrieve the query built from the request, or None if the filter is not applied '''
+        value = request.query_params.get(self.param)
+        if value is None:
+            return None
+
+        value = self.parse(queryset.model, value)
+
+        if self.query is None:
+            return Q(**{self.lookup: value})
+
+        query = self.query(request, queryset) if callable(self.query) else self.query
+        if value:
+            return query
+        elif self.is_negatable:
+            return ~query
+        return None
+
+    def apply(self, request, queryset):
+        ''' Apply the filter to a queryset '''
+        query = self.get_query(request, queryset)
+        if query is None:
+            return queryset
+        elif self.exclude:
+            return queryset.exclude(query)
+        return queryset.filter(query)
+
+
+def filter_queryset_specification(queryset, request, query_filters):
+    ''' Filters queryset by query filter specifications '''
+    if queryset is None:
+        return None
 
-def filter_queryset(queryset, request, target_param=None, is_foreign_key=False):
-    ''' Filters queryset by target parameter '''
     try:
-        query = request.query_params.get(target_param)
-        if query is not None:
-            queryset = eval('queryset.filter({}{}=query)'.format(target_param, '_id' * is_foreign_key))
+        for i in query_filters:
+            queryset = i.apply(request, queryset)
     except (ValueError, ValidationError):
         queryset = None
 
     return queryset
 
 
+@lru_cache(maxsize=None)
+def get_query_filter(target_param, is_foreign_key=False, exclude=False):
+    ''' Retrieve a query filter of a target parameter, created once per parameter '''
+    return QueryFilter(
+        target_param + '_exclude' * exclude, field=target_param + '_id' * is_foreign_key, exclude=exclude
+    )
+
+
+def filter_queryset(queryset, request, target_param=None, is_foreign_key=False):
+    ''' Filters queryset by target parameter '''
+    return filter_queryset_specification(
+        queryset, request, (get_query_filter(target_param, is_foreign_key=is_foreign_key),)
+    )
+
+
 def filter_queryset_permission(queryset, request, permissions):
     ''' Filters queryset with permissions '''
     for i in permissions:
-        visible_ids = [
-            j.id for j in queryset if i.has_permission(request, None) and i.has_object_permission(request, None, j)
-        ]
-        queryset = queryset.filter(pk__in=visible_ids)
+        if not i.has_permission(request, None):
+            queryset = queryset.none()
+        elif hasattr(i, 'filter_queryset'):
+            queryset = i.filter_queryset(request, queryset)
+        elif type(i).has_object_permission is not BasePermission.has_object_permission:
+            queryset = filter_queryset_object_permission(queryset, request, i)
 
     return queryset
 
 
+def filter_queryset_object_permission(queryset, request, permission):
+    ''' Filters queryset with a permission by checking each object individually '''
+    visible_ids = [
+        i.id for i in queryset
+        if permission.has_permission(request, None) and permission.has_object_permission(request, None, i)
+    ]
+
+    return queryset.filter(pk__in=visible_ids)
+
+
 def exclude_queryset(queryset, request, target_param=None, is_foreign_key=False):
     ''' Filters queryset by target parameter '''
-    try:
-        query = request.query_params.get(target_param + '_exclude')
-        if query is not None:
-            queryset = eval('queryset.exclude({}{}=query)'.format(target_param, '_id' * is_foreign_key))
-    except (ValueError, ValidationError):
-        queryset = None
+    return filter_queryset_specification(
+        queryset, request, (get_query_filter(target_param, is_foreign_key=is_foreign_key, exclude=True),)
+    )
 
-    return queryset
+
+def get_own_community_query(request, queryset):
+    ''' Retrieve a query of communities which the user is the member '''
+    return Q(pk__in=IsMemberOfCommunity().filter_queryset(request, queryset).values('pk'))
+
+
+def get_valid_club_query(request, queryset):
+    ''' Retrieve a query of valid clubs, evaluated as the same date as is_valid_club '''
+    return Q(is_official=True, valid_through__gte=timezone.now().date())
+
+
+def get_active_advisory_query(request, queryset):
+    ''' Retrieve a query of advisories active as of today '''
+    today = datetime.now().date()
+    return Q(start_date__lte=today, end_date__gte=today)
 
 
 def filter_queryset_exclude_own(queryset, request, target_param='exclude_own'):
     ''' Filters queryset by excluding communities which the user is the member '''
-    try:
-        query = request.query_params.get(target_param)
-        if query is not None and eval(query):
-            queryset = queryset.exclude(
-                id__in=[i.id for i in queryset if IsMemberOfCommunity().has_object_permission(request, None, i)]
-            )
-    except ValueError:
-        queryset = None
-
-    return queryset
+    return filter_queryset_specification(
+        queryset, request,
+        (QueryFilter(target_param, exclude=True, query=get_own_community_query, is_negatable=False),)
+    )
 
 
 def limit_queryset(queryset, request, target_param='limit', block_param='block', reverse_param='reversed'):
-    ''' Limit queryset items not to exceed a specific amount '''
+    ''' Limit queryset items not to exceed a specific amount, also accepting already evaluated lists '''
+    if queryset is None:
+        return None
+
     # Retrieve reverse status and reverse the queryset
     try:
         is_reversed = request.query_params.get(reverse_param)
         if is_reversed is not None and bool(int(is_reversed)):
-            queryset = list(reversed(queryset))
-    except TypeError:
+            if isinstance(queryset, list):
+                queryset = queryset[::-1]
+            else:
+                if not queryset.ordered:
+                    queryset = queryset.order_by('pk')
+                queryset = queryset.reverse()
+    except (TypeError, ValueError):
         pass
 
     # Retrieve block number
     try:
-        block = int(request.query_params.get(block_param))
-    except TypeError:
+        block = max(int(request.query_params.get(block_param)), 0)
+    except (TypeError, ValueError):
         block = 0
 
-    # Retrieve limit and slice queryset
+    # Retrieve limit and slice queryset, done by the database as LIMIT and OFFSET
     try:
         limit = request.query_params.get(target_param)
         if limit is not None:
-            limit = int(limit)
-            queryset = queryset[block * limit:min(block * limit + limit, len(queryset))]
-    except IndexError:
+            limit = max(int(limit), 0)
+            queryset = queryset[block * limit:block * limit + limit]
+    except ValueError:
         pass
 
     return queryset
 
 
+def paginate_queryset(queryset, request, ordering=('created_at', 'id'), cursor_param='cursor', target_param='limit',
+                      default_limit=20):
+    ''' Paginate queryset by cursor if requested, otherwise limit queryset, returning it with response headers '''
+    if queryset is None or isinstance(queryset, list) or cursor_param not in request.query_params:
+        return limit_queryset(queryset, request, target_param=target_param), dict()
+
+    # Retrieve limit
+    try:
+        limit = max(int(request.query_params.get(target_param, default_limit)), 1)
+    except ValueError:
+        limit = default_limit
+
+    # Retrieve cursor, an empty cursor refers to the first page
+    cursor = request.query_params.get(cursor_param)
+    if cursor:
+        is_previous, values = decode_cursor(queryset.model, cursor, ordering)
+        lookup = 'gt' if is_previous else 'lt'
+
+        query = Q(**{'{}__{}'.format(ordering[-1], lookup): values[-1]})
+        for field_name, value in reversed(tuple(zip(ordering[:-1], values[:-1]))):
+            query = Q(**{'{}__{}'.format(field_name, lookup): value}) | (Q(**{field_name: value}) & query)
+        queryset = queryset.filter(query)
+    else:
+        is_previous = False
+
+    # Keyset ordering, descending unless paging backwards
+    if is_previous:
+        queryset = queryset.order_by(*ordering)
+    else:
+        queryset = queryset.order_by(*['-{}'.format(i) for i in ordering])
+
+    # Fetch one extra row to determine whether more rows exist
+    page = list(queryset[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    if is_previous:
+        page.reverse()
+
+    # Build links to the adjacent pages
+    has_next = is_previous or has_more
+    has_previous = has_more if is_previous else bool(cursor)
+
+    links = list()
+    if len(page) > 0 and has_next:
+        url = replace_query_param(
+            request.build_absolute_uri(), cursor_param, encode_cursor(page[-1], ordering, is_previous=False)
+        )
+        links.append('<{}>; rel="next"'.format(url))
+    if len(page) > 0 and has_previous:
+        url = replace_query_param(
+            request.build_absolute_uri(), cursor_param, encode_cursor(page[0], ordering, is_previous=True)
+        )
+        links.append('<{}>; rel="prev"'.format(url))
+
+    if len(links) > 0:
+        return page, {'Link': ', '.join(links)}
+    return page, dict()
+
+
+def encode_cursor(obj, ordering, is_previous=False):
+    ''' Encodes a pagination cursor pointing at an object '''
+    values = [obj._meta.get_field(i).value_to_string(obj) for i in ordering]
+    return base64.urlsafe_b64encode(json.dumps([is_previous, values]).encode()).decode()
+
+
+def decode_cursor(model, cursor, ordering):
+    ''' Decodes a pagination cursor into its direction and ordering values '''
+    try:
+        is_previous, values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if len(values) != len(ordering):
+            raise ValueError
+        return bool(is_previous), [model._meta.get_field(i).to_python(j) for i, j in zip(ordering, values)]
+    except (TypeError, ValueError, ValidationError, UnicodeError):
+        raise NotFound('Invalid cursor.')
+
+
 def get_previous_membership_log(obj):
     ''' Retrieves the previous membership log object from a membership log object '''
     if not isinstance(obj, MembershipLog):
         return None
 
-    logs = MembershipLog.objects.filter(membership_id=obj.membership.id)
+    # Cached on the object, as serializers resolve it once per language
+    if not hasattr(obj, '_previous_membership_log'):
+        obj._previous_membership_log = MembershipLog.objects.filter(
+            membership_id=obj.membership_id, id__lt=obj.id
+        ).order_by('-id').first()
 
-    current = 0
-    for i in range(len(logs)):
-        if logs[i].id == obj.id:
-            current = i
-            break
-
-    if current == 0:
-        return None
-    return logs[current - 1]
+    return obj._previous_membership_log
 
 
 def get_latest_membership_log(membership):
@@ -111,11 +296,9 @@ def get_latest_membership_log(membership):
     if not isinstance(membership, Membership):
         return None
 
-    logs = MembershipLog.objects.filter(membership_id=membership.id)
-
-    if len(logs) > 0:
-        return logs[len(logs) - 1]
-    return None
+    if membership.current_log_id is not None:
+        return membership.current_log
+    return MembershipLog.objects.filter(membership_id=membership.id).order_by('-id').first()
 
 
 def get_active_community_ids():
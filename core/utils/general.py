@@ -5,6 +5,7 @@
 '''
 
 from django.db import models
+from django.db.models import Q
 
 import random
 
@@ -30,13 +31,104 @@ def remove_duplicates(list_data):
 
 def has_instance(obj, model):
     ''' Check if an object has an instance in a specific model '''
-    if isinstance(obj, models.Model):
-        try:
-            model.objects.get(pk=obj.id)
-            return True
-        except model.DoesNotExist:
-            return False
-    return False
+    if isinstance(obj, model):
+        return True
+
+    type_model = get_type_model(obj)
+    if type_model is not None:
+        return issubclass(type_model, model)
+    return get_instance(obj, model) is not None
+
+
+def get_instance(obj, model):
+    ''' Retrieve the instance of an object in a specific model, using parent links loaded by select_related '''
+    if isinstance(obj, model):
+        return obj
+    elif not isinstance(obj, models.Model):
+        return None
+
+    lookup = get_subclass_lookup(type(obj), model)
+    if lookup is None:
+        return None
+
+    type_model = get_type_model(obj)
+    if type_model is not None and not issubclass(type_model, model):
+        return None
+
+    instance = obj
+    for i in lookup.split('__'):
+        relation = type(instance)._meta.get_field(i)
+        if not relation.is_cached(instance):
+            return model.objects.filter(pk=obj.pk).first()
+
+        instance = relation.get_cached_value(instance)
+        if instance is None:
+            return None
+
+    return instance
+
+
+def get_subclasses(model):
+    ''' Retrieve a model and all of its subclasses '''
+    return (model,) + tuple(j for i in model.__subclasses__() for j in get_subclasses(i))
+
+
+def get_type_model(obj):
+    ''' Retrieve the concrete model of an object from its type field, or None if its model has no type field '''
+    type_field = getattr(type(obj), 'TYPE_FIELD', None)
+    if type_field is None:
+        return None
+
+    type_name = getattr(obj, type_field)
+    if type_name is None:
+        return None
+
+    for i in get_subclasses(type(obj)):
+        if i.TYPE == type_name:
+            return i
+    return None
+
+
+def get_subclass_lookup(model, subclass):
+    ''' Retrieve a lookup from a model to one of its multi-table inheritance subclasses '''
+    if issubclass(model, subclass):
+        return str()
+    elif not issubclass(subclass, model):
+        return None
+
+    chain = [i for i in subclass._meta.get_parent_list() if issubclass(i, model) and i is not model] + [subclass]
+    chain.sort(key=lambda i: len(i._meta.get_parent_list()))
+
+    return '__'.join(i._meta.model_name for i in chain)
+
+
+def join_lookups(*lookups):
+    ''' Join lookups into a single lookup, skipping empty ones '''
+    return '__'.join(i for i in lookups if i)
+
+
+def get_subclass_query(lookup, model, subclass, **kwargs):
+    ''' Retrieve a query whose conditions only apply on rows which are instances of a subclass '''
+    subclass_lookup = get_subclass_lookup(model, subclass)
+
+    if subclass_lookup is None:
+        return Q()
+
+    query = Q(**{join_lookups(lookup, subclass_lookup, key): value for key, value in kwargs.items()})
+    if subclass_lookup == str():
+        return query
+    return Q(**{join_lookups(lookup, subclass_lookup, 'pk__isnull'): True}) | query
+
+
+def parse_boolean(value):
+    ''' Parse a boolean query parameter value, raises ValueError if the value is not a boolean '''
+    if isinstance(value, bool):
+        return value
+    elif str(value).strip().lower() in ('true', '1', 'yes'):
+        return True
+    elif str(value).strip().lower() in ('false', '0', 'no'):
+        return False
+    raise ValueError('\'{}\' is not a valid boolean value.'.format(value))
 
 
 def get_random_string(letters='ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789', length=16):
@@ -4,77 +4,253 @@
     @author Teerapat Kraisrisirikul (810Teams)
 '''
 
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 from profanity_filter import ProfanityFilter
 from pythainlp.corpus.common import thai_words
 from pythainlp.tokenize import word_tokenize
 from pythainlp.util import dict_trie
-from textblob import TextBlob
-from textblob.exceptions import TranslatorError
 
-from clubs_and_events.settings import NLP_EN_MODEL
+from clubs_and_events.settings import NLP_EN_MODEL, PROFANITY_CACHE_SIZE, PROFANITY_CACHE_ALIAS
+from clubs_and_events.settings import PROFANITY_CACHE_TIMEOUT
 
+from collections import OrderedDict
+
+import functools
+import hashlib
+import os
+import re
 import spacy
+import threading
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+PROFANE_DICTIONARY_EN_PATH = 'core/dictionary/profanity_en.txt'
+PROFANE_DICTIONARY_TH_PATH = 'core/dictionary/profanity_th.txt'
+THAI_PATTERN = re.compile(r'[\u0e00-\u0e7f]')
+LATIN_PATTERN = re.compile(r'[a-zA-Z\u00c0-\u024f]')
+
+_nlp_en = None
+_nlp_en_loaded = False
+_nlp_en_lock = threading.Lock()
+_profane_dictionary_th = None
+_profane_dictionary_th_lock = threading.Lock()
+_profanity_cache = OrderedDict()
+_profanity_cache_lock = threading.Lock()
+_profanity_cache_statistics = {'hits': 0, 'shared_hits': 0, 'misses': 0}
+
+
+class ProfaneDictionaryTH:
+    ''' Thai profanity dictionary, with its tokenizer trie and substring matcher built once '''
+    def __init__(self, path):
+        ''' Constructor '''
+        self.path = path
+        self.modified_time = os.path.getmtime(path)
+
+        with open(path, encoding='utf-8') as f:
+            self.words = frozenset(i.strip() for i in f if i.strip() != str())
+
+        self.trie = dict_trie(dict_source=set(thai_words()) | self.words)
+
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for i in self.words:
+                self.automaton.add_word(i, i)
+            self.automaton.make_automaton()
+            self.pattern = None
+        else:
+            self.automaton = None
+            self.pattern = re.compile('|'.join(re.escape(i) for i in sorted(self.words, key=len, reverse=True)))
+
+    def is_modified(self):
+        ''' Verify if the dictionary file is modified since it was loaded '''
+        return os.path.getmtime(self.path) != self.modified_time
+
+    def has_candidate(self, text):
+        ''' Check if any profane word occurs in the text as a substring, required for any token to be profane '''
+        if len(self.words) == 0:
+            return False
+        elif self.automaton is not None:
+            return next(self.automaton.iter(text), None) is not None
+        return self.pattern.search(text) is not None
 
 
 def validate_profanity(text, lang=('en', 'th')):
     ''' Validates profanity of the text '''
-    if 'en' in lang and is_profane_en(text):
+    if 'en' in lang and is_profane(text, 'en'):
         raise ValidationError(_('Text contains profanity in English.'), code='profanity_detected')
-    elif 'th' in lang and is_profane_th(text):
+    elif 'th' in lang and is_profane(text, 'th'):
         raise ValidationError(_('Text contains profanity in Thai.'), code='profanity_detected')
     return True
 
 
+def is_profane(text, lang):
+    ''' Check if the text contains profanity in the language, memoized by the dictionary version and text hash '''
+    if not isinstance(text, str):
+        return False
+
+    key = 'profanity:{}:{}:{}'.format(
+        get_dictionary_version(lang), lang, hashlib.sha1(text.encode('utf-8')).hexdigest()
+    )
+
+    # Process-level cache
+    with _profanity_cache_lock:
+        if key in _profanity_cache:
+            _profanity_cache.move_to_end(key)
+            _profanity_cache_statistics['hits'] += 1
+            return _profanity_cache[key]
+
+    # Shared cache
+    result = None
+    if PROFANITY_CACHE_ALIAS is not None:
+        result = caches[PROFANITY_CACHE_ALIAS].get(key)
+
+    statistic = 'shared_hits' if result is not None else 'misses'
+    if result is None:
+        result = is_profane_en(text) if lang == 'en' else is_profane_th(text)
+        if PROFANITY_CACHE_ALIAS is not None:
+            caches[PROFANITY_CACHE_ALIAS].set(key, result, PROFANITY_CACHE_TIMEOUT)
+
+    with _profanity_cache_lock:
+        _profanity_cache_statistics[statistic] += 1
+        _profanity_cache[key] = result
+        if len(_profanity_cache) > PROFANITY_CACHE_SIZE:
+            _profanity_cache.popitem(last=False)
+
+    return result
+
+
+def get_dictionary_version(lang):
+    ''' Get the version of the profanity dictionary of the language, which changes when the dictionary changes '''
+    if lang == 'en':
+        return '{}-{}'.format(NLP_EN_MODEL, os.path.getmtime(PROFANE_DICTIONARY_EN_PATH))
+    return '{}'.format(get_profane_dictionary_th().modified_time)
+
+
+def get_profanity_cache_statistics():
+    ''' Get the hit and miss counters of the profanity cache of this process '''
+    with _profanity_cache_lock:
+        return dict(_profanity_cache_statistics, size=len(_profanity_cache))
+
+
+def clear_profanity_cache():
+    ''' Clear the profanity cache of this process and reset its counters '''
+    with _profanity_cache_lock:
+        _profanity_cache.clear()
+        for i in _profanity_cache_statistics:
+            _profanity_cache_statistics[i] = 0
+
+
 def is_profane_en(text):
     ''' Check if the English text contains profanity '''
-    try:
-        nlp = spacy.load(NLP_EN_MODEL)
-    except OSError:
+    if not isinstance(text, str):
         return False
 
-    profanity_filter = ProfanityFilter(nlps={'en': nlp})
-    nlp.add_pipe(profanity_filter.spacy_component, last=True)
+    nlp = get_nlp_en()
+    if nlp is None:
+        return is_profane_en_word_list(text)
+    return nlp(text)._.is_profane
 
-    if isinstance(text, str):
-        return nlp(text)._.is_profane
-    return False
+
+def is_profane_en_word_list(text):
+    ''' Check if the English text contains profanity using the word list, used when the model is not installed '''
+    profane_dictionary = load_profane_dictionary_en()
+    return any(i in profane_dictionary for i in re.findall(r'[a-z]+', text.lower()))
+
+
+def get_nlp_en():
+    ''' Get the English profanity pipeline, loaded once per process, returns None if the model is not installed '''
+    global _nlp_en, _nlp_en_loaded
+
+    if not _nlp_en_loaded:
+        with _nlp_en_lock:
+            if not _nlp_en_loaded:
+                try:
+                    nlp = spacy.load(NLP_EN_MODEL)
+                    profanity_filter = ProfanityFilter(nlps={'en': nlp})
+                    nlp.add_pipe(profanity_filter.spacy_component, last=True)
+                    _nlp_en = nlp
+                except OSError:
+                    _nlp_en = None
+                _nlp_en_loaded = True
+
+    return _nlp_en
+
+
+def load_profane_dictionary_en():
+    ''' Load the English profanity word list, reloaded when the file changes '''
+    return _load_profane_dictionary_en(os.path.getmtime(PROFANE_DICTIONARY_EN_PATH))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_profane_dictionary_en(modified_time):
+    ''' Load the English profanity word list of the modified time '''
+    with open(PROFANE_DICTIONARY_EN_PATH, encoding='utf-8') as f:
+        return frozenset(i.strip().lower() for i in f if i.strip() != str())
 
 
 def is_profane_th(text):
     ''' Check if the Thai text contains profanity '''
-    # Dictionary set-up
-    custom_dictionary = set(thai_words())
-    profane_dictionary = open('core/dictionary/profanity_th.txt', encoding='utf-8')
-    profane_dictionary = [i.replace('\n', str()).replace('\r', str()).strip() for i in profane_dictionary]
+    if not isinstance(text, str):
+        return False
 
-    for i in profane_dictionary:
-        custom_dictionary.add(i)
+    dictionary = get_profane_dictionary_th()
 
     # Data preparation
     text = text.replace(' ', str()).replace('เเ', 'แ').replace('ํา', 'ำ')
 
+    # Substring scan, tokenization is skipped if no profane word can possibly match
+    if not dictionary.has_candidate(text):
+        return False
+
     # Tokenize
-    words = word_tokenize(
-        text, engine='newmm', keep_whitespace=False, custom_dict=dict_trie(dict_source=custom_dictionary)
-    )
+    words = word_tokenize(text, engine='newmm', keep_whitespace=False, custom_dict=dictionary.trie)
 
     # Text scan
     for i in words:
-        if i in profane_dictionary:
+        if i in dictionary.words:
             return True
 
     return False
 
 
+def get_profane_dictionary_th():
+    ''' Get the Thai profanity dictionary, built once per process and rebuilt when the dictionary file changes '''
+    global _profane_dictionary_th
+
+    if _profane_dictionary_th is None or _profane_dictionary_th.is_modified():
+        with _profane_dictionary_th_lock:
+            if _profane_dictionary_th is None or _profane_dictionary_th.is_modified():
+                _profane_dictionary_th = ProfaneDictionaryTH(PROFANE_DICTIONARY_TH_PATH)
+
+    return _profane_dictionary_th
+
+
 def get_lang(text):
-    ''' Get detected language from the text '''
-    try:
-        return TextBlob(text).detect_language()
-    except TranslatorError:
+    ''' Get detected language from the text by its Thai and Latin letters, returns None if it has neither '''
+    if not isinstance(text, str):
+        return None
+
+    thai_count = len(THAI_PATTERN.findall(text))
+    latin_count = len(LATIN_PATTERN.findall(text))
+
+    if thai_count > latin_count:
+        return 'th'
+    elif latin_count > thai_count:
+        return 'en'
+    elif thai_count == 0:
         return None
 
+    # Equal amounts of letters, the script of the first letter decides
+    if THAI_PATTERN.search(text).start() < LATIN_PATTERN.search(text).start():
+        return 'th'
+    return 'en'
+
 
 def is_en(text):
     ''' Detect a language and returns True if is in English '''
@@ -0,0 +1,33 @@
+'''
+    Core Application Queryset Classes
+    core/utils/querysets.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.db import models
+
+from core.utils.general import get_type_model
+
+
+class SubclassQuerySet(models.QuerySet):
+    ''' Queryset of a multi-table inheritance model whose concrete model is stored in a type field '''
+    def select_subclasses(self):
+        ''' Retrieve objects as instances of their concrete models '''
+        return select_subclasses(self)
+
+
+def select_subclasses(objects):
+    ''' Retrieve objects as instances of their concrete models, fetched in one query per model '''
+    objects = list(objects)
+
+    ids = dict()
+    for i in objects:
+        type_model = get_type_model(i)
+        if type_model is not None and type_model is not type(i):
+            ids.setdefault(type_model, list()).append(i.pk)
+
+    instances = dict()
+    for model, model_ids in ids.items():
+        instances.update(model.objects.in_bulk(model_ids))
+
+    return [instances.get(i.pk, i) for i in objects]
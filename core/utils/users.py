@@ -5,6 +5,8 @@
 '''
 
 from crum import get_current_request
+from django.apps import apps
+from django.core.cache import cache
 
 from clubs_and_events.settings import EMAIL_DOMAIN_NAME
 from user.permissions import IsStudentObject
@@ -29,3 +31,49 @@ def get_client_ip(request):
     else:
         ip = request.META.get('REMOTE_ADDR')
     return ip
+
+
+def get_membership_index(request):
+    ''' Retrieves the requesting user's memberships indexed by community ID, loaded once per request '''
+    if request is None or not request.user.is_authenticated:
+        return dict()
+
+    # Store on the underlying HTTP request, which is shared by views, serializers, and models
+    http_request = getattr(request, '_request', request)
+    membership_index = getattr(http_request, 'membership_index', None)
+
+    if membership_index is None or membership_index[0] != request.user.id:
+        memberships = apps.get_model('membership', 'Membership').objects.filter(user_id=request.user.id).only(
+            'id', 'community_id', 'position', 'status'
+        )
+        membership_index = (request.user.id, {i.community_id: i for i in memberships})
+        http_request.membership_index = membership_index
+
+    return membership_index[1]
+
+
+def get_own_membership(request, community_id, status=('A', 'R'), position=(0, 1, 2, 3)):
+    ''' Retrieves the requesting user's membership in a community from the membership index '''
+    membership = get_membership_index(request).get(community_id)
+
+    if membership is not None and membership.status in status and membership.position in position:
+        return membership
+    return None
+
+
+def clear_membership_index(request):
+    ''' Clears the membership index of the request '''
+    http_request = getattr(request, '_request', request)
+
+    if http_request is not None and hasattr(http_request, 'membership_index'):
+        del http_request.membership_index
+
+
+def get_past_memberships_cache_key(user_id, is_publicly_visible_only=False):
+    ''' Get the cache key of a user's past memberships '''
+    return 'past_memberships:{}:{}'.format(user_id, 'public' if is_publicly_visible_only else 'all')
+
+
+def clear_past_memberships_cache(user_id):
+    ''' Clears the cached past memberships of a user '''
+    cache.delete_many([get_past_memberships_cache_key(user_id, i) for i in (False, True)])
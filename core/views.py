@@ -5,8 +5,8 @@
 '''
 
 from django.utils import timezone
-from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
 from clubs_and_events.settings import LANGUAGE_CODE, TIME_ZONE, USE_TZ, ENABLE_LDAP
@@ -19,6 +19,7 @@ from clubs_and_events.settings import CLUB_VALID_MONTH, CLUB_VALID_DAY,CLUB_ADVA
 from clubs_and_events.settings import STUDENT_COMMITTEE_ADVISOR_NAME, STUDENT_COMMITTEE_PRESIDENT_NAME
 from clubs_and_events.settings import COMMENT_LIMIT_PER_INTERVAL, COMMENT_INTERVAL_TIME
 from clubs_and_events.settings import VOTE_LIMIT_PER_EVENT, NLP_EN_MODEL
+from core.utils.nlp import get_profanity_cache_statistics
 
 import datetime
 
@@ -80,3 +81,10 @@ def get_settings(request):
             'nlp_en_model': NLP_EN_MODEL
         }
     }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes((permissions.IsAdminUser,))
+def get_profanity_cache(request):
+    ''' Get profanity validation cache statistics of the serving process '''
+    return Response(get_profanity_cache_statistics(), status=status.HTTP_200_OK)
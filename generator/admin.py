@@ -6,12 +6,13 @@
 
 from django.contrib import admin
 
-from generator.models import QRCode, JoinKey, GeneratedDocx
+from core.utils.files import get_stored_image_size
+from generator.models import QRCode, JoinKey, GeneratedDocx, DocxBatch, DocxBatchItem
 
 
 class QRCodeAdmin(admin.ModelAdmin):
     ''' QR code admin '''
-    list_display = ('id', 'url', 'image', 'event', 'created_at', 'created_by')
+    list_display = ('id', 'url', 'image', 'image_size', 'event', 'created_at', 'created_by')
     readonly_fields = ('image', 'created_at', 'created_by')
     list_per_page = 20
 
@@ -21,6 +22,13 @@ class QRCodeAdmin(admin.ModelAdmin):
             return ('url', 'image', 'event', 'created_at', 'created_by')
         return self.readonly_fields
 
+    def image_size(self, obj):
+        ''' Get QR code image size and dimensions '''
+        try:
+            return get_stored_image_size(obj, 'image')
+        except ValueError:
+            return str()
+
 
 class JoinKeyAdmin(admin.ModelAdmin):
     ''' Join key admin '''
@@ -48,6 +56,36 @@ class GeneratedDocxAdmin(admin.ModelAdmin):
         return self.readonly_fields
 
 
+class DocxBatchItemInline(admin.TabularInline):
+    ''' Generated docx batch item inline '''
+    readonly_fields = ('generated_docx', 'status', 'claimed_at', 'last_error', 'updated_at')
+    model = DocxBatchItem
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        ''' Restricts add permission '''
+        return False
+
+
+class DocxBatchAdmin(admin.ModelAdmin):
+    ''' Generated docx batch admin '''
+    list_display = ('id', 'status', 'progress', 'created_at', 'finished_at', 'created_by')
+    readonly_fields = ('status', 'created_at', 'finished_at', 'created_by')
+    list_filter = ('status',)
+    inlines = (DocxBatchItemInline,)
+    list_per_page = 20
+
+    def has_add_permission(self, request):
+        ''' Restricts add permission '''
+        return False
+
+    def progress(self, obj):
+        ''' Get progress '''
+        progress = obj.get_progress()
+        return '{}/{} ({} failed)'.format(progress['done'], progress['total'], progress['failed'])
+
+
 admin.site.register(QRCode, QRCodeAdmin)
 admin.site.register(JoinKey, JoinKeyAdmin)
 admin.site.register(GeneratedDocx, GeneratedDocxAdmin)
+admin.site.register(DocxBatch, DocxBatchAdmin)
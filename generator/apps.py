@@ -10,3 +10,18 @@ from django.apps import AppConfig
 class GeneratorConfig(AppConfig):
     ''' Generator application configuration '''
     name = 'generator'
+
+    def ready(self):
+        ''' Connect the cleanup of stored QR code renderings '''
+        from django.db.models.signals import post_delete
+        from generator.models import QRCode
+
+        post_delete.connect(delete_qr_code_renderings, sender=QRCode, dispatch_uid='generator_delete_qr_code')
+
+
+def delete_qr_code_renderings(sender, instance=None, **kwargs):
+    ''' Delete the stored renderings of a deleted QR code, unless another QR code has the same URL '''
+    from generator.models import delete_unused_qr_code
+
+    if instance is not None:
+        delete_unused_qr_code(instance.url)
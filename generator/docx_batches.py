@@ -0,0 +1,143 @@
+'''
+    Generator Application Microsoft Word Document Batch Functions
+    generator/docx_batches.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from clubs_and_events.settings import CLUB_ADVANCED_RENEWAL, DOCX_WORKER_BATCH_SIZE, DOCX_WORKER_LEASE
+from clubs_and_events.settings import DOCX_ARCHIVE_CHUNK_SIZE
+from generator.generate_docx import render_docx
+from generator.models import GeneratedDocx, DocxBatch, DocxBatchItem
+
+import posixpath
+import zipfile
+
+
+def get_renewable_forms():
+    ''' Get the generated forms of official clubs due for renewal within the advanced renewal period '''
+    return GeneratedDocx.objects.filter(club__is_official=True, club__is_active=True).filter(
+        Q(club__valid_through__isnull=True)
+        | Q(club__valid_through__lte=datetime.now().date() + CLUB_ADVANCED_RENEWAL)
+    )
+
+
+def create_docx_batch(generated_docx_ids):
+    ''' Create a batch of forms to be rendered by the document worker '''
+    with transaction.atomic():
+        batch = DocxBatch.objects.create()
+        DocxBatchItem.objects.bulk_create([
+            DocxBatchItem(batch_id=batch.id, generated_docx_id=i) for i in sorted(set(generated_docx_ids))
+        ])
+
+    return batch
+
+
+def process_docx_batch_items(batch_size=DOCX_WORKER_BATCH_SIZE, executor=None):
+    ''' Render a batch of waiting forms, in the executor if given, returns the number of forms processed '''
+    now = timezone.now()
+
+    # Forms of which the claiming worker stopped are claimed again once its lease expired
+    with transaction.atomic():
+        items = list(DocxBatchItem.objects.select_for_update(
+            skip_locked=connection.features.has_select_for_update_skip_locked
+        ).filter(
+            Q(status='W') | Q(status='P', claimed_at__lt=now - DOCX_WORKER_LEASE)
+        ).order_by('batch_id', 'id')[:batch_size])
+        DocxBatchItem.objects.filter(pk__in=[i.id for i in items]).update(status='P', claimed_at=now)
+
+    for i in items:
+        i.status = 'P'
+
+    batch_ids = set(i.batch_id for i in items)
+    DocxBatch.objects.filter(pk__in=batch_ids, status='W').update(status='P')
+
+    # Template data is queried here, worker processes only fill templates and access the storage
+    documents = GeneratedDocx.objects.select_related('club', 'advisor').in_bulk([i.generated_docx_id for i in items])
+    tasks = list()
+    for i in items:
+        try:
+            document = documents[i.generated_docx_id]
+            tasks.append((i, (document.get_file_names()[0], document.get_data(), document.document.name)))
+        except Exception as exception:
+            i.status, i.last_error = 'F', repr(exception)
+
+    if executor is not None:
+        futures = [executor.submit(render_docx, *arguments) for i, arguments in tasks]
+
+    try:
+        for index, (i, arguments) in enumerate(tasks):
+            try:
+                if executor is not None:
+                    futures[index].result()
+                else:
+                    render_docx(*arguments)
+                i.status, i.last_error = 'D', None
+            except BrokenProcessPool:
+                raise
+            except Exception as exception:
+                i.status, i.last_error = 'F', repr(exception)
+    finally:
+        # Forms left unrendered by a broken executor are released to be claimed again, instead of failing
+        for i in items:
+            if i.status == 'P':
+                i.status = 'W'
+
+        DocxBatchItem.objects.bulk_update(items, ('status', 'last_error'))
+
+        # Batches without waiting or rendering forms are done
+        for i in batch_ids:
+            if not DocxBatchItem.objects.filter(batch_id=i, status__in=('W', 'P')).exists():
+                DocxBatch.objects.filter(pk=i).exclude(status='D').update(status='D', finished_at=timezone.now())
+
+    return len(items)
+
+
+class ArchiveBuffer:
+    ''' Write-only file object collecting archive output until it is handed over to a streaming response '''
+    def __init__(self):
+        ''' Constructor '''
+        self.chunks = list()
+
+    def write(self, data):
+        ''' Write data '''
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        ''' Flush, nothing is buffered beyond the pending chunks '''
+
+    def pop(self):
+        ''' Take out the pending chunks '''
+        data, self.chunks = bytes().join(self.chunks), list()
+        return data
+
+
+def stream_docx_batch(batch):
+    ''' Stream the rendered forms of a batch as a ZIP archive, holding at most one chunk of a file in memory '''
+    buffer = ArchiveBuffer()
+    items = batch.items.filter(status='D').select_related('generated_docx__club').order_by('id')
+
+    # Documents are already compressed, so they are stored as is
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for i in items.iterator():
+            name = i.generated_docx.document.name
+            archive_name = '{}-{}'.format(i.generated_docx.club_id, posixpath.basename(name))
+
+            with default_storage.open(name, 'rb') as file_in, archive.open(archive_name, 'w') as file_out:
+                while True:
+                    chunk = file_in.read(DOCX_ARCHIVE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file_out.write(chunk)
+                    yield buffer.pop()
+            yield buffer.pop()
+
+    yield buffer.pop()
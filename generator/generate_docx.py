@@ -8,17 +8,133 @@ from datetime import datetime
 
 from django.core.files.storage import default_storage
 from docx import Document
+from docx.text.run import Run
 
-from clubs_and_events.settings import STORAGE_BASE_DIR, STUDENT_COMMITTEE_PRESIDENT_NAME, STUDENT_COMMITTEE_ADVISOR_NAME
+from clubs_and_events.settings import DEBUG, STUDENT_COMMITTEE_PRESIDENT_NAME, STUDENT_COMMITTEE_ADVISOR_NAME
 from membership.models import Membership
 
+import copy
+import os
+import re
+import threading
+
+
+TEMPLATE_DIRECTORY = 'generator/docx'
+PLACEHOLDER_PATTERN = re.compile(r'\{([a-z_]+)\}')
+
+_templates = dict()
+_templates_lock = threading.Lock()
+
+
+class DocxTemplate:
+    ''' Microsoft Word document template, parsed once with an index of the runs containing placeholders '''
+    def __init__(self, path):
+        ''' Constructor '''
+        self.path = path
+        self.modified_time = None
+        self.document = None
+        self.placeholders = tuple()
+        self.load()
+
+    def load(self):
+        ''' Load the template file and index its placeholder runs by their path in the document tree '''
+        modified_time = os.path.getmtime(self.path)
+        document = Document(self.path)
+        tree = document.element.getroottree()
+
+        # Same runs as a full scan over body paragraphs and table cells, merged cells are only indexed once
+        runs = [(i, False) for j in document.paragraphs for i in j.runs]
+        runs += [(i, True) for table in document.tables for row in table.rows for cell in row.cells
+                 for j in cell.paragraphs for i in j.runs]
+
+        placeholders, paths = list(), set()
+        for run, is_in_table in runs:
+            keys = tuple(PLACEHOLDER_PATTERN.findall(run.text))
+            path = tree.getpath(run._r)
+            if len(keys) > 0 and path not in paths:
+                placeholders.append((path, is_in_table, keys))
+                paths.add(path)
+
+        self.document, self.placeholders, self.modified_time = document, tuple(placeholders), modified_time
+
+    def is_modified(self):
+        ''' Verify if the template file is modified since it was loaded '''
+        return os.path.getmtime(self.path) != self.modified_time
+
+    def fill(self, data):
+        ''' Fill a copy of the template, lists are numbered lines outside of tables and left out inside of them '''
+        # The part is copied rather than the document, whose cached body would otherwise point into a separate copy
+        document = copy.deepcopy(self.document.part).document
+
+        for path, is_in_table, keys in self.placeholders:
+            run = Run(document.element.xpath(path)[0], None)
+            text = run.text
+
+            for i in keys:
+                if isinstance(data.get(i), str):
+                    text = text.replace('{%s}' % i, data[i])
+                elif isinstance(data.get(i), list) and not is_in_table:
+                    text = text.replace('{%s}' % i, '\n'.join(['\t{}. {}'.format(
+                        j + 1, data[i][j].replace('\n', '').replace('\r', '')
+                    ) for j in range(len(data[i]))]))
+
+            run.text = text
+
+        return document
+
+
+def get_docx_template(file_name):
+    ''' Get a Microsoft Word document template, loaded once per process and reloaded on modification in debug mode '''
+    template = _templates.get(file_name)
+
+    if template is None or (DEBUG and template.is_modified()):
+        with _templates_lock:
+            template = _templates.get(file_name)
+            if template is None:
+                template = DocxTemplate(os.path.join(TEMPLATE_DIRECTORY, file_name))
+            elif DEBUG and template.is_modified():
+                template.load()
+            _templates[file_name] = template
+
+    return template
+
+
+def fill_docx_template(file_name, data):
+    ''' Fill a Microsoft Word document template with data, placeholders missing from the data are left as is '''
+    return get_docx_template(file_name).fill(data)
+
 
 def generate_docx(file_name, existing_docx=None, club=None, advisor=None, objective=str(), objective_list=tuple(),
                   room=str(), schedule=str(), plan_list=tuple(), merit=str(), save=False):
     ''' Generate Microsoft Word document based on template '''
-    # Init Document
-    document = Document('generator/docx/{}'.format(file_name))
+    # Fill Document
+    document = fill_docx_template(file_name, get_docx_data(
+        club=club, advisor=advisor, objective=objective, objective_list=objective_list, room=room,
+        schedule=schedule, plan_list=plan_list, merit=merit
+    ))
 
+    # Document Saving
+    if save:
+        storage_access = default_storage.open(existing_docx.name, 'wb')
+        document.save(storage_access)
+        storage_access.close()
+
+    # Return
+    return document
+
+
+def render_docx(file_name, data, name):
+    ''' Fill a template with prepared data and write it into the storage, able to run in a worker process '''
+    document = fill_docx_template(file_name, data)
+
+    storage_access = default_storage.open(name, 'wb')
+    document.save(storage_access)
+    storage_access.close()
+
+
+def get_docx_data(club=None, advisor=None, objective=str(), objective_list=str(), room=str(), schedule=str(),
+                  plan_list=str(), merit=str()):
+    ''' Get the template data of a club's form, the only part of generating a document which queries the database '''
     # Storing Data
     data = {
         'date': get_date(),
@@ -52,38 +168,7 @@ def generate_docx(file_name, existing_docx=None, club=None, advisor=None, object
     for i in ('advisor', 'room'):
         data[i] = '\t' + data[i]
 
-    # Replace Paragraphs
-    for paragraph in document.paragraphs:
-        for inline in paragraph.runs:
-            for j in data:
-                if isinstance(data[j], str):
-                    inline.text = inline.text.replace('{%s}' % j, data[j])
-                elif isinstance(data[j], list):
-                    inline.text = inline.text.replace(
-                        '{%s}' % j,
-                        '\n'.join(['\t{}. {}'.format(
-                            i + 1, data[j][i].replace('\n', '').replace('\r', '')
-                        ) for i in range(len(data[j]))])
-                    )
-
-    # Replace Paragraphs in Tables
-    for table in document.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    for inline in paragraph.runs:
-                        for j in data:
-                            if isinstance(data[j], str):
-                                inline.text = inline.text.replace('{%s}' % j, data[j])
-
-    # Document Saving
-    if save:
-        storage_access = default_storage.open(existing_docx.name, 'wb')
-        document.save(storage_access)
-        storage_access.close()
-
-    # Return
-    return document
+    return data
 
 
 def get_date(date=datetime.now().date()):
@@ -0,0 +1,113 @@
+'''
+    Generator Application Generate QR Code Script
+    generator/generate_qr_code.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from clubs_and_events.settings import STORAGE_BASE_DIR, QR_CODE_SIZES, QR_CODE_DEFAULT_SIZE
+
+import hashlib
+import qrcode
+import qrcode.image.svg
+import threading
+
+
+QR_CODE_FORMATS = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml'
+}
+
+_stored_names = set()
+_stored_names_lock = threading.Lock()
+
+
+def get_qr_code_key(url, size=QR_CODE_DEFAULT_SIZE, image_format='png'):
+    ''' Get the content address of a rendered QR code, SVG output does not depend on the size '''
+    if image_format == 'svg':
+        size = 0
+    return hashlib.sha256('{}\n{}\n{}'.format(url, size, image_format).encode('utf-8')).hexdigest()
+
+
+def get_qr_code_name(url, size=QR_CODE_DEFAULT_SIZE, image_format='png'):
+    ''' Get the storage name of a rendered QR code '''
+    return '{}/{}.{}'.format(get_qr_code_directory(), get_qr_code_key(url, size, image_format), image_format)
+
+
+def get_qr_code_directory():
+    ''' Get the storage directory of rendered QR codes '''
+    return '{}/qr_code/cache'.format(STORAGE_BASE_DIR)
+
+
+def get_qr_code_names(url):
+    ''' Get the storage names of a QR code of a URL in every size and format it is able to be rendered in '''
+    return set(
+        get_qr_code_name(url, i, j) for i in set(QR_CODE_SIZES) | {QR_CODE_DEFAULT_SIZE} for j in QR_CODE_FORMATS
+    )
+
+
+def delete_qr_code(url):
+    ''' Delete every stored rendering of a QR code of a URL '''
+    names = get_qr_code_names(url)
+
+    with _stored_names_lock:
+        _stored_names.difference_update(names)
+
+    for i in names:
+        default_storage.delete(i)
+
+
+def render_qr_code(url, size=QR_CODE_DEFAULT_SIZE, image_format='png'):
+    ''' Render a QR code of a URL into bytes, raster images are centered on a white square of the given size '''
+    qr_code = qrcode.QRCode(border=4)
+    qr_code.add_data(url)
+    qr_code.make(fit=True)
+
+    buffer = BytesIO()
+
+    if image_format == 'svg':
+        qr_code.make_image(image_factory=qrcode.image.svg.SvgPathFillImage).save(buffer)
+        return buffer.getvalue()
+
+    # Whole pixels per module keep the modules sharp, the remainder becomes extra white border
+    qr_code.box_size = max(1, size // (qr_code.modules_count + qr_code.border * 2))
+    qr_code_image = qr_code.make_image()
+
+    canvas = Image.new('RGB', (max(size, qr_code_image.pixel_size),) * 2, 'white')
+    offset = (canvas.width - qr_code_image.pixel_size) // 2
+    canvas.paste(qr_code_image, (offset, offset))
+    canvas.save(buffer, image_format.upper())
+    canvas.close()
+
+    return buffer.getvalue()
+
+
+def get_qr_code(url, size=QR_CODE_DEFAULT_SIZE, image_format='png'):
+    ''' Get the storage name and bytes of a QR code, rendering and storing it only if not yet stored '''
+    name = get_qr_code_name(url, size, image_format)
+
+    with _stored_names_lock:
+        is_stored = name in _stored_names
+
+    content = None
+    if is_stored or default_storage.exists(name):
+        try:
+            with default_storage.open(name, 'rb') as qr_code_in:
+                content = qr_code_in.read()
+        except FileNotFoundError:
+            pass
+
+    if content is None:
+        content = render_qr_code(url, size, image_format)
+        default_storage.save(name, ContentFile(content))
+
+    with _stored_names_lock:
+        _stored_names.add(name)
+
+    return name, content
@@ -0,0 +1,95 @@
+'''
+    Generator Application Benchmark Microsoft Word Document Command
+    generator/management/commands/benchmark_docx.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from docx import Document
+
+from community.models import Club
+from core.utils.benchmarks import rollback_fixture, measure, log_measurement
+from core.utils.logs import log
+from generator.generate_docx import TEMPLATE_DIRECTORY, generate_docx, fill_docx_template
+from membership.models import Membership
+
+import os
+
+
+TEMPLATE_FILE_NAME = 'form-club-renewal-template.docx'
+
+
+def fill_legacy(data):
+    ''' Fills the template as done before templates were cached, reading it and scanning every run for every key '''
+    document = Document(os.path.join(TEMPLATE_DIRECTORY, TEMPLATE_FILE_NAME))
+
+    for paragraph in document.paragraphs:
+        for inline in paragraph.runs:
+            for j in data:
+                if isinstance(data[j], str):
+                    inline.text = inline.text.replace('{%s}' % j, data[j])
+                elif isinstance(data[j], list):
+                    inline.text = inline.text.replace('{%s}' % j, '\n'.join(
+                        ['\t{}. {}'.format(i + 1, data[j][i]) for i in range(len(data[j]))]
+                    ))
+
+    for table in document.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    for inline in paragraph.runs:
+                        for j in data:
+                            if isinstance(data[j], str):
+                                inline.text = inline.text.replace('{%s}' % j, data[j])
+
+    return document
+
+
+class Command(BaseCommand):
+    ''' Measures generating many club renewal forms '''
+    help = 'Benchmarks club renewal form generation on a generated club, which is rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--forms', type=int, default=500, help='Amount of renewal forms to generate')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        with rollback_fixture():
+            president = get_user_model().objects.create_user(username='benchmark_docx_01', name='Benchmark President')
+            advisor = get_user_model().objects.create_user(username='benchmark_docx_02', name='Benchmark Advisor')
+            club = Club.objects.create(name_th='ชุมนุมทดสอบเอกสาร', name_en='Document Benchmark Club')
+            Membership.objects.create(community_id=club.id, user_id=president.id, position=3)
+
+            fields = {
+                'club': club, 'advisor': advisor, 'objective': 'Objective', 'objective_list': 'First\nSecond',
+                'room': 'L203', 'schedule': 'Every Friday', 'plan_list': 'First\nSecond', 'merit': 'Merit'
+            }
+
+            data = {
+                'date': str(), 'club_name': club.name_th, 'president': president.name, 'advisor': advisor.name,
+                'staff_list': [president.name], 'member_list': [president.name], 'objective_list': ['First', 'Second'],
+                'plan_list': ['First', 'Second']
+            }
+
+            def run(function):
+                ''' Run a function once per form, documents are discarded right away to keep memory flat '''
+                for _ in range(options['forms']):
+                    function()
+
+            log('Forms: {}'.format(options['forms']))
+            _, elapsed, query_count = measure(
+                lambda: run(lambda: fill_docx_template(TEMPLATE_FILE_NAME, data)), repeat=3
+            )
+            log_measurement('  Cached template (fill only)', elapsed, query_count)
+
+            _, elapsed, query_count = measure(lambda: run(lambda: fill_legacy(data)), repeat=1)
+            log_measurement('  Legacy (fill only)', elapsed, query_count)
+
+            _, elapsed, query_count = measure(
+                lambda: run(lambda: generate_docx(TEMPLATE_FILE_NAME, **fields).save(BytesIO())), repeat=1
+            )
+            log_measurement('  Generated and written', elapsed, query_count)
@@ -0,0 +1,44 @@
+'''
+    Generator Application Clean QR Code Cache Command
+    generator/management/commands/clean_qr_code_cache.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.utils.logs import log
+from generator.generate_qr_code import get_qr_code_directory, get_qr_code_names
+from generator.models import QRCode
+
+
+class Command(BaseCommand):
+    ''' Deletes stored QR code renderings which no QR code points to '''
+    help = 'Deletes rendered QR codes in the storage of which the URL no longer belongs to any QR code.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--dry-run', action='store_true', help='Only count unused renderings, deleting nothing')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        directory = get_qr_code_directory()
+
+        try:
+            file_names = default_storage.listdir(directory)[1]
+        except FileNotFoundError:
+            file_names = list()
+
+        used_names = set()
+        for url in QRCode.objects.values_list('url', flat=True).distinct().iterator():
+            used_names |= get_qr_code_names(url)
+
+        unused_names = [i for i in ('{}/{}'.format(directory, j) for j in file_names) if i not in used_names]
+
+        if not options['dry_run']:
+            for i in unused_names:
+                default_storage.delete(i)
+
+        log('QR code cache: {} unused of {} rendering(s){}'.format(
+            len(unused_names), len(file_names), ', nothing deleted' if options['dry_run'] else ' deleted'
+        ))
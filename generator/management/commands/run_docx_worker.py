@@ -0,0 +1,62 @@
+'''
+    Generator Application Run Document Worker Command
+    generator/management/commands/run_docx_worker.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from clubs_and_events.settings import DOCX_WORKER_BATCH_SIZE, DOCX_WORKER_IDLE_INTERVAL
+from core.utils.logs import log, warning
+from generator.docx_batches import process_docx_batch_items
+
+import time
+
+
+class Command(BaseCommand):
+    ''' Renders club forms of document batches in the background, optionally in a pool of processes '''
+    help = 'Runs the document worker, which renders waiting forms of document batches.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument(
+            '--batch-size', type=int, default=DOCX_WORKER_BATCH_SIZE, help='Amount of forms rendered per batch'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=0, help='Amount of worker processes, forms are rendered in-process if 0'
+        )
+        parser.add_argument('--once', action='store_true', help='Render every waiting form once, then exit')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        executor = self.create_executor(options['processes'])
+
+        try:
+            while True:
+                try:
+                    amount = process_docx_batch_items(batch_size=options['batch_size'], executor=executor)
+                except BrokenProcessPool:
+                    warning('Document worker process pool broke, restarting it.')
+                    executor.shutdown(wait=False)
+                    executor = self.create_executor(options['processes'])
+                    continue
+
+                if amount > 0:
+                    log('Document worker rendered {} form(s).'.format(amount))
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(DOCX_WORKER_IDLE_INTERVAL)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def create_executor(self, processes):
+        ''' Create the pool of worker processes, None to render forms in-process '''
+        if processes > 0:
+            # Template data is queried by this process, worker processes never use the inherited database connection
+            return ProcessPoolExecutor(max_workers=processes)
+        return None
@@ -9,18 +9,20 @@ from django.core.exceptions import ValidationError
 from django.core.files import File
 from django.db import models
 from django.utils.translation import gettext as _
+from django_cleanup import cleanup
 from io import BytesIO
-from PIL import Image
 
 from clubs_and_events.settings import STORAGE_BASE_DIR
 from community.models import Club, Event
+from core.utils.files import get_image_metadata, set_image_metadata
 from core.utils.objects import save_user_attributes
-from generator.generate_docx import generate_docx
+from generator.generate_docx import generate_docx, get_docx_data
+from generator.generate_qr_code import get_qr_code, get_qr_code_name, delete_qr_code
 
 import os
-import qrcode
 
 
+@cleanup.ignore
 class QRCode(models.Model):
     ''' QR code model '''
     def get_image_path(self, file_name):
@@ -29,6 +31,11 @@ class QRCode(models.Model):
 
     url = models.CharField(max_length=255)
     image = models.ImageField(upload_to=get_image_path, blank=True)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_mime = models.CharField(max_length=32, null=True, blank=True, editable=False)
+    image_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
     event = models.OneToOneField(Event, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
@@ -40,18 +47,29 @@ class QRCode(models.Model):
 
     def save(self, *args, **kwargs):
         ''' Save instance '''
-        qr_code_image = qrcode.make(self.url)
-        canvas = Image.new('RGB', (qr_code_image.pixel_size, qr_code_image.pixel_size), 'white')
-        canvas.paste(qr_code_image)
-        buffer = BytesIO()
-        canvas.save(buffer, 'PNG')
-        self.image.save('qr_code.png', File(buffer), save=False)
-        canvas.close()
+        # Rendered QR codes are content-addressed, an unchanged URL already points to its image
+        previous_url = None
+        if self.image.name != get_qr_code_name(self.url):
+            if self.pk is not None:
+                previous_url = QRCode.objects.filter(pk=self.pk).values_list('url', flat=True).first()
+
+            name, content = get_qr_code(self.url)
+            self.image.name = name
+            set_image_metadata(self, 'image', get_image_metadata(BytesIO(content)))
 
         save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name=None)
 
         super(QRCode, self).save(*args, **kwargs)
 
+        if previous_url is not None and previous_url != self.url:
+            delete_unused_qr_code(previous_url)
+
+
+def delete_unused_qr_code(url):
+    ''' Delete the stored renderings of a QR code of a URL once no QR code points to the URL '''
+    if not QRCode.objects.filter(url=url).exists():
+        delete_qr_code(url)
+
 
 class JoinKey(models.Model):
     ''' Join key model '''
@@ -116,17 +134,25 @@ class GeneratedDocx(models.Model):
         ''' String representation '''
         return self.club.name_en
 
+    def get_file_names(self):
+        ''' Get the template file name and the generated file name, by whether the club is official '''
+        if not self.club.is_official:
+            return 'form-club-creation-template.docx', 'generated-form-club-creation.docx'
+        return 'form-club-renewal-template.docx', 'generated-form-club-renewal.docx'
+
+    def get_data(self):
+        ''' Get the template data of the form '''
+        return get_docx_data(
+            club=self.club, advisor=self.advisor, objective=self.objective, objective_list=self.objective_list,
+            room=self.room, schedule=self.schedule, plan_list=self.plan_list, merit=self.merit
+        )
+
     def save(self, *args, **kwargs):
         ''' Save instance '''
         buffer = BytesIO()
 
         # Template selection
-        if not self.club.is_official:
-            template_file_name = 'form-club-creation-template.docx'
-            generated_file_name = 'generated-form-club-creation.docx'
-        else:
-            template_file_name = 'form-club-renewal-template.docx'
-            generated_file_name = 'generated-form-club-renewal.docx'
+        template_file_name, generated_file_name = self.get_file_names()
 
         # Save an empty file as a path for model
         self.document.save(
@@ -155,3 +181,68 @@ class GeneratedDocx(models.Model):
 
         # Save
         super(GeneratedDocx, self).save(*args, **kwargs)
+
+
+class DocxBatch(models.Model):
+    ''' Batch of club forms regenerated in the background, downloadable as a single archive '''
+    STATUS = (
+        ('W', 'Waiting'),
+        ('P', 'Processing'),
+        ('D', 'Done')
+    )
+
+    status = models.CharField(max_length=1, choices=STATUS, default='W')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='docx_batch_created_by')
+
+    def __str__(self):
+        ''' String representation '''
+        return '{} ({})'.format(self.id, self.status)
+
+    def save(self, *args, **kwargs):
+        ''' Save instance '''
+        save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name=None)
+        super(DocxBatch, self).save(*args, **kwargs)
+
+    def get_progress(self):
+        ''' Get the amount of forms in the batch, in total and by status '''
+        counts = dict(self.items.values_list('status').annotate(count=models.Count('id')))
+
+        return {
+            'total': sum(counts.values()),
+            'done': counts.get('D', 0),
+            'failed': counts.get('F', 0)
+        }
+
+
+class DocxBatchItem(models.Model):
+    ''' Club form of a batch, rendered by the document worker '''
+    STATUS = (
+        ('W', 'Waiting'),
+        ('P', 'Processing'),
+        ('D', 'Done'),
+        ('F', 'Failed')
+    )
+
+    batch = models.ForeignKey(DocxBatch, on_delete=models.CASCADE, related_name='items')
+    generated_docx = models.ForeignKey(GeneratedDocx, on_delete=models.CASCADE)
+    status = models.CharField(max_length=1, choices=STATUS, default='W')
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ''' Meta '''
+        indexes = (
+            models.Index(fields=('status', 'batch')),
+            models.Index(fields=('batch', 'status'))
+        )
+        constraints = (
+            models.UniqueConstraint(fields=('batch', 'generated_docx'), name='unique_docx_batch_item'),
+        )
+
+    def __str__(self):
+        ''' String representation '''
+        return '{}, {} ({})'.format(self.batch_id, self.generated_docx_id, self.status)
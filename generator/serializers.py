@@ -9,9 +9,11 @@ from django.core.validators import URLValidator
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
+from community.models import Club
 from core.permissions import IsDeputyLeaderOfCommunity, IsInActiveCommunity
 from core.utils.serializer import raise_validation_errors, add_error_message
-from generator.models import QRCode, JoinKey, GeneratedDocx
+from generator.docx_batches import get_renewable_forms, create_docx_batch
+from generator.models import QRCode, JoinKey, GeneratedDocx, DocxBatch
 from membership.models import Membership
 from user.permissions import IsLecturerObject
 
@@ -178,3 +180,42 @@ class NotExistingGeneratedDocxSerializer(GeneratedDocxSerializerTemplate):
         raise_validation_errors(errors)
 
         return data
+
+
+class DocxBatchSerializer(serializers.ModelSerializer):
+    ''' Microsoft Word document batch serializer '''
+    clubs = serializers.PrimaryKeyRelatedField(queryset=Club.objects.all(), many=True, required=False, write_only=True)
+    is_renewable = serializers.BooleanField(default=False, write_only=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        ''' Meta '''
+        model = DocxBatch
+        fields = '__all__'
+        read_only_fields = ('status', 'finished_at', 'created_by')
+
+    def get_progress(self, obj):
+        ''' Retrieve progress '''
+        return obj.get_progress()
+
+    def validate(self, data):
+        ''' Validate data, resolving the selected clubs into their generated forms '''
+        errors = dict()
+
+        forms = GeneratedDocx.objects.none()
+        if data['is_renewable']:
+            forms |= get_renewable_forms()
+        if 'clubs' in data.keys() and len(data['clubs']) > 0:
+            forms |= GeneratedDocx.objects.filter(club_id__in=[i.id for i in data['clubs']])
+
+        data['generated_docx_ids'] = list(forms.values_list('id', flat=True))
+        if len(data['generated_docx_ids']) == 0:
+            add_error_message(errors, key='clubs', message='None of the selected clubs have a generated form.')
+
+        raise_validation_errors(errors)
+
+        return data
+
+    def create(self, validated_data):
+        ''' Create a batch of the resolved forms '''
+        return create_docx_batch(validated_data['generated_docx_ids'])
@@ -5,14 +5,23 @@
 '''
 
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from io import BytesIO
+from PIL import Image
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from clubs_and_events.settings import QR_CODE_DEFAULT_SIZE, QR_CODE_CACHE_MAX_AGE, DOCX_WORKER_LEASE
 from community.models import Event, Club
-from generator.models import QRCode, JoinKey, GeneratedDocx
+from generator.docx_batches import create_docx_batch, process_docx_batch_items
+from generator.generate_docx import get_docx_template, fill_docx_template
+from generator.models import QRCode, JoinKey, GeneratedDocx, DocxBatch, DocxBatchItem
 from membership.models import Membership
+from user.models import StudentCommitteeAuthority
 
 import datetime
+import zipfile
 
 
 class QRCodeAPITest(APITestCase):
@@ -137,6 +146,56 @@ class QRCodeAPITest(APITestCase):
 
         self.client.logout()
 
+    def test_qr_code_image(self):
+        ''' Test retrieve QR code image in sizes and formats '''
+        self.client.login(username='user_03', password='12345678')
+
+        qr_code = QRCode.objects.create(url='https://www.google.com/', event_id=self.event.id)
+        name = qr_code.image.name
+        qr_code.save()
+        self.assertEqual(QRCode.objects.get(pk=qr_code.id).image.name, name)
+        self.assertEqual(qr_code.image_mime, 'image/png')
+        self.assertEqual(qr_code.image_width, QR_CODE_DEFAULT_SIZE)
+
+        response = self.client.get('/api/generator/qr-code/{}/image/?size=256&format=png'.format(qr_code.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn('max-age={}'.format(QR_CODE_CACHE_MAX_AGE), response['Cache-Control'])
+        self.assertEqual(Image.open(BytesIO(response.content)).size, (256, 256))
+
+        response = self.client.get(
+            '/api/generator/qr-code/{}/image/?size=256&format=png'.format(qr_code.id),
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get('/api/generator/qr-code/{}/image/?format=svg'.format(qr_code.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+
+        response = self.client.get('/api/generator/qr-code/{}/image/?size=100'.format(qr_code.id))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/generator/qr-code/{}/image/?format=gif'.format(qr_code.id))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.logout()
+
+    def test_qr_code_renderings_deleted(self):
+        ''' Test deleting stored QR code renderings once no QR code points to their URL '''
+        qr_code = QRCode.objects.create(url='https://www.google.com/', event_id=self.event.id)
+        previous_name = qr_code.image.name
+        self.assertTrue(default_storage.exists(previous_name))
+
+        qr_code.url = 'https://www.google.co.th/'
+        qr_code.save()
+        self.assertFalse(default_storage.exists(previous_name))
+        self.assertTrue(default_storage.exists(qr_code.image.name))
+
+        name = qr_code.image.name
+        qr_code.delete()
+        self.assertFalse(default_storage.exists(name))
+
     def _test_crud(self, user_id, create_code=201, retrieve_code=200, update_code=405, delete_code=204):
         ''' Testing CRUD function '''
         self.client.login(username=user_id, password='12345678')
@@ -509,6 +568,29 @@ class GeneratedDocxAPITest(APITestCase):
 
         self.client.logout()
 
+    def test_fill_docx_template(self):
+        ''' Test filling a cached Microsoft Word document template '''
+        data = {
+            'date': '1 ธันวาคม 2563', 'club_name': 'ทดสอบ', 'student_committee_advisor': 'Advisor',
+            'student_committee_president': 'President', 'president': 'User One', 'advisor': '\tProf.Lazy Bones',
+            'staff_list': ['User One'], 'objective': 'Objective', 'objective_list': ['First', 'Second'],
+            'room': '\tL203', 'schedule': '\tSchedule', 'plan_list': ['Plan'], 'merit': '\tMerit',
+            'member_list': ['User One', 'User Two']
+        }
+
+        for i in ('form-club-creation-template.docx', 'form-club-renewal-template.docx'):
+            template = get_docx_template(i)
+            self.assertIs(get_docx_template(i), template)
+
+            text = '\n'.join([j.text for j in fill_docx_template(i, data).paragraphs])
+            self.assertNotIn('{club_name}', text)
+            self.assertNotIn('{member_list}', text)
+            self.assertIn('\t2. User Two', text)
+
+            # The cached document is copied, never filled itself
+            text = '\n'.join([j.text for j in template.document.paragraphs])
+            self.assertIn('{club_name}', text)
+
     def _test_crud(self, user_id, create_code=201, retrieve_code=200, update_code=405, delete_code=204):
         ''' Testing CRUD function '''
         self.client.login(username=user_id, password='12345678')
@@ -600,3 +682,97 @@ class GeneratedDocxAPITest(APITestCase):
             merit='merit'
         )
         return self.client.delete('/api/generator/docx/{}/'.format(generated_docx.id))
+
+
+class DocxBatchAPITest(APITestCase):
+    ''' Microsoft Word document batch API test '''
+    def setUp(self):
+        ''' Set up '''
+        self.user_01 = get_user_model().objects.create_user(username='user_01', password='12345678', name='User One')
+        self.user_02 = get_user_model().objects.create_user(username='user_02', password='12345678', name='User Two')
+        self.lecturer = get_user_model().objects.create_user(
+            username='lecturer', password='12345678', name='Prof.Lazy Bones', user_group='lecturer'
+        )
+        StudentCommitteeAuthority.objects.create(
+            user_id=self.user_02.id, start_date=datetime.date.today(), end_date=datetime.date.today()
+        )
+
+        self.club_renewable = Club.objects.create(
+            name_th='ชุมนุมทดสอบต่ออายุ', name_en='Renewable Club', is_official=True,
+            valid_through=datetime.date.today() + datetime.timedelta(days=1)
+        )
+        self.club_valid = Club.objects.create(
+            name_th='ชุมนุมทดสอบยังไม่หมดอายุ', name_en='Valid Club', is_official=True,
+            valid_through=datetime.date.today() + datetime.timedelta(days=365)
+        )
+
+        for i in (self.club_renewable, self.club_valid):
+            Membership.objects.create(community_id=i.id, user_id=self.user_01.id, position=3)
+            GeneratedDocx.objects.create(
+                club_id=i.id, advisor_id=self.lecturer.id, objective='objective', objective_list='objective_list',
+                room='room', schedule='schedule', plan_list='plan_list', merit='merit'
+            )
+
+    def test_docx_batch_non_student_committee(self):
+        ''' Test document batch as non-student committee member '''
+        self.client.login(username='user_01', password='12345678')
+
+        response = self.client.post('/api/generator/docx-batch/', {'is_renewable': True})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.logout()
+
+    def test_docx_batch_renewable(self):
+        ''' Test document batch of renewable clubs, from creation to download '''
+        self.client.login(username='user_02', password='12345678')
+
+        response = self.client.post('/api/generator/docx-batch/', {'is_renewable': True})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['progress'], {'total': 1, 'done': 0, 'failed': 0})
+        batch_id = response.data['id']
+
+        response = self.client.get('/api/generator/docx-batch/{}/download/'.format(batch_id))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        self.assertEqual(process_docx_batch_items(), 1)
+        self.assertEqual(process_docx_batch_items(), 0)
+        self.assertEqual(DocxBatch.objects.get(pk=batch_id).status, 'D')
+
+        response = self.client.get('/api/generator/docx-batch/{}/'.format(batch_id))
+        self.assertEqual(response.data['progress'], {'total': 1, 'done': 1, 'failed': 0})
+
+        response = self.client.get('/api/generator/docx-batch/{}/download/'.format(batch_id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 1)
+        self.assertTrue(archive.namelist()[0].startswith('{}-'.format(self.club_renewable.id)))
+
+        self.client.logout()
+
+    def test_docx_batch_expired_lease(self):
+        ''' Test rendering forms of a worker which stopped while rendering them '''
+        batch = create_docx_batch(GeneratedDocx.objects.values_list('id', flat=True))
+        DocxBatch.objects.filter(pk=batch.id).update(status='P')
+        DocxBatchItem.objects.filter(batch_id=batch.id).update(status='P', claimed_at=timezone.now())
+        self.assertEqual(process_docx_batch_items(), 0)
+        self.assertEqual(DocxBatch.objects.get(pk=batch.id).status, 'P')
+
+        DocxBatchItem.objects.filter(batch_id=batch.id).update(claimed_at=timezone.now() - DOCX_WORKER_LEASE * 2)
+        self.assertEqual(process_docx_batch_items(), 2)
+        self.assertEqual(DocxBatch.objects.get(pk=batch.id).status, 'D')
+        self.assertEqual(DocxBatch.objects.get(pk=batch.id).get_progress(), {'total': 2, 'done': 2, 'failed': 0})
+
+    def test_docx_batch_clubs(self):
+        ''' Test document batch of selected clubs '''
+        self.client.login(username='user_02', password='12345678')
+
+        response = self.client.post('/api/generator/docx-batch/', {
+            'clubs': [self.club_renewable.id, self.club_valid.id]
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['progress']['total'], 2)
+
+        response = self.client.post('/api/generator/docx-batch/', dict())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.logout()
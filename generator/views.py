@@ -4,18 +4,33 @@
     @author Teerapat Kraisrisirikul (810Teams)
 '''
 
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, action
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.response import Response
 
+from clubs_and_events.settings import QR_CODE_SIZES, QR_CODE_DEFAULT_SIZE, QR_CODE_CACHE_MAX_AGE
 from core.permissions import IsDeputyLeaderOfCommunity, IsStaffOfCommunity, IsMemberOfCommunity, IsInActiveCommunity
 from core.utils.filters import filter_queryset, filter_queryset_permission
 from core.utils.general import get_random_string
-from generator.models import QRCode, JoinKey, GeneratedDocx
+from generator.docx_batches import stream_docx_batch
+from generator.generate_qr_code import QR_CODE_FORMATS, get_qr_code, get_qr_code_key
+from generator.models import QRCode, JoinKey, GeneratedDocx, DocxBatch
 from generator.serializers import ExistingQRCodeSerializer, NotExistingQRCodeSerializer
 from generator.serializers import ExistingJoinKeySerializer, NotExistingJoinKeySerializer
 from generator.serializers import ExistingGeneratedDocxSerializer, NotExistingGeneratedDocxSerializer
+from generator.serializers import DocxBatchSerializer
 from membership.models import Membership
+from user.permissions import IsStudentCommittee
+
+
+class QRCodeImageContentNegotiation(DefaultContentNegotiation):
+    ''' Content negotiation leaving the format query parameter to the QR code image format '''
+    def select_renderer(self, request, renderers, format_suffix=None):
+        ''' Select renderer, errors are always rendered as JSON '''
+        return super(QRCodeImageContentNegotiation, self).select_renderer(request, renderers, format_suffix='json')
 
 
 class QRCodeViewSet(viewsets.ModelViewSet):
@@ -50,6 +65,39 @@ class QRCodeViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data)
 
+    @action(detail=True, methods=('get',), content_negotiation_class=QRCodeImageContentNegotiation)
+    def image(self, request, pk=None):
+        ''' Retrieve QR code image in a size and format, rendered once and cached in the storage '''
+        obj = self.get_object()
+
+        image_format = request.query_params.get('format', 'png').lower()
+        if image_format not in QR_CODE_FORMATS:
+            return Response({
+                'detail': 'The format must be one of {}.'.format(', '.join(QR_CODE_FORMATS))
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            size = int(request.query_params.get('size', QR_CODE_DEFAULT_SIZE))
+        except ValueError:
+            size = None
+        if size not in QR_CODE_SIZES:
+            return Response({
+                'detail': 'The size must be one of {}.'.format(', '.join([str(i) for i in QR_CODE_SIZES]))
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # The key addresses the rendered content, so a matching entity tag is answered without the storage
+        etag = '"{}"'.format(get_qr_code_key(obj.url, size, image_format))
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            name, content = get_qr_code(obj.url, size, image_format)
+            response = HttpResponse(content, content_type=QR_CODE_FORMATS[image_format])
+
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, max_age=QR_CODE_CACHE_MAX_AGE, immutable=True)
+
+        return response
+
 
 class JoinKeyViewSet(viewsets.ModelViewSet):
     ''' Join key view set '''
@@ -180,3 +228,27 @@ class GeneratedDocxViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
 
         return Response(serializer.data)
+
+
+class DocxBatchViewSet(viewsets.ModelViewSet):
+    ''' Microsoft Word document batch view set '''
+    queryset = DocxBatch.objects.all()
+    serializer_class = DocxBatchSerializer
+    http_method_names = ('get', 'post', 'head', 'options')
+
+    def get_permissions(self):
+        ''' Get permissions '''
+        return (permissions.IsAuthenticated(), IsStudentCommittee())
+
+    @action(detail=True, methods=('get',))
+    def download(self, request, pk=None):
+        ''' Download the rendered forms of a finished batch as a ZIP archive, streamed from the storage '''
+        batch = self.get_object()
+
+        if batch.status != 'D':
+            return Response({'detail': 'The batch is not done yet.'}, status=status.HTTP_409_CONFLICT)
+
+        response = StreamingHttpResponse(stream_docx_batch(batch), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="forms-{}.zip"'.format(batch.id)
+
+        return response
@@ -0,0 +1,22 @@
+'''
+    Membership Application Backfill Current Logs Command
+    membership/management/commands/backfill_current_logs.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from core.utils.logs import log
+from membership.models import Membership, MembershipLog
+
+
+class Command(BaseCommand):
+    ''' Points memberships saved before the current log existed to their latest membership log '''
+    help = 'Backfills the current log of existing memberships.'
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        latest_logs = MembershipLog.objects.filter(membership_id=OuterRef('pk')).order_by('-id').values('id')[:1]
+        count = Membership.objects.filter(current_log__isnull=True).update(current_log_id=Subquery(latest_logs))
+        log('Membership: {} rows backfilled'.format(count))
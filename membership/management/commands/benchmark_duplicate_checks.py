@@ -0,0 +1,75 @@
+'''
+    Membership Application Benchmark Duplicate Checks Command
+    membership/management/commands/benchmark_duplicate_checks.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from community.models import Club
+from core.utils.benchmarks import rollback_fixture, measure, log_measurement
+from core.utils.logs import log
+from membership.models import Membership, Request, Invitation
+
+
+def clean(obj):
+    ''' Validate the object, returns the error codes '''
+    try:
+        obj.clean()
+    except ValidationError as error:
+        return [i.code for i in error.error_list]
+    return list()
+
+
+def is_duplicated_legacy(user_id, community_id):
+    ''' Check a join request for duplicates by loading every pending row, as done before '''
+    memberships = Membership.objects.filter(status__in=('A', 'R'))
+    requests = Request.objects.filter(status='W')
+    invitations = Invitation.objects.filter(status='W')
+
+    return (user_id, community_id) in [(i.user.id, i.community.id) for i in memberships] or \
+        (user_id, community_id) in [(i.user.id, i.community.id) for i in requests] or \
+        (user_id, community_id) in [(i.invitee.id, i.community.id) for i in invitations]
+
+
+class Command(BaseCommand):
+    ''' Measures join request duplicate checks on a large membership table '''
+    help = 'Benchmarks join request validation on generated memberships, which are rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--users', type=int, default=2000, help='Amount of generated users')
+        parser.add_argument('--clubs', type=int, default=100, help='Amount of generated clubs joined by every user')
+        parser.add_argument(
+            '--legacy', action='store_true', help='Also measure loading every pending row, which is very slow'
+        )
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        with rollback_fixture():
+            get_user_model().objects.bulk_create([
+                get_user_model()(username='benchmark_member_{}'.format(i), name='Benchmark User {}'.format(i))
+                for i in range(options['users'])
+            ], batch_size=1000)
+            clubs = [
+                Club.objects.create(name_th='ชุมนุมทดสอบ {}'.format(i), name_en='Benchmark Club {}'.format(i))
+                for i in range(options['clubs'])
+            ]
+
+            users = list(get_user_model().objects.filter(username__startswith='benchmark_member_'))
+            Membership.objects.bulk_create([
+                Membership(user_id=i.id, community_id=j.id) for i in users for j in clubs
+            ], batch_size=5000)
+
+            outsider = get_user_model().objects.create_user(username='benchmark_outsider', name='Benchmark Outsider')
+            request = Request(user_id=outsider.id, community_id=clubs[-1].id)
+
+            log('Memberships: {}'.format(Membership.objects.count()))
+            _, elapsed, query_count = measure(lambda: clean(request))
+            log_measurement('  Exists queries', elapsed, query_count)
+
+            if options['legacy']:
+                _, elapsed, query_count = measure(lambda: is_duplicated_legacy(outsider.id, clubs[-1].id), repeat=1)
+                log_measurement('  Loading every row', elapsed, query_count)
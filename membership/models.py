@@ -7,7 +7,7 @@
 from crum import get_current_request
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext as _
 
@@ -15,6 +15,7 @@ from clubs_and_events.settings import STORAGE_BASE_DIR
 from community.models import Community, Lab, CommunityEvent, Club
 from core.utils.general import get_file_extension, has_instance
 from core.utils.objects import save_user_attributes
+from core.utils.users import clear_membership_index, clear_past_memberships_cache
 from user.permissions import IsStudentObject, IsLecturerObject
 
 
@@ -34,6 +35,15 @@ class Request(models.Model):
     updated_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
                                    related_name='request_updated_by')
 
+    class Meta:
+        ''' Meta '''
+        indexes = (models.Index(fields=('user', 'community', 'status')),)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'community'), condition=models.Q(status='W'), name='unique_waiting_request'
+            ),
+        )
+
     def __str__(self):
         ''' String representation '''
         return '{}, {} ({})'.format(self.user.__str__(), self.community.__str__(), self.id)
@@ -58,26 +68,23 @@ class Request(models.Model):
                         _('Only students and lecturers can request to join the lab.'), code='restricted'
                     ))
 
-        # Unable to request if the user is already a member
-        memberships = Membership.objects.filter(status__in=('A', 'R'))
-        if (self.user.id, self.community.id) in [(i.user.id, i.community.id) for i in memberships]:
-            if self.status == 'W':
+        # Unable to request if the user is already a member, or already has a pending request or invitation
+        if self.status == 'W':
+            if Membership.objects.filter(
+                user_id=self.user_id, community_id=self.community_id, status__in=('A', 'R')
+            ).exists():
                 errors.append(ValidationError(
                     _('The user is already a member of this community.'), code='already_member'
                 ))
 
-        # Unable to request if the user already has a pending request
-        requests = Request.objects.filter(status='W')
-        if self.id is not None:
-            requests = requests.exclude(pk=self.id)
-        if (self.user.id, self.community.id) in [(i.user.id, i.community.id) for i in requests]:
-            if self.status == 'W':
+            if Request.objects.filter(
+                user_id=self.user_id, community_id=self.community_id, status='W'
+            ).exclude(pk=self.id).exists():
                 errors.append(ValidationError(_('Pending request from this user already exists.'), code='restricted'))
 
-        # Unable to request if the user already has a pending invitation
-        invitations = Invitation.objects.filter(status='W')
-        if (self.user.id, self.community.id) in [(i.invitee.id, i.community.id) for i in invitations]:
-            if self.status == 'W':
+            if Invitation.objects.filter(
+                invitee_id=self.user_id, community_id=self.community_id, status='W'
+            ).exists():
                 errors.append(ValidationError(
                     _('Pending invitation to this user already exists.'), code='duplicated_invitation'
                 ))
@@ -102,6 +109,15 @@ class Invitation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        ''' Meta '''
+        indexes = (models.Index(fields=('invitee', 'community', 'status')),)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('invitee', 'community'), condition=models.Q(status='W'), name='unique_waiting_invitation'
+            ),
+        )
+
     def __str__(self):
         ''' String representation '''
         return '{}, {}, {} ({})'.format(
@@ -128,26 +144,23 @@ class Invitation(models.Model):
                         _('Only students and lecturers can be invited to the lab.'), code='restricted'
                     ))
 
-        # Unable to invite if the user is already a member
-        memberships = Membership.objects.filter(status__in=('A', 'R'))
-        if (self.invitee.id, self.community.id) in [(i.user.id, i.community.id) for i in memberships]:
-            if self.status == 'W':
+        # Unable to invite if the user is already a member, or already has a pending request or invitation
+        if self.status == 'W':
+            if Membership.objects.filter(
+                user_id=self.invitee_id, community_id=self.community_id, status__in=('A', 'R')
+            ).exists():
                 errors.append(ValidationError(
                     _('The user is already a member of this community.'), code='already_member'
                 ))
 
-        # Unable to invite if the user already has a pending request
-        requests = Request.objects.filter(status='W')
-        if (self.invitee.id, self.community.id) in [(i.user.id, i.community.id) for i in requests]:
-            if self.status == 'W':
+            if Request.objects.filter(
+                user_id=self.invitee_id, community_id=self.community_id, status='W'
+            ).exists():
                 errors.append(ValidationError(_('Pending request from this user already exists.'), code='restricted'))
 
-        # Unable to invite if the user already has a pending invitation
-        invitations = Invitation.objects.filter(status='W')
-        if self.id is not None:
-            invitations = invitations.exclude(pk=self.id)
-        if (self.invitee.id, self.community.id) in [(i.invitee.id, i.community.id) for i in invitations]:
-            if self.status == 'W':
+            if Invitation.objects.filter(
+                invitee_id=self.invitee_id, community_id=self.community_id, status='W'
+            ).exclude(pk=self.id).exists():
                 errors.append(ValidationError(
                     _('Pending invitation to this user already exists.'), code='duplicated_invitation'
                 ))
@@ -182,6 +195,15 @@ class Membership(models.Model):
                                    related_name='membership_created_by')
     updated_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
                                    related_name='membership_updated_by')
+    current_log = models.ForeignKey('MembershipLog', on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+                                    related_name='+')
+
+    class Meta:
+        ''' Meta '''
+        indexes = (
+            models.Index(fields=('user', 'community', 'status')),
+            models.Index(fields=('community', 'position', 'status'))
+        )
 
     def __str__(self):
         ''' String representation '''
@@ -190,18 +212,33 @@ class Membership(models.Model):
     def save(self, *args, **kwargs):
         ''' Save instance '''
         save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name='updated_by')
-        super(Membership, self).save(*args, **kwargs)
 
-        logs = MembershipLog.objects.filter(membership_id=self.id)
-        if len(logs) > 0:
-            log = logs[len(logs) - 1]
-            if log.position != self.position or log.status != self.status:
-                log.end_datetime = timezone.now()
-                log.save()
-                MembershipLog.objects.create(membership_id=self.id, position=self.position, status=self.status)
-        else:
-            MembershipLog.objects.create(membership_id=self.id, position=self.position, status=self.status)
+        with transaction.atomic():
+            super(Membership, self).save(*args, **kwargs)
 
+            # Memberships saved before the current log existed fall back to their latest log
+            log = self.current_log
+            if log is None:
+                log = MembershipLog.objects.filter(membership_id=self.id).order_by('-id').first()
+
+            if log is None or log.position != self.position or log.status != self.status:
+                if log is not None:
+                    log.end_datetime = timezone.now()
+                    log.save()
+                log = MembershipLog.objects.create(membership_id=self.id, position=self.position, status=self.status)
+
+            if self.current_log_id != log.id:
+                Membership.objects.filter(pk=self.id).update(current_log_id=log.id)
+                self.current_log = log
+
+        clear_membership_index(get_current_request())
+        clear_past_memberships_cache(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        ''' Delete instance '''
+        clear_membership_index(get_current_request())
+        clear_past_memberships_cache(self.user_id)
+        return super(Membership, self).delete(*args, **kwargs)
 
     def clean(self):
         ''' Validate on save '''
@@ -219,10 +256,9 @@ class Membership(models.Model):
                     ))
 
         # Duplicated membership validation
-        memberships = Membership.objects.filter(user_id=self.user.id, community_id=self.community.id)
-        if self.id is not None:
-            memberships = memberships.exclude(pk=self.id)
-        if len(memberships) > 0:
+        if Membership.objects.filter(
+            user_id=self.user_id, community_id=self.community_id
+        ).exclude(pk=self.id).exists():
             errors.append(ValidationError(
                 _('The membership of this user already exists in this community.'), code='duplicated_membership'
             ))
@@ -278,6 +314,10 @@ class MembershipLog(models.Model):
     updated_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
                                    related_name='membership_log_updated_by')
 
+    class Meta:
+        ''' Meta '''
+        indexes = (models.Index(fields=('membership', 'id')),)
+
     def __str__(self):
         ''' String representation '''
         return '{}, {}, {} ({})'.format(self.membership.__str__(), self.position, self.status, self.id)
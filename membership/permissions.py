@@ -7,6 +7,7 @@
 from rest_framework import permissions
 
 from core.permissions import IsStaffOfCommunity, IsMemberOfCommunity, IsDeputyLeaderOfCommunity, IsLeaderOfCommunity
+from core.permissions import filter_queryset_owner
 from membership.models import Request, Invitation, Membership, CustomMembershipLabel, ApprovalRequest, Advisory
 from user.permissions import IsStudentCommittee, IsSupportStaff
 
@@ -19,6 +20,14 @@ class IsAbleToRetrieveRequest(permissions.BasePermission):
             return IsMemberOfCommunity().has_object_permission(request, view, obj) or request.user.id == obj.user.id
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Request):
+            return IsMemberOfCommunity().filter_queryset(request, queryset) | filter_queryset_owner(
+                queryset, request, 'user'
+            )
+        return queryset.none()
+
 
 class IsAbleToUpdateRequest(permissions.BasePermission):
     ''' Main permission of PUT, PATCH request of Request '''
@@ -28,6 +37,12 @@ class IsAbleToUpdateRequest(permissions.BasePermission):
             return IsStaffOfCommunity().has_object_permission(request, view, obj) and obj.status == 'W'
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Request):
+            return IsStaffOfCommunity().filter_queryset(request, queryset).filter(status='W')
+        return queryset.none()
+
 
 class IsAbleToDeleteRequest(permissions.BasePermission):
     ''' Main permission of DELETE request of Request '''
@@ -37,6 +52,12 @@ class IsAbleToDeleteRequest(permissions.BasePermission):
             return request.user.id == obj.user.id and obj.status == 'W'
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Request):
+            return filter_queryset_owner(queryset, request, 'user').filter(status='W')
+        return queryset.none()
+
 
 class IsAbleToRetrieveInvitation(permissions.BasePermission):
     ''' Main permission of GET request of Invitation '''
@@ -46,6 +67,14 @@ class IsAbleToRetrieveInvitation(permissions.BasePermission):
             return IsMemberOfCommunity().has_object_permission(request, view, obj) or request.user.id == obj.invitee.id
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Invitation):
+            return IsMemberOfCommunity().filter_queryset(request, queryset) | filter_queryset_owner(
+                queryset, request, 'invitee'
+            )
+        return queryset.none()
+
 
 class IsAbleToUpdateInvitation(permissions.BasePermission):
     ''' Main permission of PUT, PATCH request of Invitation '''
@@ -55,6 +84,12 @@ class IsAbleToUpdateInvitation(permissions.BasePermission):
             return request.user.id == obj.invitee.id and obj.status == 'W'
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Invitation):
+            return filter_queryset_owner(queryset, request, 'invitee').filter(status='W')
+        return queryset.none()
+
 
 class IsAbleToDeleteInvitation(permissions.BasePermission):
     ''' Main permission of DELETE request of Invitation '''
@@ -69,6 +104,13 @@ class IsAbleToDeleteInvitation(permissions.BasePermission):
             return IsDeputyLeaderOfCommunity().has_object_permission(request, view, obj)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Invitation):
+            return (filter_queryset_owner(queryset, request, 'invitor')
+                    | IsDeputyLeaderOfCommunity().filter_queryset(request, queryset)).filter(status='W')
+        return queryset.none()
+
 
 class IsAbleToUpdateMembership(permissions.BasePermission):
     ''' Main permission of PUT, PATCH request of Membership '''
@@ -93,6 +135,14 @@ class IsAbleToUpdateMembership(permissions.BasePermission):
             return is_membership_owner or is_deputy_leader
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Membership):
+            return (filter_queryset_owner(queryset, request, 'user')
+                    | IsDeputyLeaderOfCommunity().filter_queryset(request, queryset)) \
+                .exclude(status__in=('L', 'X')).exclude(position=3)
+        return queryset.none()
+
 
 class IsAbleToUpdateCustomMembershipLabel(permissions.BasePermission):
     ''' Main permission of PUT, PATCH request of CustomMembershipLabel '''
@@ -103,6 +153,14 @@ class IsAbleToUpdateCustomMembershipLabel(permissions.BasePermission):
                    and obj.membership.position in (1, 2)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, CustomMembershipLabel):
+            return IsDeputyLeaderOfCommunity().filter_queryset(request, queryset).filter(
+                membership__position__in=(1, 2)
+            )
+        return queryset.none()
+
 
 class IsAbleToCreateAndDeleteAdvisory(permissions.BasePermission):
     ''' Main permission of POST, DELETE request of Advisory '''
@@ -118,6 +176,12 @@ class IsAbleToCreateAndDeleteAdvisory(permissions.BasePermission):
                    or IsSupportStaff().has_permission(request, view)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Advisory) and self.has_permission(request, None):
+            return queryset
+        return queryset.none()
+
 
 class IsAbleToRetrieveApprovalRequest(permissions.BasePermission):
     ''' Main permission of GET request of ApprovalRequest '''
@@ -129,6 +193,14 @@ class IsAbleToRetrieveApprovalRequest(permissions.BasePermission):
                    or IsSupportStaff().has_permission(request, view)
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if not issubclass(queryset.model, ApprovalRequest):
+            return queryset.none()
+        elif IsStudentCommittee().has_permission(request, None) or IsSupportStaff().has_permission(request, None):
+            return queryset
+        return IsLeaderOfCommunity().filter_queryset(request, queryset)
+
 
 class IsAbleToUpdateApprovalRequest(permissions.BasePermission):
     ''' Main permission of PUT, PATCH request of ApprovalRequest '''
@@ -140,6 +212,14 @@ class IsAbleToUpdateApprovalRequest(permissions.BasePermission):
                    and obj.status == 'W'
         return False
 
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, ApprovalRequest) and (
+            IsStudentCommittee().has_permission(request, None) or IsSupportStaff().has_permission(request, None)
+        ):
+            return queryset.filter(status='W')
+        return queryset.none()
+
 
 class IsAbleToDeleteApprovalRequest(permissions.BasePermission):
     ''' Main permission of DELETE request of ApprovalRequest '''
@@ -148,3 +228,10 @@ class IsAbleToDeleteApprovalRequest(permissions.BasePermission):
         if isinstance(obj, ApprovalRequest):
             return IsLeaderOfCommunity().has_object_permission(request, view, obj) and obj.status == 'W'
         return False
+
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, ApprovalRequest):
+            return IsLeaderOfCommunity().filter_queryset(request, queryset).filter(status='W')
+        return queryset.none()
+
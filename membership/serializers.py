@@ -14,7 +14,7 @@ from community.models import Community, CommunityEvent, Club, Lab, Event
 from community.permissions import IsRenewableClub, IsMemberOfBaseCommunity
 from core.permissions import IsDeputyLeaderOfCommunity, IsLeaderOfCommunity, IsMemberOfCommunity, IsInActiveCommunity
 from core.utils.filters import get_previous_membership_log
-from core.utils.general import has_instance
+from core.utils.general import has_instance, get_instance
 from core.utils.serializer import add_error_message, validate_profanity_serializer, raise_validation_errors
 from core.utils.serializer import field_exists, is_ended_event
 from membership.models import Request, Invitation, Membership, CustomMembershipLabel, Advisory, MembershipLog
@@ -608,18 +608,21 @@ class MembershipLogSerializer(serializers.ModelSerializer):
         # Retrieve the community type
         community_type = 'สังคม'
 
+        community = obj.membership.community
+
         if use_community_name:
-            community_type = ' ' + obj.membership.community.name_th + ' '
-        elif has_instance(obj.membership.community, Club):
+            community_type = ' ' + community.name_th + ' '
+        elif has_instance(community, Club):
             community_type = 'ชุมนุม'
-        elif has_instance(obj.membership.community, CommunityEvent):
-            if has_instance(CommunityEvent.objects.get(pk=obj.membership.community.id).created_under, Club):
+        elif has_instance(community, CommunityEvent):
+            created_under = get_instance(community, CommunityEvent).created_under
+            if has_instance(created_under, Club):
                 community_type = 'กิจกรรมชุมนุม'
-            elif has_instance(CommunityEvent.objects.get(pk=obj.membership.community.id).created_under, Lab):
+            elif has_instance(created_under, Lab):
                 community_type = 'กิจกรรมห้องปฏิบัติการ'
-        elif has_instance(obj.membership.community, Event):
+        elif has_instance(community, Event):
             community_type = 'กิจกรรม'
-        elif has_instance(obj.membership.community, Lab):
+        elif has_instance(community, Lab):
             community_type = 'ห้องปฏิบัติการ'
 
         # If the first log
@@ -92,6 +92,26 @@ class GetPastMembershipsAPITest(APITestCase):
         self.assertLess(response.data[0]['start_datetime'], response.data[0]['position_start_datetime'])
         self.assertLess(response.data[0]['position_end_datetime'], response.data[0]['end_datetime'])
 
+    def test_past_membership_queries(self):
+        ''' Test retrieving past memberships in a constant amount of queries, cached until memberships change '''
+        for i in range(10):
+            self.m2pub.position = i % 3
+            self.m2pub.status = 'A' if i % 2 == 0 else 'L'
+            self.m2pub.save()
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/membership/membership/past/{}/'.format(self.user_02.id))
+        self.assertEqual(response.data[0]['position'], 2)
+
+        with self.assertNumQueries(1):
+            cached_response = self.client.get('/api/membership/membership/past/{}/'.format(self.user_02.id))
+        self.assertEqual(cached_response.data, response.data)
+
+        self.m2pub.status = 'A'
+        self.m2pub.save()
+        response = self.client.get('/api/membership/membership/past/{}/'.format(self.user_02.id))
+        self.assertEqual(len(response.data), 0)
+
     def test_create_past_membership(self):
         ''' Test create past membership '''
         self.client.login(username='user_05', password='12345678')
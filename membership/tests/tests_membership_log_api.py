@@ -9,6 +9,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 
 from community.models import Club
+from core.utils.filters import get_latest_membership_log, get_previous_membership_log
 from membership.models import Membership, MembershipLog
 
 import time
@@ -122,6 +123,26 @@ class MembershipLogAPITest(APITestCase):
         self.assertEqual(logs[len(logs) - 1].status, 'A')
         self.assertEqual(logs[len(logs) - 1].position, 2)
 
+    def test_current_membership_log(self):
+        ''' Test maintaining the current membership log and resolving the previous one '''
+        first_log = get_latest_membership_log(self.m2pub)
+        self.assertEqual(first_log, MembershipLog.objects.get(membership_id=self.m2pub.id))
+        self.assertIsNone(get_previous_membership_log(first_log))
+
+        self.m2pub.status = 'R'
+        self.m2pub.save()
+        self.m2pub.save()
+
+        membership = Membership.objects.get(pk=self.m2pub.id)
+        self.assertEqual(MembershipLog.objects.filter(membership_id=self.m2pub.id).count(), 2)
+        self.assertEqual(membership.current_log.status, 'R')
+        self.assertIsNone(membership.current_log.end_datetime)
+        self.assertEqual(get_latest_membership_log(membership), membership.current_log)
+        self.assertEqual(get_previous_membership_log(membership.current_log), first_log)
+
+        with self.assertNumQueries(0):
+            get_previous_membership_log(membership.current_log)
+
     def test_create_membership_log(self):
         ''' Test create membership log '''
         self.client.login(username='user_01', password='12345678')
@@ -5,6 +5,7 @@
 '''
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from rest_framework import status
 from rest_framework.test import APITestCase
 
@@ -215,6 +216,16 @@ class RequestAPITest(APITestCase):
 
         self.client.logout()
 
+    def test_waiting_request_unique_constraint(self):
+        ''' Test enforcing a single waiting request per user and community in the database '''
+        Request.objects.create(user_id=self.user_05.id, community_id=self.club.id, status='D')
+        Request.objects.create(user_id=self.user_05.id, community_id=self.club.id)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Request.objects.create(user_id=self.user_05.id, community_id=self.club.id)
+
+        self.assertEqual(Request.objects.filter(user_id=self.user_05.id, community_id=self.club.id).count(), 2)
+
     def test_send_request_to_not_accepting_request_community(self):
         ''' Test send request to a community which does not accept requests '''
         self.client.login(username='user_05', password='12345678')
@@ -7,18 +7,23 @@
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q, Min, Max
 from django.utils.translation import gettext as _
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from clubs_and_events.settings import CLUB_VALID_MONTH, CLUB_VALID_DAY, CLUB_ADVANCED_RENEWAL
+from clubs_and_events.settings import PAST_MEMBERSHIPS_CACHE_TIMEOUT
 from community.models import Club, Event, CommunityEvent, Lab, Community
 from community.permissions import IsRenewableClub, IsMemberOfBaseCommunity
 from core.permissions import IsInPubliclyVisibleCommunity, IsInActiveCommunity, IsDeputyLeaderOfCommunity
-from core.utils.filters import filter_queryset, filter_queryset_permission, get_latest_membership_log, limit_queryset
-from core.utils.filters import get_active_community_ids
-from core.utils.general import has_instance, remove_duplicates
+from core.utils.filters import filter_queryset, filter_queryset_permission, get_latest_membership_log
+from core.utils.filters import QueryFilter, filter_queryset_specification, paginate_queryset
+from core.utils.filters import get_active_advisory_query
+from core.utils.general import has_instance
+from core.utils.users import get_past_memberships_cache_key
 from membership.models import Request, Membership, Invitation, CustomMembershipLabel, Advisory, MembershipLog
 from membership.models import ApprovalRequest
 from membership.permissions import IsAbleToRetrieveRequest, IsAbleToUpdateRequest, IsAbleToDeleteRequest
@@ -65,11 +70,11 @@ class RequestViewSet(viewsets.ModelViewSet):
         queryset = filter_queryset(queryset, request, target_param='user', is_foreign_key=True)
         queryset = filter_queryset(queryset, request, target_param='community', is_foreign_key=True)
         queryset = filter_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = limit_queryset(queryset, request)
+        queryset, headers = paginate_queryset(queryset, request)
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def create(self, request, *args, **kwargs):
         ''' Create request '''
@@ -168,11 +173,11 @@ class InvitationViewSet(viewsets.ModelViewSet):
         queryset = filter_queryset(queryset, request, target_param='invitee', is_foreign_key=True)
         queryset = filter_queryset(queryset, request, target_param='community', is_foreign_key=True)
         queryset = filter_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = limit_queryset(queryset, request)
+        queryset, headers = paginate_queryset(queryset, request)
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def create(self, request, *args, **kwargs):
         ''' Create invitation '''
@@ -261,12 +266,12 @@ class MembershipViewSet(viewsets.ModelViewSet):
             queryset = None
 
         # Query Set Limiting
-        queryset = limit_queryset(queryset, request)
+        queryset, headers = paginate_queryset(queryset, request)
 
         # Serialize and return response
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def update(self, request, *args, **kwargs):
         ''' Update membership '''
@@ -348,6 +353,11 @@ class MembershipLogViewSet(viewsets.ModelViewSet):
     queryset = MembershipLog.objects.all()
     serializer_class = MembershipLogSerializer
     http_method_names = ('get', 'head', 'options')
+    query_filters = (
+        QueryFilter('exclude_current_memberships', query=Q(end_datetime=None), exclude=True, is_negatable=False),
+        QueryFilter('position'),
+        QueryFilter('status'),
+    )
 
     def get_permissions(self):
         ''' Get permissions '''
@@ -374,20 +384,15 @@ class MembershipLogViewSet(viewsets.ModelViewSet):
                 membership_ids = [i.id for i in Membership.objects.filter(community_id=query)]
                 queryset = queryset.filter(membership_id__in=membership_ids)
 
-            # Filter out current memberships
-            query = request.query_params.get('exclude_current_memberships')
-            if query is not None and eval(query):
-                queryset = queryset.exclude(end_datetime=None)
         except ValueError:
             queryset = None
 
-        queryset = filter_queryset(queryset, request, target_param='position', is_foreign_key=False)
-        queryset = filter_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = limit_queryset(queryset, request)
+        queryset = filter_queryset_specification(queryset, request, self.query_filters)
+        queryset, headers = paginate_queryset(queryset, request, ordering=('start_datetime', 'id'))
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
 
 class AdvisoryViewSet(viewsets.ModelViewSet):
@@ -395,6 +400,7 @@ class AdvisoryViewSet(viewsets.ModelViewSet):
     queryset = Advisory.objects.all()
     serializer_class = AdvisorySerializer
     http_method_names = ('get', 'post', 'delete', 'head', 'options')
+    query_filters = (QueryFilter('is_active', query=get_active_advisory_query),)
 
     def get_permissions(self):
         ''' Get permissions '''
@@ -412,24 +418,12 @@ class AdvisoryViewSet(viewsets.ModelViewSet):
         queryset = filter_queryset(queryset, request, target_param='advisor', is_foreign_key=True)
         queryset = filter_queryset(queryset, request, target_param='community', is_foreign_key=True)
 
-        try:
-            query = request.query_params.get('is_active')
-            if query is not None:
-                query = eval(query)
-                active_ids = [i.id for i in queryset if i.start_date <= datetime.now().date() <= i.end_date]
-
-                if query:
-                    queryset = queryset.filter(pk__in=active_ids)
-                else:
-                    queryset = queryset.exclude(pk__in=active_ids)
-        except ValueError:
-            queryset = None
-
-        queryset = limit_queryset(queryset, request)
+        queryset = filter_queryset_specification(queryset, request, self.query_filters)
+        queryset, headers = paginate_queryset(queryset, request)
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
 
 class ApprovalRequestViewSet(viewsets.ModelViewSet):
@@ -462,11 +456,11 @@ class ApprovalRequestViewSet(viewsets.ModelViewSet):
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
         queryset = filter_queryset(queryset, request, target_param='community', is_foreign_key=True)
         queryset = filter_queryset(queryset, request, target_param='status', is_foreign_key=False)
-        queryset = limit_queryset(queryset, request)
+        queryset, headers = paginate_queryset(queryset, request)
 
         serializer = self.get_serializer(queryset, many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
     def update(self, request, *args, **kwargs):
         ''' Update approval request '''
@@ -574,59 +568,71 @@ def get_membership_default_labels(request):
 def get_past_memberships(request, user_id):
     ''' Get past memberships of a certain user API '''
     # Validate user
-    try:
-        get_user_model().objects.get(pk=user_id)
-    except get_user_model().DoesNotExist:
+    if not get_user_model().objects.filter(pk=user_id).exists():
         return Response({'message': _('User not found.')}, status=status.HTTP_404_NOT_FOUND)
 
-    # Filter past memberships of the user in active communities
-    memberships = Membership.objects.filter(
-        user_id=user_id, community_id__in=get_active_community_ids()
-    ).exclude(status='A')
-
-    # Exclude non-publicly visible communities if the current user is unauthenticated
-    if not request.user.is_authenticated:
-        memberships = [i for i in memberships if i.community.is_publicly_visible]
+    # Cached until the memberships of the user change
+    cache_key = get_past_memberships_cache_key(user_id, is_publicly_visible_only=not request.user.is_authenticated)
+    past_memberships = cache.get(cache_key)
 
-    # Retrieve all past logs excluding the latest one
-    membership_logs = MembershipLog.objects.filter(
-        membership_id__in=[i.id for i in memberships]
-    ).exclude(end_datetime=None)
-
-    # Retrieve all related community IDs
-    community_ids = remove_duplicates([i.membership.community.id for i in membership_logs])
-    past_memberships = list()
-
-    # Retrieve data according to each community ID
-    for i in community_ids:
-        # Retrieve community type
-        _community = Community.objects.get(pk=i)
-        if has_instance(_community, Club):
-            _community_type = 'club'
-        elif has_instance(_community, Event) and not has_instance(_community, CommunityEvent):
-            _community_type = 'event'
-        elif has_instance(_community, CommunityEvent):
-            _community_type = 'community_event'
-        elif has_instance(_community, Lab):
-            _community_type = 'lab'
-        else:
-            _community_type = 'community'
+    if past_memberships is None:
+        past_memberships = query_past_memberships(user_id, request.user.is_authenticated)
+        cache.set(cache_key, past_memberships, PAST_MEMBERSHIPS_CACHE_TIMEOUT)
 
-        # Filter membership logs of a certain community
-        _membership_logs = [j for j in membership_logs if j.membership.community.id == i]
+    return Response(past_memberships, status=status.HTTP_200_OK)
 
-        # Retrieve position
-        _position = max([j.position for j in _membership_logs])
 
-        # Retrieve other data
-        past_memberships.append({
-            'community_id': i,
-            'community_type': _community_type,
-            'start_datetime': min([j.start_datetime for j in _membership_logs]),
-            'end_datetime': max([j.end_datetime for j in _membership_logs]),
-            'position': _position,
-            'position_start_datetime': min([j.start_datetime for j in _membership_logs if j.position == _position]),
-            'position_end_datetime': max([j.end_datetime for j in _membership_logs if j.position == _position])
-        })
+def query_past_memberships(user_id, is_authenticated):
+    ''' Aggregate past memberships of a user in active communities from their ended logs '''
+    membership_logs = MembershipLog.objects.filter(
+        membership__user_id=user_id, membership__community__is_active=True, end_datetime__isnull=False
+    ).exclude(membership__status='A')
 
-    return Response(past_memberships, status=status.HTTP_200_OK)
+    # Exclude non-publicly visible communities if the current user is unauthenticated
+    if not is_authenticated:
+        membership_logs = membership_logs.filter(membership__community__is_publicly_visible=True)
+
+    # Date ranges per community and position, the highest position of each community first
+    rows = membership_logs.values(
+        'membership__community_id', 'membership__community__community_type', 'position'
+    ).annotate(
+        start_datetime=Min('start_datetime'), end_datetime=Max('end_datetime')
+    ).order_by('membership__community_id', '-position')
+
+    past_memberships = dict()
+    for i in rows:
+        community_id = i['membership__community_id']
+
+        if community_id not in past_memberships:
+            community_type = i['membership__community__community_type']
+            if community_type is None:
+                community_type = get_community_type(Community.objects.get(pk=community_id))
+
+            past_memberships[community_id] = {
+                'community_id': community_id,
+                'community_type': community_type,
+                'start_datetime': i['start_datetime'],
+                'end_datetime': i['end_datetime'],
+                'position': i['position'],
+                'position_start_datetime': i['start_datetime'],
+                'position_end_datetime': i['end_datetime']
+            }
+        else:
+            past_membership = past_memberships[community_id]
+            past_membership['start_datetime'] = min(past_membership['start_datetime'], i['start_datetime'])
+            past_membership['end_datetime'] = max(past_membership['end_datetime'], i['end_datetime'])
+
+    return sorted(past_memberships.values(), key=lambda i: i['start_datetime'])
+
+
+def get_community_type(community):
+    ''' Get the community type of a community whose type field is not yet filled in '''
+    if has_instance(community, Club):
+        return 'club'
+    elif has_instance(community, Event) and not has_instance(community, CommunityEvent):
+        return 'event'
+    elif has_instance(community, CommunityEvent):
+        return 'community_event'
+    elif has_instance(community, Lab):
+        return 'lab'
+    return 'community'
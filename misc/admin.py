@@ -6,7 +6,7 @@
 
 from django.contrib import admin
 
-from core.utils.files import get_image_size
+from core.utils.files import get_stored_image_size
 from core.utils.general import truncate
 from misc.models import FAQ, Vote
 
@@ -24,11 +24,9 @@ class FAQAdmin(admin.ModelAdmin):
     def image_size(self, obj):
         ''' Get announcement image size and dimensions '''
         try:
-            return get_image_size(obj.image)
+            return get_stored_image_size(obj, 'image')
         except ValueError:
             return str()
-        except FileNotFoundError:
-            return 'FileNotFoundError'
 
 
 class VoteAdmin(admin.ModelAdmin):
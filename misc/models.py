@@ -11,6 +11,7 @@ from django.utils.translation import gettext as _
 
 from clubs_and_events.settings import STORAGE_BASE_DIR
 from community.models import Event
+from core.utils.files import get_image_metadata, set_image_metadata
 from core.utils.general import truncate, get_file_extension, has_instance
 from core.utils.objects import save_user_attributes
 from membership.models import Membership
@@ -27,6 +28,11 @@ class FAQ(models.Model):
     answer_en = models.TextField(max_length=2048)
     answer_th = models.TextField(max_length=2048)
     image = models.ImageField(null=True, blank=True, upload_to=get_image_path)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_mime = models.CharField(max_length=32, null=True, blank=True, editable=False)
+    image_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
@@ -42,6 +48,12 @@ class FAQ(models.Model):
         ''' Save instance '''
         save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name='updated_by')
 
+        # Uploaded images are read for their metadata before being sent to the storage
+        if self.image and not self.image._committed:
+            set_image_metadata(self, 'image', get_image_metadata(self.image.file))
+        elif not self.image:
+            set_image_metadata(self, 'image', None)
+
         if self.pk is None:
             saved_image = self.image
             self.image = None
@@ -9,6 +9,7 @@ from django.contrib import admin
 from core.utils.general import has_instance
 from notification.models import Notification, RequestNotification, MembershipLogNotification
 from notification.models import AnnouncementNotification, CommunityEventNotification, EventNotification
+from notification.models import OutboundEmail
 
 
 class NotificationAdmin(admin.ModelAdmin):
@@ -151,9 +152,22 @@ class EventNotificationAdmin(admin.ModelAdmin):
         return False
 
 
+class OutboundEmailAdmin(admin.ModelAdmin):
+    ''' Outbound email admin '''
+    list_display = ('subject', 'recipient', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    readonly_fields = ('attempts', 'claimed_at', 'last_error', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    list_per_page = 20
+
+    def has_add_permission(self, request):
+        ''' Restricts add permission '''
+        return False
+
+
 admin.site.register(Notification, NotificationAdmin)
 admin.site.register(RequestNotification, RequestNotificationAdmin)
 admin.site.register(MembershipLogNotification, MembershipLogNotificationAdmin)
 admin.site.register(AnnouncementNotification, AnnouncementNotificationAdmin)
 admin.site.register(CommunityEventNotification, CommunityEventNotificationAdmin)
 admin.site.register(EventNotification, EventNotificationAdmin)
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
@@ -0,0 +1,75 @@
+'''
+    Notification Application Benchmark Mail Command
+    notification/management/commands/benchmark_mail.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils.crypto import get_random_string
+
+from clubs_and_events.settings import FRONT_END_URL
+from community.models import Club
+from core.utils.benchmarks import rollback_fixture, measure, log_measurement
+from core.utils.logs import log
+from membership.models import Request
+from notification.notifier import get_mail_notifications
+from user.models import EmailPreference
+
+
+def render_legacy(users, title, message, lang='en'):
+    ''' Renders emails as done before mail templates were cached, reading the template for every recipient '''
+    contents = list()
+
+    for i in users:
+        html_content = str().join(list(open('notification/templates/mail-{}.html'.format(lang), encoding='utf-8')))
+        html_content = html_content.replace('{title}', title)
+        html_content = html_content.replace('{message}', message)
+        html_content = html_content.replace(
+            '{unsubscribe_url}',
+            '{}/unsubscribe/?username={}&key={}'.format(
+                FRONT_END_URL[0:len(FRONT_END_URL) - (FRONT_END_URL[-1] == '/')],
+                EmailPreference.objects.get(user_id=i.id).user.username,
+                EmailPreference.objects.get(user_id=i.id).unsubscribe_key
+            )
+        )
+        html_content = html_content.replace('{images}', str())
+        contents.append(html_content)
+
+    return contents
+
+
+class Command(BaseCommand):
+    ''' Measures rendering request email notifications for many recipients '''
+    help = 'Benchmarks email notification rendering on generated users, which are rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--recipients', type=int, default=5000, help='Amount of recipients to measure')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        with rollback_fixture():
+            get_user_model().objects.bulk_create([
+                get_user_model()(username='benchmark_mail_{}'.format(i), name='Benchmark User {}'.format(i))
+                for i in range(options['recipients'])
+            ], batch_size=1000)
+
+            users = list(get_user_model().objects.filter(username__startswith='benchmark_mail_'))
+            EmailPreference.objects.bulk_create([
+                EmailPreference(user_id=i.id, unsubscribe_key=get_random_string(length=64)) for i in users
+            ], batch_size=1000)
+
+            club = Club.objects.create(name_th='ชุมนุมทดสอบอีเมล', name_en='Mail Benchmark Club')
+            request = Request.objects.create(user_id=users[0].id, community_id=club.id)
+
+            log('Recipients: {}'.format(len(users)))
+            emails, elapsed, query_count = measure(
+                lambda: get_mail_notifications(users=users, obj=request, lang='en'), repeat=3
+            )
+            log_measurement('  Cached template', elapsed, query_count)
+
+            _, elapsed, query_count = measure(
+                lambda: render_legacy(users, emails[0].subject, emails[0].body), repeat=1
+            )
+            log_measurement('  Legacy', elapsed, query_count)
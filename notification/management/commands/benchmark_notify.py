@@ -0,0 +1,60 @@
+'''
+    Notification Application Benchmark Notify Command
+    notification/management/commands/benchmark_notify.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from community.models import Event
+from core.utils.benchmarks import rollback_fixture, measure, log_measurement
+from core.utils.logs import log
+from notification.models import EventNotification
+from notification.notifier import create_notifications
+
+import datetime
+
+
+class Command(BaseCommand):
+    ''' Measures event notification fan-out to every user, as done on event approval '''
+    help = 'Benchmarks notification fan-out on generated users, which are rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument(
+            '--recipients', type=int, nargs='+', default=[10000, 100000], help='Amounts of recipients to measure'
+        )
+        parser.add_argument(
+            '--legacy', action='store_true', help='Also measure creating notifications one by one, which is slow'
+        )
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        for amount in options['recipients']:
+            with rollback_fixture():
+                event = Event.objects.create(
+                    name_th='กิจกรรมทดสอบการแจ้งเตือน', name_en='Notification Benchmark Event', is_approved=True,
+                    location='Benchmark', start_date=datetime.date.today(), end_date=datetime.date.today(),
+                    start_time=datetime.time(9, 0, 0), end_time=datetime.time(17, 0, 0)
+                )
+                users = get_user_model().objects.bulk_create([
+                    get_user_model()(username='benchmark_notify_{}'.format(i), name='Benchmark User {}'.format(i))
+                    for i in range(amount)
+                ], batch_size=1000)
+                users = list(get_user_model().objects.filter(username__startswith='benchmark_notify_'))
+
+                log('Recipients: {}'.format(amount))
+                _, elapsed, query_count = measure(
+                    lambda: create_notifications(users, EventNotification, event_id=event.id), repeat=1
+                )
+                log_measurement('  Batched', elapsed, query_count)
+
+                if options['legacy']:
+                    _, elapsed, query_count = measure(lambda: [
+                        EventNotification.objects.create(user_id=i.id, event_id=event.id) for i in users
+                    ], repeat=1)
+                    log_measurement('  One by one', elapsed, query_count)
+
+                if EventNotification.objects.filter(event_id=event.id).count() != amount * (1 + options['legacy']):
+                    self.stderr.write('  Unexpected amount of notifications created')
@@ -0,0 +1,37 @@
+'''
+    Notification Application Run Mail Worker Command
+    notification/management/commands/run_mail_worker.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.core.management.base import BaseCommand
+
+from clubs_and_events.settings import MAIL_WORKER_BATCH_SIZE, MAIL_WORKER_IDLE_INTERVAL
+from core.utils.logs import log
+from notification.notifier import deliver_outbound_emails
+
+import time
+
+
+class Command(BaseCommand):
+    ''' Delivers queued outbound emails, retrying failed deliveries with a backoff '''
+    help = 'Runs the mail worker, which delivers queued outbound emails.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument(
+            '--batch-size', type=int, default=MAIL_WORKER_BATCH_SIZE, help='Amount of emails delivered per batch'
+        )
+        parser.add_argument('--once', action='store_true', help='Deliver every due email once, then exit')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        while True:
+            amount = deliver_outbound_emails(batch_size=options['batch_size'])
+
+            if amount > 0:
+                log('Mail worker processed {} email(s).'.format(amount))
+            elif options['once']:
+                break
+            else:
+                time.sleep(MAIL_WORKER_IDLE_INTERVAL)
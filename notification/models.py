@@ -5,18 +5,37 @@
 '''
 
 from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives
 from django.db import models
+from django.utils import timezone
+from email.mime.image import MIMEImage
 
 from asset.models import Announcement
+from clubs_and_events.settings import SEND_IMAGES_AS_ATTACHMENTS
 from community.models import CommunityEvent, Event
 from core.utils.objects import save_user_attributes
+from core.utils.querysets import SubclassQuerySet
 from membership.models import Request, MembershipLog
 
 
 class Notification(models.Model):
     ''' Base notification '''
+    TYPE_FIELD = 'notification_type'
+    TYPE = 'notification'
+    NOTIFICATION_TYPES = (
+        ('notification', 'Notification'),
+        ('request', 'Request'),
+        ('membership_log', 'Membership Log'),
+        ('announcement', 'Announcement'),
+        ('community_event', 'Community Event'),
+        ('event', 'Event'),
+    )
+
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='notification_user')
     is_read = models.BooleanField(default=False)
+    notification_type = models.CharField(
+        max_length=16, choices=NOTIFICATION_TYPES, null=True, blank=True, default=None, editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
@@ -24,6 +43,12 @@ class Notification(models.Model):
     updated_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
                                    related_name='notification_updated_by')
 
+    objects = SubclassQuerySet.as_manager()
+
+    class Meta:
+        ''' Meta '''
+        indexes = (models.Index(fields=('user', 'created_at', 'id')),)
+
     def __str__(self):
         ''' String representation '''
         return 'Notification Object ({}) [{}]'.format(self.id, self.user.__str__())
@@ -31,11 +56,17 @@ class Notification(models.Model):
     def save(self, *args, **kwargs):
         ''' Save instance '''
         save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name='updated_by')
+
+        if self.pk is None:
+            self.notification_type = self.TYPE
+
         super(Notification, self).save(*args, **kwargs)
 
 
 class RequestNotification(Notification):
     ''' Notification when someone requested to join the community '''
+    TYPE = 'request'
+
     request = models.ForeignKey(Request, on_delete=models.CASCADE)
 
     def __str__(self):
@@ -45,6 +76,8 @@ class RequestNotification(Notification):
 
 class MembershipLogNotification(Notification):
     ''' Notification when someone joined the community or someone removed you from the community '''
+    TYPE = 'membership_log'
+
     membership_log = models.ForeignKey(MembershipLog, on_delete=models.CASCADE)
 
     def __str__(self):
@@ -54,6 +87,8 @@ class MembershipLogNotification(Notification):
 
 class AnnouncementNotification(Notification):
     ''' Notification when an announcement in the community is made '''
+    TYPE = 'announcement'
+
     announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE)
 
     def __str__(self):
@@ -63,6 +98,8 @@ class AnnouncementNotification(Notification):
 
 class CommunityEventNotification(Notification):
     ''' Notification when a community event is created in the community '''
+    TYPE = 'community_event'
+
     community_event = models.ForeignKey(CommunityEvent, on_delete=models.CASCADE)
 
     def __str__(self):
@@ -71,8 +108,56 @@ class CommunityEventNotification(Notification):
 
 class EventNotification(Notification):
     ''' Notification on event promotion '''
+    TYPE = 'event'
+
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
 
     def __str__(self):
         ''' String representation '''
         return '{} [{}]'.format(self.event.__str__(), self.user.__str__())
+
+
+class OutboundEmail(models.Model):
+    ''' Email waiting to be delivered by the mail worker '''
+    STATUS = (
+        ('W', 'Waiting'),
+        ('P', 'Sending'),
+        ('S', 'Sent'),
+        ('F', 'Failed')
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(null=True, blank=True)
+    from_email = models.CharField(max_length=255)
+    recipient = models.CharField(max_length=255)
+    attachments = models.TextField(null=True, blank=True)
+    status = models.CharField(max_length=1, choices=STATUS, default='W')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ''' Meta '''
+        indexes = (models.Index(fields=('status', 'next_attempt_at')),)
+
+    def __str__(self):
+        ''' String representation '''
+        return '{} [{}]'.format(self.subject, self.recipient)
+
+    def get_message(self):
+        ''' Build the email message, attaching images if images are sent as attachments '''
+        message = EmailMultiAlternatives(self.subject, self.body, self.from_email, [self.recipient])
+
+        if self.html_body is not None:
+            message.attach_alternative(self.html_body, 'text/html')
+
+        if SEND_IMAGES_AS_ATTACHMENTS and self.attachments:
+            for i in self.attachments.split('\n'):
+                with open(i, mode='rb') as f:
+                    message.attach(MIMEImage(f.read()))
+
+        return message
@@ -5,22 +5,27 @@
 '''
 
 from crum import get_current_user
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import get_connection
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import gettext as _
-from email.mime.image import MIMEImage
 
 from asset.models import Announcement
 from clubs_and_events.settings import EMAIL_HOST_USER, EMAIL_NOTIFICATIONS, SEND_IMAGES_AS_ATTACHMENTS, FRONT_END_URL
+from clubs_and_events.settings import NOTIFICATION_BATCH_SIZE, MAIL_WORKER_BATCH_SIZE, MAIL_MAX_ATTEMPTS
+from clubs_and_events.settings import MAIL_RETRY_DELAY, MAIL_WORKER_LEASE
 from community.models import CommunityEvent, Event
+from core.utils.general import get_instance, get_subclass_lookup
 from core.utils.users import get_email
 from core.utils.filters import get_previous_membership_log, get_latest_membership_log
 from membership.models import Request, MembershipLog, Membership, Invitation
-from notification.models import RequestNotification, MembershipLogNotification
+from notification.models import Notification, RequestNotification, MembershipLogNotification
 from notification.models import AnnouncementNotification, CommunityEventNotification, EventNotification
+from notification.models import OutboundEmail
+from notification.renderer import get_mail_template
 from user.models import EmailPreference
 
-import threading
-
 
 class InvalidNotificationType(Exception):
     ''' Invalid notification type exception '''
@@ -29,22 +34,24 @@ class InvalidNotificationType(Exception):
 
 def notify(users=tuple(), obj=None):
     ''' Send notification to manually designated users based on the object  '''
+    # Resolve events into community events by the community type
+    obj = get_instance(obj, CommunityEvent) or obj
+
+    users = list(users)
+
     # Valid notification type verification and notification creation
-    for i in users:
-        if isinstance(obj, Request):
-            RequestNotification.objects.create(user_id=i.id, request_id=obj.id)
-        elif isinstance(obj, MembershipLog):
-            MembershipLogNotification.objects.create(user_id=i.id, membership_log_id=obj.id)
-        elif isinstance(obj, Announcement):
-            AnnouncementNotification.objects.create(user_id=i.id, announcement_id=obj.id)
-        elif isinstance(obj, CommunityEvent):
-            CommunityEventNotification.objects.create(user_id=i.id, community_event_id=obj.id)
-        elif isinstance(obj, Event):
-            EventNotification.objects.create(user_id=i.id, event_id=obj.id)
-        elif isinstance(obj, Invitation):
-            pass
-        else:
-            raise InvalidNotificationType
+    if isinstance(obj, Request):
+        create_notifications(users, RequestNotification, request_id=obj.id)
+    elif isinstance(obj, MembershipLog):
+        create_notifications(users, MembershipLogNotification, membership_log_id=obj.id)
+    elif isinstance(obj, Announcement):
+        create_notifications(users, AnnouncementNotification, announcement_id=obj.id)
+    elif isinstance(obj, CommunityEvent):
+        create_notifications(users, CommunityEventNotification, community_event_id=obj.id)
+    elif isinstance(obj, Event):
+        create_notifications(users, EventNotification, event_id=obj.id)
+    elif not isinstance(obj, Invitation) and len(users) > 0:
+        raise InvalidNotificationType
 
     # Verify sending email notifications allowance
     if isinstance(obj, (Request, Announcement, CommunityEvent, Event, Invitation)):
@@ -54,16 +61,52 @@ def notify(users=tuple(), obj=None):
 
     # Send email notifications
     if mail and len(users) > 0:
+        email_preferences = EmailPreference.objects.in_bulk([i.id for i in users], field_name='user_id')
         send_mail_notification(
-            users=[i for i in users if EmailPreference.objects.get(user_id=i.id).email_language == 'en'],
-            obj=obj, lang='en', fail_silently=False
+            users=[i for i in users if i.id in email_preferences and email_preferences[i.id].email_language == 'en'],
+            obj=obj, lang='en', email_preferences=email_preferences
         )
         send_mail_notification(
-            users=[i for i in users if EmailPreference.objects.get(user_id=i.id).email_language == 'th'],
-            obj=obj, lang='th', fail_silently=False
+            users=[i for i in users if i.id in email_preferences and email_preferences[i.id].email_language == 'th'],
+            obj=obj, lang='th', email_preferences=email_preferences
         )
 
 
+def create_notifications(users, model, batch_size=NOTIFICATION_BATCH_SIZE, **kwargs):
+    ''' Create notifications of a notification model for each user, inserted in batches '''
+    user = get_current_user()
+    if user is not None and user.pk is None:
+        user = None
+
+    # Subclass rows are inserted directly, as bulk_create does not support multi-table inheritance
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = [model._meta.pk.column] + [model._meta.get_field(i).column for i in kwargs.keys()]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        table, ', '.join(connection.ops.quote_name(i) for i in columns), ', '.join(('%s',) * len(columns))
+    )
+
+    user_ids = [i.id for i in users]
+    for i in range(0, len(user_ids), batch_size):
+        batch = user_ids[i:i + batch_size]
+
+        with transaction.atomic():
+            notifications = Notification.objects.bulk_create([
+                Notification(user_id=j, notification_type=model.TYPE, created_by=user, updated_by=user) for j in batch
+            ])
+            notification_ids = [j.pk for j in notifications]
+
+            # Backends unable to return inserted primary keys, such as MySQL, retrieve the parent rows without subclass
+            # rows instead, which are only those just inserted within this transaction
+            if None in notification_ids:
+                notification_ids = Notification.objects.filter(
+                    user_id__in=batch, notification_type=model.TYPE,
+                    **{'{}__isnull'.format(get_subclass_lookup(Notification, model)): True}
+                ).values_list('pk', flat=True)
+
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, [(j,) + tuple(kwargs.values()) for j in notification_ids])
+
+
 def notify_membership_log(obj):
     ''' Send notification to automatically designated users based on the membership log object '''
     if isinstance(obj, Membership):
@@ -89,16 +132,25 @@ def notify_membership_log(obj):
             notify(users=tuple([i.user for i in memberships]), obj=obj)
 
 
-def send_mail_notification(users=tuple(), obj=None, lang='en', fail_silently=False):
-    ''' Send email notifications script (function) '''
-    thread = threading.Thread(target=send_mail_notification_process, args=[users, obj, lang, fail_silently])
-    thread.start()
+def send_mail_notification(users=tuple(), obj=None, lang='en', email_preferences=None):
+    ''' Send email notifications script (enqueue for the mail worker) '''
+    OutboundEmail.objects.bulk_create(get_mail_notifications(
+        users=users, obj=obj, lang=lang, email_preferences=email_preferences
+    ))
 
 
-def send_mail_notification_process(users=tuple(), obj=None, lang='en', fail_silently=False):
-    ''' Send email notifications script (process) '''
+def send_mail_notification_process(users=tuple(), obj=None, lang='en', fail_silently=False, email_preferences=None):
+    ''' Send email notifications script (process, sends immediately) '''
+    emails = get_mail_notifications(users=users, obj=obj, lang=lang, email_preferences=email_preferences)
+    get_connection(fail_silently=fail_silently).send_messages([i.get_message() for i in emails])
+
+
+def get_mail_notifications(users=tuple(), obj=None, lang='en', email_preferences=None):
+    ''' Build the unsaved outbound emails of the notification, with email preferences by user ID if already loaded '''
     # Initialization
-    email_preferences = EmailPreference.objects.all()
+    obj = get_instance(obj, CommunityEvent) or obj
+    if email_preferences is None:
+        email_preferences = EmailPreference.objects.in_bulk([i.id for i in users], field_name='user_id')
     subject, title, message = str(), str(), str()
     recipients, attachments = list(), list()
 
@@ -152,7 +204,7 @@ def send_mail_notification_process(users=tuple(), obj=None, lang='en', fail_sile
         else:
             raise InvalidNotificationType
 
-        recipients = [i for i in users if email_preferences.get(user_id=i.id).receive_request]
+        recipients = [i for i in users if i.id in email_preferences and email_preferences[i.id].receive_request]
 
     # Announcement Notification
     elif isinstance(obj, Announcement):
@@ -173,7 +225,7 @@ def send_mail_notification_process(users=tuple(), obj=None, lang='en', fail_sile
                 obj.text
             )
 
-        recipients = [i for i in users if email_preferences.get(user_id=i.id).receive_announcement]
+        recipients = [i for i in users if i.id in email_preferences and email_preferences[i.id].receive_announcement]
 
         try:
             attachments.append(obj.image.url)
@@ -209,7 +261,7 @@ def send_mail_notification_process(users=tuple(), obj=None, lang='en', fail_sile
                 obj.end_date
             )
 
-        recipients = [i for i in users if email_preferences.get(user_id=i.id).receive_community_event]
+        recipients = [i for i in users if i.id in email_preferences and email_preferences[i.id].receive_community_event]
 
     # Event Notification
     elif isinstance(obj, Event) and not isinstance(obj, CommunityEvent):
@@ -238,7 +290,7 @@ def send_mail_notification_process(users=tuple(), obj=None, lang='en', fail_sile
                 obj.end_date
             )
 
-        recipients = [i for i in users if email_preferences.get(user_id=i.id).receive_event]
+        recipients = [i for i in users if i.id in email_preferences and email_preferences[i.id].receive_event]
 
     # Invitation Notification
     elif isinstance(obj, Invitation):
@@ -259,46 +311,96 @@ def send_mail_notification_process(users=tuple(), obj=None, lang='en', fail_sile
                 obj.community.name_th
             )
 
-        recipients = [i for i in users if email_preferences.get(user_id=i.id).receive_invitation]
+        recipients = [i for i in users if i.id in email_preferences and email_preferences[i.id].receive_invitation]
 
     # Invalid Notification Type
     else:
         raise InvalidNotificationType
 
-    # Email Delivery
-    for i in recipients:
-        # Email object
-        email = EmailMultiAlternatives(_(subject), _(message), EMAIL_HOST_USER, [get_email(i)])
-
-        # Replacing email template with contents
-        html_content = str().join(list(open('notification/templates/mail-{}.html'.format(lang), encoding='utf-8')))
-        html_content = html_content.replace('{title}', title)
-        html_content = html_content.replace('{message}', message)
-        html_content = html_content.replace(
-            '{unsubscribe_url}',
-            '{}/unsubscribe/?username={}&key={}'.format(
-                FRONT_END_URL[0:len(FRONT_END_URL) - (FRONT_END_URL[-1] == '/')],
-                EmailPreference.objects.get(user_id=i.id).user.username,
-                EmailPreference.objects.get(user_id=i.id).unsubscribe_key
-            )
-        )
+    # Email Building, the template is rendered once and only the unsubscribe URL differs between recipients
+    if SEND_IMAGES_AS_ATTACHMENTS:
+        images = str()
+    else:
+        images = '\n'.join([get_mail_template('image.html').render(path='{}'.format(i)) for i in attachments])
 
-        # Images
-        if SEND_IMAGES_AS_ATTACHMENTS:
-            for j in attachments:
-                with open(j, mode='rb') as f:
-                    image = MIMEImage(f.read())
-                    email.attach(image)
-            html_content = html_content.replace('{images}', str())
-        else:
-            html_image_component = str().join(list(open('notification/templates/image.html')))
-            html_image_content = '\n'.join([
-                html_image_component.replace(
-                    '{path}', '{}'.format(j)
-                ) for j in attachments
-            ])
-            html_content = html_content.replace('{images}', html_image_content)
+    html_parts = get_mail_template('mail-{}.html'.format(lang)).render_parts(
+        'unsubscribe_url', title=title, message=message, images=images
+    )
+    subject, message = _(subject), _(message)
+    front_end_url = FRONT_END_URL[0:len(FRONT_END_URL) - (FRONT_END_URL[-1] == '/')]
+    emails = list()
 
-        # Send
-        email.attach_alternative(html_content, 'text/html')
-        email.send(fail_silently=fail_silently)
+    for i in recipients:
+        html_content = '{}/unsubscribe/?username={}&key={}'.format(
+            front_end_url, i.username, email_preferences[i.id].unsubscribe_key
+        ).join(html_parts)
+
+        emails.append(OutboundEmail(
+            subject=subject,
+            body=message,
+            html_body=html_content,
+            from_email=EMAIL_HOST_USER,
+            recipient=get_email(i),
+            attachments='\n'.join(attachments) if SEND_IMAGES_AS_ATTACHMENTS else None
+        ))
+
+    return emails
+
+
+def claim_outbound_emails(batch_size=MAIL_WORKER_BATCH_SIZE):
+    ''' Claim a batch of due outbound emails, along with emails whose worker let the lease expire '''
+    now = timezone.now()
+
+    # Rows are only locked while claiming, never while talking to the SMTP server
+    with transaction.atomic():
+        emails = list(OutboundEmail.objects.select_for_update(
+            skip_locked=connection.features.has_select_for_update_skip_locked
+        ).filter(
+            Q(status='W', next_attempt_at__lte=now) | Q(status='P', claimed_at__lt=now - MAIL_WORKER_LEASE)
+        ).order_by('next_attempt_at', 'id')[:batch_size])
+
+        # An expired lease counts as an attempt, its email may or may not have been sent
+        for i in emails:
+            if i.status == 'P':
+                i.attempts += 1
+                i.last_error = 'Lease expired'
+            i.status, i.claimed_at = 'P', now
+
+        OutboundEmail.objects.bulk_update(emails, ('status', 'attempts', 'claimed_at', 'last_error'))
+
+    return emails
+
+
+def deliver_outbound_emails(batch_size=MAIL_WORKER_BATCH_SIZE):
+    ''' Deliver a batch of due outbound emails, returns the number of emails processed '''
+    emails = claim_outbound_emails(batch_size=batch_size)
+
+    if len(emails) == 0:
+        return 0
+
+    email_connection = get_connection()
+
+    try:
+        for i in emails:
+            if i.attempts >= MAIL_MAX_ATTEMPTS:
+                i.status = 'F'
+            else:
+                try:
+                    email_connection.send_messages([i.get_message()])
+                    i.status, i.sent_at, i.last_error = 'S', timezone.now(), None
+                except Exception as exception:
+                    i.attempts += 1
+                    i.last_error = repr(exception)
+
+                    if i.attempts >= MAIL_MAX_ATTEMPTS:
+                        i.status = 'F'
+                    else:
+                        i.status = 'W'
+                        i.next_attempt_at = timezone.now() + MAIL_RETRY_DELAY * 2 ** (i.attempts - 1)
+
+            # Each result is saved right away, so sent emails stay sent if the worker stops halfway
+            i.save(update_fields=('status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'))
+    finally:
+        email_connection.close()
+
+    return len(emails)
@@ -16,3 +16,9 @@ class IsNotificationOwner(permissions.BasePermission):
         if isinstance(obj, Notification):
             return request.user.id == obj.user.id
         return False
+
+    def filter_queryset(self, request, queryset):
+        ''' Filter queryset by permission '''
+        if issubclass(queryset.model, Notification) and request.user.is_authenticated:
+            return queryset.filter(user_id=request.user.id)
+        return queryset.none()
@@ -0,0 +1,81 @@
+'''
+    Notification Application Mail Template Renderer
+    notification/renderer.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from clubs_and_events.settings import DEBUG
+
+import os
+import re
+import threading
+
+
+TEMPLATE_DIRECTORY = 'notification/templates'
+PLACEHOLDER_PATTERN = re.compile(r'\{(title|message|images|unsubscribe_url|path)\}')
+
+_templates = dict()
+_templates_lock = threading.Lock()
+
+
+class MailTemplate:
+    ''' Mail template, parsed once into literal segments and placeholders '''
+    def __init__(self, path):
+        ''' Constructor '''
+        self.path = path
+        self.modified_time = None
+        self.segments = tuple()
+        self.load()
+
+    def load(self):
+        ''' Load and parse the template file '''
+        modified_time = os.path.getmtime(self.path)
+
+        with open(self.path, encoding='utf-8') as f:
+            # Splitting by a capturing group alternates literals (even indices) and placeholder names (odd indices)
+            self.segments = tuple(PLACEHOLDER_PATTERN.split(f.read()))
+
+        self.modified_time = modified_time
+
+    def is_modified(self):
+        ''' Verify if the template file is modified since it was loaded '''
+        return os.path.getmtime(self.path) != self.modified_time
+
+    def render(self, **context):
+        ''' Render the template, placeholders missing from the context are left as is '''
+        return str().join(self.render_parts(None, **context))
+
+    def render_parts(self, variable, **context):
+        ''' Render the template into parts split at the variable, to be joined with its value later on '''
+        parts, current = list(), list()
+
+        for i in range(len(self.segments)):
+            if i % 2 == 0:
+                current.append(self.segments[i])
+            elif self.segments[i] == variable:
+                parts.append(str().join(current))
+                current = list()
+            elif self.segments[i] in context:
+                current.append(context[self.segments[i]])
+            else:
+                current.append('{' + self.segments[i] + '}')
+
+        parts.append(str().join(current))
+
+        return parts
+
+
+def get_mail_template(name):
+    ''' Get a mail template, loaded once per process and reloaded on modification in debug mode '''
+    template = _templates.get(name)
+
+    if template is None or (DEBUG and template.is_modified()):
+        with _templates_lock:
+            template = _templates.get(name)
+            if template is None:
+                template = MailTemplate(os.path.join(TEMPLATE_DIRECTORY, name))
+            elif DEBUG and template.is_modified():
+                template.load()
+            _templates[name] = template
+
+    return template
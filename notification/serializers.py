@@ -7,7 +7,7 @@
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
-from core.utils.general import has_instance
+from core.utils.general import has_instance, get_instance
 from membership.serializers import MembershipLogSerializer
 from notification.models import Notification, RequestNotification, MembershipLogNotification
 from notification.models import AnnouncementNotification, CommunityEventNotification, EventNotification
@@ -20,7 +20,7 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         ''' Meta '''
         model = Notification
-        exclude = ('updated_at', 'created_by', 'updated_by')
+        exclude = ('notification_type', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('user',)
 
     def get_meta(self, obj):
@@ -29,7 +29,7 @@ class NotificationSerializer(serializers.ModelSerializer):
         text, text_th = str(), str()
 
         if has_instance(obj, RequestNotification):
-            notification = RequestNotification.objects.get(pk=obj.id)
+            notification = get_instance(obj, RequestNotification)
             notification_type = 'request'
             object_id = notification.request.id
             community_id = notification.request.community.id
@@ -49,21 +49,21 @@ class NotificationSerializer(serializers.ModelSerializer):
                     notification.request.user.name, notification.request.community.name_th
                 )
         elif has_instance(obj, MembershipLogNotification):
-            notification = MembershipLogNotification.objects.get(pk=obj.id)
+            notification = get_instance(obj, MembershipLogNotification)
             notification_type = 'membership_log'
             object_id = notification.membership_log.id
             community_id = notification.membership_log.membership.community.id
             text = MembershipLogSerializer().get_log_text(notification.membership_log, use_community_name=True)
             text_th = MembershipLogSerializer().get_log_text_th(notification.membership_log, use_community_name=True)
         elif has_instance(obj, AnnouncementNotification):
-            notification = AnnouncementNotification.objects.get(pk=obj.id)
+            notification = get_instance(obj, AnnouncementNotification)
             notification_type = 'announcement'
             object_id = notification.announcement.id
             community_id = notification.announcement.community.id
             text = 'A new announcement is created in {}.'.format(notification.announcement.community.name_en)
             text_th = 'ประกาศใหม่ได้ถูกสร้างใน {}'.format(notification.announcement.community.name_th)
         elif has_instance(obj, CommunityEventNotification):
-            notification = CommunityEventNotification.objects.get(pk=obj.id)
+            notification = get_instance(obj, CommunityEventNotification)
             notification_type = 'community_event'
             object_id = notification.community_event.id
             community_id = notification.community_event.id
@@ -74,7 +74,7 @@ class NotificationSerializer(serializers.ModelSerializer):
                 notification.community_event.name_th, notification.community_event.created_under.name_th
             )
         elif has_instance(obj, EventNotification):
-            notification = EventNotification.objects.get(pk=obj.id)
+            notification = get_instance(obj, EventNotification)
             notification_type = 'event'
             object_id = notification.event.id
             community_id = notification.event.id
@@ -95,7 +95,7 @@ class RequestNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         ''' Meta '''
         model = RequestNotification
-        exclude = ('updated_at', 'created_by', 'updated_by')
+        exclude = ('notification_type', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('user', 'request')
 
 
@@ -104,7 +104,7 @@ class MembershipLogNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         ''' Meta '''
         model = MembershipLogNotification
-        exclude = ('updated_at', 'created_by', 'updated_by')
+        exclude = ('notification_type', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('user', 'membership_log')
 
 
@@ -113,7 +113,7 @@ class AnnouncementNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         ''' Meta '''
         model = AnnouncementNotification
-        exclude = ('updated_at', 'created_by', 'updated_by')
+        exclude = ('notification_type', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('user', 'announcement')
 
 
@@ -122,7 +122,7 @@ class CommunityEventNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         ''' Meta '''
         model = CommunityEventNotification
-        exclude = ('updated_at', 'created_by', 'updated_by')
+        exclude = ('notification_type', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('user', 'community_event')
 
 
@@ -131,5 +131,5 @@ class EventNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         ''' Meta '''
         model = EventNotification
-        exclude = ('updated_at', 'created_by', 'updated_by')
+        exclude = ('notification_type', 'updated_at', 'created_by', 'updated_by')
         read_only_fields = ('user', 'event')
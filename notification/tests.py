@@ -5,18 +5,36 @@
 '''
 
 from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from asset.models import Announcement
+from clubs_and_events.settings import MAIL_WORKER_LEASE
 from community.models import Club
+from core.utils.general import has_instance
 from membership.models import Membership, Request
 from notification.models import Notification, RequestNotification, AnnouncementNotification
-from notification.models import CommunityEventNotification, EventNotification
-from user.models import StudentCommitteeAuthority
+from notification.models import CommunityEventNotification, EventNotification, OutboundEmail
+from notification.notifier import create_notifications, send_mail_notification, deliver_outbound_emails
+from notification.notifier import get_mail_notifications
+from notification.renderer import get_mail_template
+from user.models import EmailPreference, StudentCommitteeAuthority
 
 import datetime
 
 
+class FailingEmailBackend(BaseEmailBackend):
+    ''' Email backend which always fails to deliver '''
+    def send_messages(self, email_messages):
+        ''' Send messages '''
+        raise ConnectionError('SMTP server unavailable.')
+
+
 class NotificationAPITest(APITestCase):
     ''' Notification API test '''
     def setUp(self):
@@ -214,6 +232,136 @@ class NotificationAPITest(APITestCase):
 
         self.client.logout()
 
+    def test_notification_type(self):
+        ''' Test notification type and subclass selection '''
+        request = Request.objects.create(user_id=self.user_05.id, community_id=self.club.id)
+        announcement = Announcement.objects.create(community_id=self.club.id, text='Announcement')
+        RequestNotification.objects.create(request_id=request.id, user_id=self.user_01.id)
+        AnnouncementNotification.objects.create(announcement_id=announcement.id, user_id=self.user_01.id)
+
+        queryset = Notification.objects.filter(user_id=self.user_01.id).order_by('id')
+        self.assertEqual([i.notification_type for i in queryset], ['request', 'announcement'])
+
+        # Parent rows and one query per subclass, on a queryset not yet evaluated
+        with self.assertNumQueries(3):
+            notifications = Notification.objects.filter(user_id=self.user_01.id).order_by('id').select_subclasses()
+        self.assertEqual([type(i) for i in notifications], [RequestNotification, AnnouncementNotification])
+
+        notification = queryset.first()
+        with self.assertNumQueries(0):
+            self.assertTrue(has_instance(notification, RequestNotification))
+            self.assertFalse(has_instance(notification, AnnouncementNotification))
+
+        self.client.login(username='user_01', password='12345678')
+        response = self.client.get('/api/notification/notification/')
+        self.assertEqual(
+            sorted(i['meta']['notification_type'] for i in response.data), ['announcement', 'request']
+        )
+        self.assertNotIn('notification_type', response.data[0])
+        self.client.logout()
+
+    def test_create_notifications(self):
+        ''' Test creating notifications in batches '''
+        request = Request.objects.create(user_id=self.user_05.id, community_id=self.club.id)
+        users = (self.user_01, self.user_02, self.user_03, self.user_04)
+
+        with CaptureQueriesContext(connection) as context:
+            create_notifications(users[:2], RequestNotification, batch_size=4, request_id=request.id)
+        query_count = len(context.captured_queries)
+
+        with self.assertNumQueries(query_count):
+            create_notifications(users, RequestNotification, batch_size=4, request_id=request.id)
+
+        notifications = RequestNotification.objects.filter(request_id=request.id)
+        self.assertEqual(
+            sorted(i.user.id for i in notifications), sorted([i.id for i in users[:2]] + [i.id for i in users])
+        )
+        self.assertEqual(set(i.notification_type for i in notifications), {'request'})
+        self.assertEqual(Notification.objects.filter(requestnotification__isnull=True).count(), 0)
+
+    def test_send_mail_notification(self):
+        ''' Test queueing email notifications and delivering them with the mail worker '''
+        EmailPreference.objects.create(user_id=self.user_01.id)
+        EmailPreference.objects.create(user_id=self.user_02.id, receive_request=False)
+        request = Request.objects.create(user_id=self.user_05.id, community_id=self.club.id)
+
+        send_mail_notification(users=(self.user_01, self.user_02, self.user_03), obj=request, lang='en')
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.filter(status='W').count(), 1)
+
+        self.assertEqual(deliver_outbound_emails(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'New join request: Sleeping Club')
+        self.assertEqual(OutboundEmail.objects.get().status, 'S')
+        self.assertEqual(deliver_outbound_emails(), 0)
+
+    def test_mail_notifications_loaded_preferences(self):
+        ''' Test building email notifications with email preferences already loaded by the caller '''
+        EmailPreference.objects.create(user_id=self.user_01.id)
+        request = Request.objects.create(user_id=self.user_05.id, community_id=self.club.id)
+        email_preferences = EmailPreference.objects.in_bulk([self.user_01.id], field_name='user_id')
+
+        with CaptureQueriesContext(connection) as context:
+            emails = get_mail_notifications(
+                users=(self.user_01,), obj=request, lang='en', email_preferences=email_preferences
+            )
+        self.assertEqual(len(emails), 1)
+        self.assertFalse(any(
+            EmailPreference._meta.db_table in i['sql'] for i in context.captured_queries
+        ))
+
+    def test_mail_template(self):
+        ''' Test rendering mail templates once, then substituting the unsubscribe URL per recipient '''
+        template = get_mail_template('mail-en.html')
+        self.assertIs(get_mail_template('mail-en.html'), template)
+
+        parts = template.render_parts('unsubscribe_url', title='Title', message='Message', images=str())
+        html_content = 'https://localhost/unsubscribe/'.join(parts)
+        self.assertIn('Title', html_content)
+        self.assertIn('href="https://localhost/unsubscribe/"', html_content)
+        self.assertNotIn('{title}', html_content)
+        self.assertNotIn('{message}', html_content)
+        self.assertNotIn('{images}', html_content)
+
+        with open('notification/templates/mail-en.html', encoding='utf-8') as f:
+            self.assertEqual(template.render(), f.read())
+
+    @override_settings(EMAIL_BACKEND='notification.tests.FailingEmailBackend')
+    def test_deliver_outbound_emails_retry(self):
+        ''' Test retrying failed email deliveries with a backoff '''
+        email = OutboundEmail.objects.create(
+            subject='Subject', body='Body', from_email='sender@localhost', recipient='user_01@localhost'
+        )
+
+        self.assertEqual(deliver_outbound_emails(), 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'W')
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTP server unavailable.', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(deliver_outbound_emails(), 0)
+
+        OutboundEmail.objects.filter(id=email.id).update(attempts=4, next_attempt_at=timezone.now())
+        self.assertEqual(deliver_outbound_emails(), 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'F')
+        self.assertEqual(email.attempts, 5)
+
+    def test_deliver_outbound_emails_expired_lease(self):
+        ''' Test delivering emails claimed by a mail worker which stopped while sending them '''
+        email = OutboundEmail.objects.create(
+            subject='Subject', body='Body', from_email='sender@localhost', recipient='user_01@localhost',
+            status='P', claimed_at=timezone.now()
+        )
+        self.assertEqual(deliver_outbound_emails(), 0)
+
+        OutboundEmail.objects.filter(id=email.id).update(claimed_at=timezone.now() - MAIL_WORKER_LEASE * 2)
+        self.assertEqual(deliver_outbound_emails(), 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'S')
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
     def test_create_notification(self):
         ''' Test create notification '''
         self.client.login(username='user_01', password='12345678')
@@ -13,7 +13,8 @@ from asset.models import Announcement
 from clubs_and_events.settings import EMAIL_NOTIFICATIONS
 from community.models import Event, CommunityEvent
 from core.permissions import IsInActiveCommunity
-from core.utils.filters import filter_queryset_permission, limit_queryset
+from core.utils.filters import filter_queryset_permission, paginate_queryset
+from core.utils.querysets import select_subclasses
 from core.utils.users import get_email
 from membership.models import Request, Invitation
 from notification.models import Notification, RequestNotification, MembershipLogNotification
@@ -38,11 +39,11 @@ class NotificationViewSet(viewsets.ModelViewSet):
         queryset = self.get_queryset()
 
         queryset = filter_queryset_permission(queryset, request, self.get_permissions())
-        queryset = limit_queryset(queryset, request)
+        queryset, headers = paginate_queryset(queryset, request)
 
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(select_subclasses(queryset), many=True)
 
-        return Response(serializer.data)
+        return Response(serializer.data, headers=headers)
 
 
 class RequestNotificationViewSet(NotificationViewSet):
@@ -120,7 +121,7 @@ def test_send_mail(request):
             {'detail': 'Email notification setting is turned off in \'settings.py\'.'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    elif not eval('_.receive_{}'.format(obj_type.lower())):
+    elif not getattr(_, 'receive_{}'.format(obj_type.lower())):
         return Response(
             {'detail': 'User\'s email preference for \'{}\' is turned off.'.format(obj_type.lower())},
             status=status.HTTP_400_BAD_REQUEST
@@ -11,7 +11,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext as _
 
-from core.utils.files import get_image_size
+from core.utils.files import get_stored_image_size
 from core.utils.general import truncate
 from user.models import EmailPreference, StudentCommitteeAuthority
 
@@ -62,11 +62,9 @@ class UserAdmin(BaseUserAdmin):
     def profile_picture_size(self, obj):
         ''' Get profile picture size and dimensions '''
         try:
-            return get_image_size(obj.profile_picture)
+            return get_stored_image_size(obj, 'profile_picture')
         except ValueError:
             return str()
-        except FileNotFoundError:
-            return 'FileNotFoundError'
 
 
 class EmailPreferenceAdmin(admin.ModelAdmin):
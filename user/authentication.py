@@ -7,33 +7,49 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
 
-from clubs_and_events.settings import ENABLE_LDAP
+from clubs_and_events.settings import ENABLE_LDAP, LDAP_VERIFIED_CACHE_TIMEOUT
 from user.ldap import get_LDAP_user
 from user.models import EmailPreference
 
 
+def get_verified_cache_key(user_id):
+    ''' Get the cache key marking a user's stored password as recently verified against the LDAP server '''
+    return 'ldap_verified:{}'.format(user_id)
+
+
 class AuthenticationBackend(ModelBackend):
     ''' Authentication back-end '''
     def authenticate(self, request, username=None, password=None, **kwargs):
         ''' Authenticate user '''
+        if username is None or password is None:
+            return None
+
         # Django authentication
         try:
             user = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            user = None
+
+        if user is not None:
             if check_password(password, user.password):
                 return user
-        except get_user_model().DoesNotExist:
-            pass
+
+            # Stored password was recently verified, so a mismatch is a wrong password rather than a changed one
+            if cache.get(get_verified_cache_key(user.id)) is not None:
+                return None
 
         # LDAP Authentication
+        if not ENABLE_LDAP:
+            return None
+
         ldap_user = get_LDAP_user(username, password)
 
-        if not ENABLE_LDAP or ldap_user is None:
+        if ldap_user is None:
             return None
 
-        try:
-            user = get_user_model().objects.get(username=username)
-        except get_user_model().DoesNotExist:
+        if user is None:
             user = get_user_model().objects.create(
                 username=username,
                 name=ldap_user['name'],
@@ -42,9 +58,10 @@ class AuthenticationBackend(ModelBackend):
             )
             EmailPreference.objects.create(user_id=user.id)
 
-        if not check_password(password, user.password):
-            user.set_password(password)
-            user.save()
+        # Stored password never matches here, as it would have been accepted above
+        user.set_password(password)
+        user.save()
+        cache.set(get_verified_cache_key(user.id), True, LDAP_VERIFIED_CACHE_TIMEOUT)
 
         return user
 
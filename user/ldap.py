@@ -4,55 +4,204 @@
     @author Teerapat Kraisrisirikul (810Teams)
 '''
 
-from ldap3 import Server, Connection, ALL
-from ldap3.core.exceptions import LDAPBindError, LDAPSocketOpenError
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from ldap3 import Server, Connection, NONE, SYNC
+from ldap3.core.exceptions import LDAPException, LDAPBindError, LDAPCommunicationError
+from ldap3.utils.conv import escape_filter_chars
 
 from clubs_and_events.settings import LDAP_URL, LDAP_BIND_USERNAME, LDAP_BIND_PASSWORD, LDAP_BASE
-from clubs_and_events.settings import SHOW_LDAP_ERROR_MESSAGE
+from clubs_and_events.settings import SHOW_LDAP_ERROR_MESSAGE, LDAP_POOL_SIZE
+from clubs_and_events.settings import LDAP_CONNECT_TIMEOUT, LDAP_RECEIVE_TIMEOUT, LDAP_UNKNOWN_USER_CACHE_TIMEOUT
 from clubs_and_events.settings import LDAP_USER_GROUPS, LDAP_USERNAME_FIELD, LDAP_DISPLAY_NAME_FIELD
 from core.utils.logs import error
 
+import hashlib
+import queue
+import threading
+
+
+class LDAPConnectionPool:
+    ''' Pool of open LDAP connections, bound as the service account or left for rebinding as users '''
+    def __init__(self, server, user=None, password=None, size=LDAP_POOL_SIZE, client_strategy=SYNC):
+        ''' Constructor '''
+        self.server = server
+        self.user = user
+        self.password = password
+        self.client_strategy = client_strategy
+        self.connections = queue.LifoQueue(maxsize=size)
+
+    def create(self):
+        ''' Create a connection, bound right away if the pool has credentials '''
+        connection = Connection(
+            self.server, user=self.user, password=self.password, client_strategy=self.client_strategy,
+            auto_referrals=False, read_only=True, receive_timeout=LDAP_RECEIVE_TIMEOUT
+        )
+
+        if self.user is not None and not connection.bind():
+            raise LDAPBindError(connection.result['description'])
+
+        return connection
+
+    @contextmanager
+    def connection(self, fresh=False):
+        ''' Borrow a connection, which is discarded instead of returned if anything raised while it was borrowed '''
+        connection = None
+        if not fresh:
+            try:
+                connection = self.connections.get_nowait()
+            except queue.Empty:
+                pass
+        if connection is None:
+            connection = self.create()
+
+        failed = True
+        try:
+            yield connection
+            failed = False
+        finally:
+            if failed:
+                discard_connection(connection)
+            else:
+                try:
+                    self.connections.put_nowait(connection)
+                except queue.Full:
+                    discard_connection(connection)
+
+    def run(self, function):
+        ''' Run a function on a borrowed connection, retried once on a new connection if the borrowed one dropped '''
+        connection = None
+        try:
+            with self.connection() as connection:
+                return function(connection)
+        except (LDAPBindError, LDAPCommunicationError) as exception:
+            if not is_dropped_connection(connection, exception):
+                raise
+
+        with self.connection(fresh=True) as connection:
+            return function(connection)
+
+    def clear(self):
+        ''' Close every pooled connection '''
+        while True:
+            try:
+                discard_connection(self.connections.get_nowait())
+            except queue.Empty:
+                break
+
+
+# Server information is never read, so no schema or DSA information is fetched on connecting
+_server = Server(LDAP_URL, get_info=NONE, connect_timeout=LDAP_CONNECT_TIMEOUT)
+_service_pool = LDAPConnectionPool(_server, user=LDAP_BIND_USERNAME, password=LDAP_BIND_PASSWORD)
+_login_pool = LDAPConnectionPool(_server)
+_pools_lock = threading.Lock()
+
+
+def configure_LDAP(server, user=LDAP_BIND_USERNAME, password=LDAP_BIND_PASSWORD, client_strategy=SYNC):
+    ''' Replace the LDAP server, service account and connection strategy of the pools, such as a mocked server '''
+    global _service_pool, _login_pool
+
+    with _pools_lock:
+        _service_pool.clear()
+        _login_pool.clear()
+        _service_pool = LDAPConnectionPool(server, user=user, password=password, client_strategy=client_strategy)
+        _login_pool = LDAPConnectionPool(server, client_strategy=client_strategy)
+
+
+def discard_connection(connection):
+    ''' Close a connection, ignoring failures of an already dropped connection '''
+    try:
+        connection.unbind()
+    except (LDAPException, OSError):
+        pass
+
+
+def is_dropped_connection(connection, exception):
+    ''' Check if an exception was caused by the server having closed the connection, such as an idle pooled one '''
+    if isinstance(exception, LDAPCommunicationError):
+        return True
+
+    # Rebinding reports a closed socket as a bind error, which is told apart from rejected credentials by its state
+    if connection is None:
+        return False
+    last_error = str(connection.last_error or str()).lower()
+    return connection.closed or 'socket' in last_error or 'closed the connection' in last_error
+
+
+def get_unknown_user_cache_key(username):
+    ''' Get the cache key marking a username as not found in the LDAP server '''
+    return 'ldap_unknown_user:{}'.format(hashlib.sha256(username.encode()).hexdigest())
+
+
+def get_user_group(dn):
+    ''' Get the user group of a distinguished name by the organizational unit it is under '''
+    components = [i.strip().lower() for i in dn.split(',')]
+
+    for group in LDAP_USER_GROUPS:
+        suffix = [i.strip().lower() for i in '{},{}'.format(group['sub_base'], LDAP_BASE).split(',')]
+        if components[-len(suffix):] == suffix and len(components) > len(suffix):
+            return group
+
+    return None
+
+
+def search_LDAP_user(username):
+    ''' Search a user in every user group with a single subtree search, returns its entry and user group '''
+    def search(connection):
+        ''' Search on a service connection '''
+        connection.search(
+            LDAP_BASE,
+            '({}={})'.format(LDAP_USERNAME_FIELD, escape_filter_chars(username)),
+            attributes=(LDAP_DISPLAY_NAME_FIELD,),
+            size_limit=2
+        )
+        return [i for i in connection.response if i.get('type') == 'searchResEntry']
+
+    for entry in _service_pool.run(search):
+        user_group = get_user_group(entry['dn'])
+        if user_group is not None:
+            return entry, user_group
+
+    return None, None
+
 
 def get_LDAP_user(username, password):
     ''' Check user authentication in the LDAP server and return the information '''
-    # LDAP Server Set-up
-    server = Server(LDAP_URL, get_info=ALL)
+    # Empty passwords would be anonymous binds, which always succeed
+    if not password:
+        return None
 
-    # LDAP Server Binding
+    # Recently Not Found
+    if cache.get(get_unknown_user_cache_key(username)) is not None:
+        return None
+
+    # User Searching
     try:
-        connection = Connection(server, user=LDAP_BIND_USERNAME, password=LDAP_BIND_PASSWORD, auto_bind=True)
-    except (LDAPBindError, LDAPSocketOpenError) as e:
+        entry, user_group = search_LDAP_user(username)
+    except (LDAPBindError, LDAPCommunicationError) as e:
         if SHOW_LDAP_ERROR_MESSAGE:
             error(e.__str__().capitalize())
         return None
 
-    # User Searching
-    user_group = None
-    for group in LDAP_USER_GROUPS:
-        connection.search(
-            '{},{}'.format(group['sub_base'], LDAP_BASE),
-            '({}={})'.format(LDAP_USERNAME_FIELD, username),
-            attributes=(LDAP_DISPLAY_NAME_FIELD,)
-        )
-        if len(connection.response) != 0 and 'dn' in connection.response[0].keys():
-            user_group = group
-            break
-
-    # User Not Found
-    if user_group is None:
+    # User Not Found, remembered to spare the LDAP server from repeated attempts
+    if entry is None:
+        cache.set(get_unknown_user_cache_key(username), True, LDAP_UNKNOWN_USER_CACHE_TIMEOUT)
         return None
 
     # Login Attempt
     try:
-        Connection(server, user=connection.response[0]['dn'], password=password, auto_bind=True)
-    except (LDAPBindError, IndexError, KeyError):
+        if not _login_pool.run(lambda connection: connection.rebind(user=entry['dn'], password=password)):
+            return None
+    except (LDAPBindError, LDAPCommunicationError):
         return None
 
     # Login Successful
+    name = entry['attributes'][LDAP_DISPLAY_NAME_FIELD]
     return {
         'username': username,
         'password': password,
-        'name': connection.response[0]['attributes'][LDAP_DISPLAY_NAME_FIELD],
+        'name': name[0] if isinstance(name, list) else name,
         'user_group': user_group['user_group'],
         'is_staff': user_group['is_staff']
     }
@@ -0,0 +1,93 @@
+'''
+    User Application Benchmark Login Command
+    user/management/commands/benchmark_login.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from django.core.management.base import BaseCommand
+from ldap3 import Server, Connection, MOCK_SYNC
+
+from clubs_and_events.settings import LDAP_BASE, LDAP_USER_GROUPS, LDAP_USERNAME_FIELD, LDAP_DISPLAY_NAME_FIELD
+from core.utils.benchmarks import measure, log_measurement
+from core.utils.logs import log
+from user import ldap
+
+import os
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', '..', 'fixtures', 'ldap', 'directory.json')
+SERVICE_USERNAME = 'CN=Service Account,OU=Service,DC=it,DC=kmitl,DC=ac,DC=th'
+SERVICE_PASSWORD = 'service_password'
+
+
+def get_LDAP_user_legacy(server, username, password):
+    ''' Logs in as done before pooling, binding new connections and searching every user group in turn '''
+    connection = Connection(server, user=SERVICE_USERNAME, password=SERVICE_PASSWORD, client_strategy=MOCK_SYNC)
+    if not connection.bind():
+        return None
+
+    user_group = None
+    for group in LDAP_USER_GROUPS:
+        connection.search(
+            '{},{}'.format(group['sub_base'], LDAP_BASE),
+            '({}={})'.format(LDAP_USERNAME_FIELD, username),
+            attributes=(LDAP_DISPLAY_NAME_FIELD,)
+        )
+        if len(connection.response) != 0 and 'dn' in connection.response[0].keys():
+            user_group = group
+            break
+
+    if user_group is None:
+        return None
+
+    login = Connection(server, user=connection.response[0]['dn'], password=password, client_strategy=MOCK_SYNC)
+    if not login.bind():
+        return None
+
+    return {
+        'username': username,
+        'name': connection.response[0]['attributes'][LDAP_DISPLAY_NAME_FIELD],
+        'user_group': user_group['user_group']
+    }
+
+
+class Command(BaseCommand):
+    ''' Measures LDAP logins on a mocked directory '''
+    help = 'Benchmarks LDAP login on the mocked directory fixture, no LDAP server is contacted.'
+
+    def add_arguments(self, parser):
+        ''' Add arguments '''
+        parser.add_argument('--logins', type=int, default=1000, help='Amount of logins to attempt')
+        parser.add_argument('--legacy', action='store_true', help='Also measure logins as done before pooling')
+
+    def handle(self, *args, **options):
+        ''' Handle command '''
+        server = Server('mock_server')
+        Connection(server, client_strategy=MOCK_SYNC).strategy.entries_from_json(FIXTURE)
+
+        credentials = (
+            ('61070001', 'student_password'),
+            ('lecturer01', 'lecturer_password'),
+            ('61070001', 'wrong_password'),
+            ('unknown', 'unknown_password')
+        )
+
+        def run(function):
+            ''' Run a function once per login, cycling through valid, invalid and unknown credentials '''
+            for i in range(options['logins']):
+                function(*credentials[i % len(credentials)])
+
+        try:
+            log('Logins: {}'.format(options['logins']))
+            ldap.configure_LDAP(server, user=SERVICE_USERNAME, password=SERVICE_PASSWORD, client_strategy=MOCK_SYNC)
+            _, elapsed, query_count = measure(lambda: run(ldap.get_LDAP_user), repeat=3)
+            log_measurement('  Pooled connections', elapsed, query_count)
+
+            if options['legacy']:
+                _, elapsed, query_count = measure(
+                    lambda: run(lambda username, password: get_LDAP_user_legacy(server, username, password)),
+                    repeat=1
+                )
+                log_measurement('  Legacy', elapsed, query_count)
+        finally:
+            ldap.configure_LDAP(ldap._server)
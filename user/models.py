@@ -13,7 +13,7 @@ from django.utils.translation import gettext as _
 from clubs_and_events.settings import STORAGE_BASE_DIR, LDAP_USER_GROUPS
 from clubs_and_events.settings import MAX_PROFILE_PICTURE_DIMENSION
 from core.utils.general import get_file_extension, get_random_string
-from core.utils.files import auto_downscale_image
+from core.utils.files import IMAGE_STATUS, clear_removed_image_metadata, get_changed_images, schedule_image_processing
 from core.utils.objects import save_user_attributes
 
 
@@ -51,6 +51,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     nickname = models.CharField(max_length=32, null=True, blank=True)
     bio = models.TextField(max_length=4096, null=True, blank=True)
     profile_picture = models.ImageField(null=True, blank=True, upload_to=get_profile_picture_path)
+    profile_picture_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_picture_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_picture_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_picture_mime = models.CharField(max_length=32, null=True, blank=True, editable=False)
+    profile_picture_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    image_status = models.CharField(max_length=1, choices=IMAGE_STATUS, default='R', editable=False)
     birthdate = models.DateField(null=True, blank=True)
 
     # Statuses
@@ -83,8 +89,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     def save(self, *args, **kwargs):
         ''' Save instance '''
         save_user_attributes(self, created_by_field_name='created_by', updated_by_field_name='updated_by')
+        images = get_changed_images(self, {'profile_picture': MAX_PROFILE_PICTURE_DIMENSION})
+        clear_removed_image_metadata(self, ('profile_picture',))
         super(User, self).save(*args, **kwargs)
-        auto_downscale_image(self.profile_picture, threshold=MAX_PROFILE_PICTURE_DIMENSION)
+        schedule_image_processing(self, images)
 
 
 class EmailPreference(models.Model):
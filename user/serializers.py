@@ -9,6 +9,7 @@ from datetime import datetime
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from core.utils.files import get_image_variants
 from core.utils.serializer import add_error_message, validate_profanity_serializer, raise_validation_errors
 from core.utils.serializer import field_exists
 from membership.models import Membership
@@ -19,6 +20,7 @@ from user.models import EmailPreference, StudentCommitteeAuthority
 class UserSerializer(serializers.ModelSerializer):
     ''' User serializer '''
     meta = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         ''' Meta '''
@@ -48,6 +50,10 @@ class UserSerializer(serializers.ModelSerializer):
             'votes': self.get_votes(obj)
         }
 
+    def get_variants(self, obj):
+        ''' Retrieve profile picture variant URLs '''
+        return get_image_variants(obj, ('profile_picture',))
+
     def get_is_student_committee(self, obj):
         ''' Retrieve student committee member status '''
         try:
@@ -65,11 +71,17 @@ class UserSerializer(serializers.ModelSerializer):
 
 class LimitedUserSerializer(serializers.ModelSerializer):
     ''' Limited user serializer '''
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         ''' Meta '''
         model = get_user_model()
-        fields = ('id', 'username', 'name', 'profile_picture')
-        read_only_fields = ('id', 'username', 'name', 'profile_picture')
+        fields = ('id', 'username', 'name', 'profile_picture', 'variants')
+        read_only_fields = ('id', 'username', 'name', 'profile_picture', 'variants')
+
+    def get_variants(self, obj):
+        ''' Retrieve profile picture variant URLs '''
+        return get_image_variants(obj, ('profile_picture',))
 
 
 class EmailPreferenceSerializer(serializers.ModelSerializer):
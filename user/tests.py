@@ -7,18 +7,52 @@
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from ldap3 import Server, Connection, MOCK_SYNC, MODIFY_REPLACE
+from ldap3.core.exceptions import LDAPSocketReceiveError
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from clubs_and_events.settings import LOGIN_THROTTLE_RATE
+from user import ldap
+from user.authentication import AuthenticationBackend, get_verified_cache_key
+from user.ldap import configure_LDAP, get_LDAP_user
 from user.models import EmailPreference, StudentCommitteeAuthority
 
+import os
+
+
+LDAP_FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'ldap', 'directory.json')
+LDAP_SERVICE_USERNAME = 'CN=Service Account,OU=Service,DC=it,DC=kmitl,DC=ac,DC=th'
+LDAP_SERVICE_PASSWORD = 'service_password'
+
+
+def configure_mock_LDAP():
+    ''' Point LDAP authentication to a mocked directory loaded from the fixture, returns its service connection '''
+    server = Server('mock_server')
+    connection = Connection(
+        server, user=LDAP_SERVICE_USERNAME, password=LDAP_SERVICE_PASSWORD, client_strategy=MOCK_SYNC
+    )
+    connection.strategy.entries_from_json(LDAP_FIXTURE)
+    connection.bind()
+    configure_LDAP(server, user=LDAP_SERVICE_USERNAME, password=LDAP_SERVICE_PASSWORD, client_strategy=MOCK_SYNC)
+
+    return connection
+
 
 class LoginAPITest(APITestCase):
     ''' Login API test '''
     def setUp(self):
         ''' Set up '''
+        cache.clear()
+        configure_mock_LDAP()
         get_user_model().objects.create_user(username='user_01', password='12345678', name='User One')
 
+    def tearDown(self):
+        ''' Tear down '''
+        configure_LDAP(ldap._server)
+
     def test_login_valid(self):
         ''' Test valid login credentials '''
         response = self.client.post('/api/user/login/', {
@@ -37,6 +71,179 @@ class LoginAPITest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_login_malformed(self):
+        ''' Test login requests without a username or with a body other than an object '''
+        response = self.client.post('/api/user/login/', ['user_01', '12345678'], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post('/api/user/login/', '12345678', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post('/api/user/login/', {'password': '12345678'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertIsNone(AuthenticationBackend().authenticate(None, username=None, password='12345678'))
+        self.assertIsNone(AuthenticationBackend().authenticate(None, username='user_01', password=None))
+
+    def test_login_throttled(self):
+        ''' Test login attempts over the rate of a username and IP address '''
+        for _ in range(int(LOGIN_THROTTLE_RATE.split('/')[0])):
+            response = self.client.post('/api/user/login/', {
+                'username': 'user_01',
+                'password': '12345678x',
+            })
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post('/api/user/login/', {
+            'username': 'user_01',
+            'password': '12345678'
+        })
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        response = self.client.post('/api/user/login/', {
+            'username': 'user_02',
+            'password': '12345678'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LDAPLoginAPITest(APITestCase):
+    ''' LDAP login API test on a mocked directory '''
+    def setUp(self):
+        ''' Set up '''
+        cache.clear()
+        self.connection = configure_mock_LDAP()
+
+    def tearDown(self):
+        ''' Tear down '''
+        configure_LDAP(ldap._server)
+
+    def test_login_ldap(self):
+        ''' Test valid LDAP credentials of a user logging in for the first time '''
+        response = self.client.post('/api/user/login/', {
+            'username': '61070001',
+            'password': 'student_password'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_user_model().objects.get(username='61070001').user_group, 'student')
+        self.assertTrue(EmailPreference.objects.filter(user__username='61070001').exists())
+
+    def test_login_ldap_changed_password(self):
+        ''' Test a changed LDAP password, accepted once the recent verification expired '''
+        self.client.post('/api/user/login/', {
+            'username': '61070001',
+            'password': 'student_password'
+        })
+        self.connection.modify(
+            'CN=Student One,OU=61,OU=Student,DC=it,DC=kmitl,DC=ac,DC=th',
+            {'userPassword': [(MODIFY_REPLACE, ['new_password'])]}
+        )
+
+        response = self.client.post('/api/user/login/', {
+            'username': '61070001',
+            'password': 'new_password'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        cache.delete(get_verified_cache_key(get_user_model().objects.get(username='61070001').id))
+
+        response = self.client.post('/api/user/login/', {
+            'username': '61070001',
+            'password': 'new_password'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post('/api/user/login/', {
+            'username': '61070001',
+            'password': 'student_password'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LDAPTest(TestCase):
+    ''' LDAP authentication test on a mocked directory '''
+    def setUp(self):
+        ''' Set up '''
+        cache.clear()
+        self.connection = configure_mock_LDAP()
+
+    def tearDown(self):
+        ''' Tear down '''
+        configure_LDAP(ldap._server)
+
+    def test_ldap_student(self):
+        ''' Test valid student credentials '''
+        self.assertEqual(get_LDAP_user('61070001', 'student_password'), {
+            'username': '61070001',
+            'password': 'student_password',
+            'name': 'Student One',
+            'user_group': 'student',
+            'is_staff': False
+        })
+
+    def test_ldap_lecturer(self):
+        ''' Test valid lecturer credentials '''
+        user = get_LDAP_user('lecturer01', 'lecturer_password')
+
+        self.assertEqual(user['user_group'], 'lecturer')
+        self.assertTrue(user['is_staff'])
+
+    def test_ldap_invalid_password(self):
+        ''' Test invalid and empty passwords '''
+        self.assertIsNone(get_LDAP_user('61070001', 'student_passwordx'))
+        self.assertIsNone(get_LDAP_user('61070001', str()))
+
+    def test_ldap_unknown_user(self):
+        ''' Test unknown usernames and filter injection '''
+        self.assertIsNone(get_LDAP_user('61070002', 'student_password'))
+        self.assertIsNone(get_LDAP_user('*', 'student_password'))
+        self.assertIsNone(get_LDAP_user('61070001)(sAMAccountName=*', 'student_password'))
+
+    def test_ldap_unknown_user_cached(self):
+        ''' Test an unknown username being remembered until its cache entry expires '''
+        self.assertIsNone(get_LDAP_user('61070002', 'student_password'))
+
+        self.connection.strategy.add_entry('CN=Student Two,OU=61,OU=Student,DC=it,DC=kmitl,DC=ac,DC=th', {
+            'objectClass': ['top', 'person', 'user'],
+            'sAMAccountName': '61070002',
+            'displayName': 'Student Two',
+            'userPassword': 'student_password'
+        })
+        self.assertIsNone(get_LDAP_user('61070002', 'student_password'))
+
+        cache.clear()
+        self.assertIsNotNone(get_LDAP_user('61070002', 'student_password'))
+
+    def test_ldap_outside_user_groups(self):
+        ''' Test valid credentials of an entry outside every user group '''
+        self.assertIsNone(get_LDAP_user('guest01', 'guest_password'))
+
+    def test_ldap_reconnect(self):
+        ''' Test logging in again after pooled connections dropped '''
+        get_LDAP_user('61070001', 'student_password')
+
+        for pool in (ldap._service_pool, ldap._login_pool):
+            for connection in list(pool.connections.queue):
+                connection.unbind()
+
+        self.assertIsNotNone(get_LDAP_user('61070001', 'student_password'))
+
+    def test_ldap_reconnect_login(self):
+        ''' Test logging in on a pooled login connection of which the server closed the socket '''
+        get_LDAP_user('61070001', 'student_password')
+        dropped = ldap._login_pool.connections.queue[-1]
+
+        def bind(*args, **kwargs):
+            ''' Bind as on a socket closed by the server '''
+            raise LDAPSocketReceiveError('socket closed by the server')
+
+        dropped.bind = bind
+
+        self.assertIsNotNone(get_LDAP_user('61070001', 'student_password'))
+        self.assertNotIn(dropped, ldap._login_pool.connections.queue)
+        self.assertIsNone(get_LDAP_user('61070001', 'student_passwordx'))
+
 
 class UserAPITest(APITestCase):
     ''' User API test '''
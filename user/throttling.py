@@ -0,0 +1,29 @@
+'''
+    User Application Throttling
+    user/throttling.py
+    @author Teerapat Kraisrisirikul (810Teams)
+'''
+
+from rest_framework.throttling import SimpleRateThrottle
+
+from clubs_and_events.settings import LOGIN_THROTTLE_RATE
+
+import hashlib
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    ''' Login attempts throttle, counted per username and client IP address '''
+    scope = 'login'
+    rate = LOGIN_THROTTLE_RATE
+
+    def get_cache_key(self, request, view):
+        ''' Get cache key, by client IP address only if the request has no username '''
+        username = request.data.get('username') if isinstance(request.data, dict) else None
+
+        if not isinstance(username, str):
+            username = str()
+
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': '{}:{}'.format(hashlib.sha256(username.encode()).hexdigest(), self.get_ident(request))
+        }
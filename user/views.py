@@ -21,6 +21,7 @@ from user.models import EmailPreference, StudentCommitteeAuthority
 from user.permissions import IsProfileOwner, IsEmailPreferenceOwner, IsLecturerObject, IsStudentObject
 from user.serializers import UserSerializer, LimitedUserSerializer, EmailPreferenceSerializer
 from user.serializers import StudentCommitteeAuthoritySerializer
+from user.throttling import LoginRateThrottle
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -127,6 +128,7 @@ class MyUserView(generics.ListAPIView):
 class LoginAPIView(ObtainAuthToken):
     ''' Login view '''
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (LoginRateThrottle,)
 
 
 class EmailPreferenceViewSet(viewsets.ModelViewSet):